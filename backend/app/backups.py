@@ -0,0 +1,348 @@
+"""
+Online backups of storage.db.
+
+``create_backup`` copies the live database with the SQLite backup API
+(``sqlite3.Connection.backup``) in steps of ``BACKUP_STEP_PAGES`` pages,
+sleeping ``BACKUP_STEP_SLEEP`` seconds between steps. The source connection
+holds one read transaction for the whole copy, so in WAL mode the snapshot is
+consistent while requests keep reading and writing. The copy is checked with
+``PRAGMA integrity_check``, gzipped to ``DATA_DIR/backups/storage-<stamp>.db.gz``
+and described by a ``storage-<stamp>.json`` manifest: row counts, schema
+version, and the QR code and photo files the snapshot refers to (images are
+listed, not copied; QR codes can be regenerated). The newest ``BACKUP_KEEP``
+backups are kept.
+
+``verify_backup`` restores a backup to a temporary file and checks its
+integrity and row counts against the manifest. Backups run from
+``POST /admin/backups``, from ``python -m app.backups``, and every
+``BACKUP_INTERVAL_HOURS`` (``0`` disables the schedule) while the app runs.
+"""
+import asyncio
+import gzip
+import json
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Iterator
+
+from .database import DATA_DIR, engine
+
+logger = logging.getLogger(__name__)
+
+BACKUP_DIR = os.path.join(DATA_DIR, "backups")
+BACKUP_STEP_PAGES = int(os.environ.get("BACKUP_STEP_PAGES", "256"))
+BACKUP_STEP_SLEEP = float(os.environ.get("BACKUP_STEP_SLEEP", "0.02"))
+BACKUP_KEEP = int(os.environ.get("BACKUP_KEEP", "7"))
+BACKUP_INTERVAL_HOURS = float(os.environ.get("BACKUP_INTERVAL_HOURS", "24"))
+
+COUNTED_TABLES = ("floors", "rooms", "containers", "items", "photos")
+
+_NAME = re.compile(r"^storage-\d{8}-\d{6}-\d{3}$")
+
+_running = threading.Lock()
+
+# when and why the last backup in this process failed; cleared by the next one that succeeds
+last_error: dict | None = None
+
+class BackupInProgress(RuntimeError):
+    pass
+
+def _database_path() -> str:
+    return engine.url.database
+
+def _counts(connection: sqlite3.Connection) -> dict[str, int]:
+    tables = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    return {table: connection.execute(f"SELECT count(*) FROM {table}").fetchone()[0] for table in COUNTED_TABLES if table in tables}
+
+def _schema_version(connection: sqlite3.Connection) -> int | None:
+    try:
+        return connection.execute("SELECT max(version) FROM schema_version").fetchone()[0]
+    except sqlite3.OperationalError:
+        return None
+
+def _file_entry(kind: str, owner_id: int, url_path: str | None) -> dict:
+    # stored paths are /static/<relative path under DATA_DIR>
+    relative = (url_path or "").removeprefix("/static/")
+    path = os.path.join(DATA_DIR, relative)
+    exists = bool(relative) and os.path.isfile(path)
+    return {
+        kind: owner_id,
+        "path": relative or None,
+        "exists": exists,
+        "bytes": os.path.getsize(path) if exists else None,
+    }
+
+def _file_manifest(connection: sqlite3.Connection) -> dict[str, list[dict]]:
+    """The QR code and photo files rows in the snapshot point at"""
+    qr_codes = [
+        _file_entry("container_id", container_id, path)
+        for container_id, path in connection.execute("SELECT id, qr_code_path FROM containers ORDER BY id")
+    ]
+    photos = [
+        _file_entry("photo_id", photo_id, path)
+        for photo_id, path in connection.execute("SELECT id, file_path FROM photos ORDER BY id")
+    ]
+    return {"qr_codes": qr_codes, "photos": photos}
+
+def _copy_online(source_path: str, target_path: str, pages: int, sleep: float) -> int:
+    """Copy ``source_path`` into ``target_path`` with the backup API; returns the number of steps"""
+    source = sqlite3.connect(source_path, isolation_level=None, check_same_thread=False)
+    target = sqlite3.connect(target_path)
+    steps = 0
+
+    def progress(status, remaining, total):
+        nonlocal steps
+        steps += 1
+        if remaining:
+            time.sleep(sleep)
+
+    try:
+        # one read transaction for the whole copy: a consistent snapshot that writers (in WAL mode)
+        # don't block and that doesn't restart the backup when they commit
+        source.execute("BEGIN")
+        source.execute("SELECT count(*) FROM sqlite_master").fetchone()
+        source.backup(target, pages=pages, progress=progress)
+        source.execute("COMMIT")
+    finally:
+        source.close()
+        target.close()
+    return steps
+
+def _compress(source_path: str, target_path: str) -> None:
+    partial = f"{target_path}.partial"
+    with open(source_path, "rb") as source, gzip.open(partial, "wb", compresslevel=6) as target:
+        shutil.copyfileobj(source, target, length=1024 * 1024)
+    os.replace(partial, target_path)
+
+def _backup_path(backup_dir: str | None, name: str, suffix: str) -> str:
+    if not _NAME.match(name):
+        raise FileNotFoundError(f"No backup named {name}")
+    path = os.path.join(backup_dir or BACKUP_DIR, f"{name}{suffix}")
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No backup named {name}")
+    return path
+
+def list_backups(backup_dir: str | None = None) -> list[dict]:
+    """Manifests of the backups in ``backup_dir``, newest first"""
+    backup_dir = backup_dir or BACKUP_DIR
+    if not os.path.isdir(backup_dir):
+        return []
+
+    manifests = []
+    for name in sorted(os.listdir(backup_dir), reverse=True):
+        if name.startswith("storage-") and name.endswith(".json"):
+            with open(os.path.join(backup_dir, name)) as f:
+                manifests.append(json.load(f))
+    return manifests
+
+def _rotate(backup_dir: str, keep: int) -> list[str]:
+    removed = []
+    for manifest in list_backups(backup_dir)[keep:]:
+        for name in (manifest["file"], f"{manifest['name']}.json"):
+            path = os.path.join(backup_dir, name)
+            if os.path.exists(path):
+                os.remove(path)
+        removed.append(manifest["name"])
+    return removed
+
+def create_backup(
+    backup_dir: str | None = None,
+    source_path: str | None = None,
+    pages: int = BACKUP_STEP_PAGES,
+    sleep: float = BACKUP_STEP_SLEEP,
+    keep: int = BACKUP_KEEP,
+) -> dict:
+    """
+    Snapshot the live database into ``backup_dir`` and return the manifest.
+
+    A failure other than ``BackupInProgress`` is also kept in ``last_error``.
+
+    Raises:
+        BackupInProgress: another backup is running (in any worker)
+        RuntimeError: the snapshot failed its integrity check (nothing is kept)
+    """
+    global last_error
+    if not _running.acquire(blocking=False):
+        raise BackupInProgress("A backup is already running")
+    try:
+        backup_dir = backup_dir or BACKUP_DIR
+        source_path = source_path or _database_path()
+        os.makedirs(backup_dir, exist_ok=True)
+        with _exclusive(backup_dir):
+            manifest = _create_backup(backup_dir, source_path, pages, sleep, keep)
+    except BackupInProgress:
+        raise
+    except Exception as exc:
+        last_error = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "error": "".join(traceback.format_exception_only(exc)).strip(),
+        }
+        raise
+    finally:
+        _running.release()
+    last_error = None
+    return manifest
+
+@contextmanager
+def _exclusive(backup_dir: str) -> Iterator[None]:
+    """Keep other uvicorn workers (each with its own schedule) from backing up at the same time"""
+    import fcntl
+
+    with open(os.path.join(backup_dir, ".lock"), "w") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise BackupInProgress("A backup is already running") from None
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def _create_backup(backup_dir: str, source_path: str, pages: int, sleep: float, keep: int) -> dict:
+    started = time.perf_counter()
+    created_at = datetime.now(timezone.utc)
+    name = f"storage-{created_at:%Y%m%d-%H%M%S}-{created_at.microsecond // 1000:03d}"
+    snapshot_path = os.path.join(backup_dir, f"{name}.db.partial")
+    archive = f"{name}.db.gz"
+
+    try:
+        steps = _copy_online(source_path, snapshot_path, pages, sleep)
+
+        snapshot = sqlite3.connect(snapshot_path)
+        try:
+            integrity = snapshot.execute("PRAGMA integrity_check").fetchone()[0]
+            if integrity != "ok":
+                raise RuntimeError(f"Backup snapshot failed its integrity check: {integrity}")
+            counts = _counts(snapshot)
+            schema_version = _schema_version(snapshot)
+            files = _file_manifest(snapshot) if "containers" in counts else {"qr_codes": [], "photos": []}
+        finally:
+            snapshot.close()
+
+        database_bytes = os.path.getsize(snapshot_path)
+        _compress(snapshot_path, os.path.join(backup_dir, archive))
+    finally:
+        if os.path.exists(snapshot_path):
+            os.remove(snapshot_path)
+
+    manifest = {
+        "name": name,
+        "file": archive,
+        "created_at": created_at.isoformat(),
+        "duration_s": round(time.perf_counter() - started, 3),
+        "steps": steps,
+        "database_bytes": database_bytes,
+        "compressed_bytes": os.path.getsize(os.path.join(backup_dir, archive)),
+        "schema_version": schema_version,
+        "counts": counts,
+        "files": files,
+    }
+    # renamed into place, so list_backups() never reads a half-written manifest
+    manifest_path = os.path.join(backup_dir, f"{name}.json")
+    with open(f"{manifest_path}.partial", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(f"{manifest_path}.partial", manifest_path)
+
+    _rotate(backup_dir, keep)
+    logger.info("Backup %s written in %.1fs", name, manifest["duration_s"])
+    return manifest
+
+def backup_running() -> bool:
+    return _running.locked()
+
+def restore_backup(name: str, target_path: str, backup_dir: str | None = None) -> None:
+    """Decompress backup ``name`` to ``target_path`` (stop the app before restoring over storage.db)"""
+    archive = _backup_path(backup_dir, name, ".db.gz")
+    with gzip.open(archive, "rb") as source, open(target_path, "wb") as target:
+        shutil.copyfileobj(source, target, length=1024 * 1024)
+
+def verify_backup(name: str, backup_dir: str | None = None) -> dict:
+    """Restore backup ``name`` to a temporary file and check it against its manifest"""
+    backup_dir = backup_dir or BACKUP_DIR
+    with open(_backup_path(backup_dir, name, ".json")) as f:
+        manifest = json.load(f)
+
+    with tempfile.TemporaryDirectory(dir=backup_dir) as workdir:
+        restored = os.path.join(workdir, "storage.db")
+        restore_backup(name, restored, backup_dir)
+        connection = sqlite3.connect(restored)
+        try:
+            integrity = connection.execute("PRAGMA integrity_check").fetchone()[0]
+            counts = _counts(connection) if integrity == "ok" else {}
+        except sqlite3.DatabaseError as exc:
+            # damaged badly enough that SQLite can't even read the schema
+            integrity, counts = str(exc), {}
+        finally:
+            connection.close()
+
+    return {
+        "name": name,
+        "ok": integrity == "ok" and counts == manifest["counts"],
+        "integrity": integrity,
+        "counts": counts,
+        "expected_counts": manifest["counts"],
+        "missing_files": sum(
+            not entry["exists"] for entries in manifest["files"].values() for entry in entries if entry["path"]
+        ),
+    }
+
+def _seconds_until_due(interval: float) -> float:
+    backups = list_backups()
+    if not backups:
+        return interval
+    last = datetime.fromisoformat(backups[0]["created_at"]).timestamp()
+    return max(0.0, last + interval - time.time())
+
+async def run_schedule(interval_hours: float = BACKUP_INTERVAL_HOURS) -> None:
+    """Back up every ``interval_hours``, counting from the newest existing backup (started by main.lifespan)"""
+    interval = interval_hours * 3600
+    while True:
+        await asyncio.sleep(_seconds_until_due(interval))
+        try:
+            await asyncio.to_thread(create_backup)
+        except BackupInProgress:
+            pass
+        except Exception:
+            logger.exception("Scheduled backup failed")
+            await asyncio.sleep(interval)
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Back up, list, verify or restore storage.db")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("create", help="take a backup now (safe while the app runs)")
+    commands.add_parser("list", help="list backups, newest first")
+    verify = commands.add_parser("verify", help="restore a backup to a temporary file and check it")
+    verify.add_argument("name")
+    restore = commands.add_parser("restore", help="decompress a backup to a file (stop the app first)")
+    restore.add_argument("name")
+    restore.add_argument("--to", required=True, help="target path; must not exist yet")
+    args = parser.parse_args()
+
+    if args.command == "create":
+        manifest = create_backup()
+        print(f"{manifest['name']}: {manifest['counts']} in {manifest['duration_s']}s")
+    elif args.command == "list":
+        for manifest in list_backups():
+            print(f"{manifest['name']}  {manifest['compressed_bytes']:>12} bytes  {manifest['counts']}")
+    elif args.command == "verify":
+        result = verify_backup(args.name)
+        print(json.dumps(result, indent=2))
+        raise SystemExit(0 if result["ok"] else 1)
+    else:
+        if os.path.exists(args.to):
+            raise SystemExit(f"{args.to} exists; restore to a new path and move it into place with the app stopped")
+        restore_backup(args.name, args.to)
+        print(f"Restored {args.name} to {args.to}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+In-process caches validated against table write generations.
+
+Entries remember the generations of the tables they were built from (see
+``app.generations``); a cache hit only happens while those generations are
+unchanged, so writes from any worker invalidate them.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Iterable, TypeVar
+
+from sqlalchemy.orm import Session
+
+from . import generations, memory
+
+T = TypeVar("T")
+
+_registry: dict[str, "GenerationCache | QueryCache"] = {}
+
+LOW_MEMORY_MAXSIZE = 32  # QueryCache entries in low-memory mode
+
+class GenerationCache(Generic[T]):
+    """
+    A single value built by ``loader`` and rebuilt when any of ``tables`` changes.
+    With a maxsize of 0 (``CACHE_MAXSIZE_<NAME>=0``) nothing is kept and every call loads.
+    """
+
+    def __init__(self, name: str, tables: Iterable[str], loader: Callable[[Session], T]):
+        self.name = name
+        self.tables = tuple(tables)
+        self.maxsize = min(1, memory.cache_maxsize(name, 1, 1))
+        self._loader = loader
+        self._entry: tuple[tuple[int, ...], T] | None = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        _registry[name] = self
+
+    def get(self, db: Session) -> T:
+        if not self.maxsize:
+            self.misses += 1
+            return self._loader(db)
+
+        # read generations before loading, so a concurrent write can only make
+        # the stored entry look older than it is, never newer
+        current = generations.current(db, self.tables)
+        entry = self._entry
+        if entry is not None and entry[0] == current:
+            self.hits += 1
+            return entry[1]
+
+        with self._lock:
+            entry = self._entry
+            if entry is not None and entry[0] == current:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            value = self._loader(db)
+            self._entry = (current, value)
+            return value
+
+    def clear(self) -> None:
+        self._entry = None
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "entries": int(self._entry is not None), "maxsize": self.maxsize}
+
+class QueryCache(Generic[T]):
+    """
+    Bounded LRU of query results keyed by normalized parameters.
+
+    An entry is served while the generations of ``tables`` match the ones it
+    was built at and it is younger than ``ttl`` seconds; the least recently
+    used entry is dropped once ``maxsize`` is reached. ``maxsize`` is the
+    default for ``app.memory.cache_maxsize``, so the environment can lower it.
+    """
+
+    def __init__(self, name: str, tables: Iterable[str], maxsize: int = 256, ttl: float = 300.0):
+        self.name = name
+        self.tables = tuple(tables)
+        self.maxsize = memory.cache_maxsize(name, maxsize, min(maxsize, LOW_MEMORY_MAXSIZE))
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[tuple[int, ...], float, T]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        _registry[name] = self
+
+    def get_or_load(self, db: Session, key: Hashable, loader: Callable[[], T]) -> T:
+        current = generations.current(db, self.tables)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == current and entry[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+
+        value = loader()
+
+        with self._lock:
+            self._entries[key] = (current, now + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def peek(self, key: Hashable) -> T | None:
+        """Return the last value stored for ``key``, even if stale or expired"""
+        entry = self._entries.get(key)
+        return entry[2] if entry is not None else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries), "maxsize": self.maxsize}
+
+def normalize_key(**params) -> tuple:
+    """Hashable cache key where list filters are order- and duplicate-insensitive"""
+    return tuple(
+        (name, tuple(sorted(set(value))) if isinstance(value, (list, tuple, set)) else value)
+        for name, value in sorted(params.items())
+    )
+
+def cache_stats() -> dict[str, dict]:
+    """Hit/miss counters of every registered cache, keyed by cache name"""
+    return {name: cache.stats() for name, cache in _registry.items()}
+
+def clear_all() -> None:
+    for cache in _registry.values():
+        cache.clear()
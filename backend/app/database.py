@@ -1,19 +1,44 @@
 from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
-from dotenv import load_dotenv
 import os
 
-load_dotenv()
+def _load_dotenv():
+    """Load the nearest .env above this package, only importing python-dotenv when there is one"""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        path = os.path.join(directory, ".env")
+        if os.path.isfile(path):
+            from dotenv import load_dotenv
+            load_dotenv(path)
+            return
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return
+        directory = parent
 
-# HA add-ons persist data in the /data directory
+_load_dotenv()
+
+from . import memory, metrics, timing
+
+# HA add-ons persist data in the /data directory, created on the first connection (not at import)
 DATA_DIR = os.environ.get("DATA_DIR", "/data")
-os.makedirs(DATA_DIR, exist_ok=True)
 
 # SQLite database
 DATABASE_URL = f"sqlite:///{DATA_DIR}/storage.db"
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+# WAL lets readers in other uvicorn workers proceed while one worker writes
+SQLITE_JOURNAL_MODE = os.environ.get("SQLITE_JOURNAL_MODE", "wal")
+WAL_SIZE_LIMIT = 64 * 1024 * 1024
+
+engine = create_engine(
+    DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    # every pooled connection keeps its own SQLite page cache
+    pool_size=memory.DB_POOL_SIZE,
+    max_overflow=memory.DB_MAX_OVERFLOW,
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+metrics.instrument(engine)
 
 # SQLAlchemy model base class
 Base = declarative_base()
@@ -23,13 +48,28 @@ def get_db():
     """Dependency for FastAPI routes to get a db session."""
     db = SessionLocal()
     try:
-        yield db
+        if metrics.METRICS:
+            # check the connection out up front so pool contention shows up as its own metric
+            with metrics.pool_wait.time():
+                db.connection()
+        # the route's time holding the session, less its SQL and serialization, is ORM work
+        with timing.phase("orm"):
+            yield db
     finally:
         db.close()
 
-def _fk_pragma_on_connect(dbapi_connection, connection_record):
+def _sqlite_pragmas_on_connect(dbapi_connection, connection_record):
     cursor = dbapi_connection.cursor()
     cursor.execute("PRAGMA foreign_keys = ON")
+    cursor.execute(f"PRAGMA journal_mode = {SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA cache_size = -{memory.SQLITE_CACHE_KB}")
+    # once a checkpoint lets the WAL restart, a writer truncates a file grown past this
+    cursor.execute(f"PRAGMA journal_size_limit = {WAL_SIZE_LIMIT}")
     cursor.close()
 
-event.listen(engine, "connect", _fk_pragma_on_connect)
\ No newline at end of file
+def _create_data_dir(dialect, connection_record, cargs, cparams):
+    # the app, the migration, seed and backup CLIs all connect before they touch DATA_DIR
+    os.makedirs(DATA_DIR, exist_ok=True)
+
+event.listen(engine, "do_connect", _create_data_dir)
+event.listen(engine, "connect", _sqlite_pragmas_on_connect)
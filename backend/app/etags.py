@@ -0,0 +1,49 @@
+"""
+Weak ETags for GET endpoints, derived from table write generations.
+
+A tag covers the request path, its normalized query string, the app version and
+the generations of every table the endpoint reads. When the client's
+``If-None-Match`` still matches, the request is answered with ``304 Not
+Modified`` before the endpoint runs any query or serializes anything.
+"""
+import hashlib
+
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy.orm import Session
+
+from . import generations
+from .database import get_db
+
+def compute_etag(request: Request, table_generations: tuple[int, ...]) -> str:
+    """Build the weak ETag for ``request`` at the given table generations"""
+    params = sorted(request.query_params.multi_items())
+    key = repr((request.app.version, request.url.path, params, table_generations))
+    digest = hashlib.blake2b(key.encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+def _matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison of ``etag`` against an If-None-Match header"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+def etag(*tables: str):
+    """
+    Dependency factory for conditional GETs over ``tables``.
+
+    Usage:
+        @router.get("/all", dependencies=[Depends(etag("rooms"))])
+    """
+    def check_etag(request: Request, response: Response, db: Session = Depends(get_db)) -> None:
+        tag = compute_etag(request, generations.current(db, tables))
+        headers = {"ETag": tag, "Cache-Control": "no-cache"}
+
+        if _matches(request.headers.get("if-none-match"), tag):
+            raise HTTPException(status_code=304, headers=headers)
+
+        response.headers.update(headers)
+
+    return check_etag
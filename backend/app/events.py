@@ -0,0 +1,199 @@
+"""
+Change feed for ``GET /events`` (Server-Sent Events).
+
+Session listeners note every floor, room, container and item a flush
+creates, updates or deletes in ``session.info``, and publish the changes once
+the transaction commits (a rollback drops them), so clients never see writes
+that didn't happen. Bulk ``query.update()`` / ``query.delete()`` calls, which
+don't say which rows they touched, publish one ``bulk_updated`` /
+``bulk_deleted`` event for the table, and a delete lists the tables its
+``ON DELETE`` cascades reach.
+
+Commits happen on threadpool threads, so ``Broadcaster.publish`` hands events
+to the event loop with ``call_soon_threadsafe``. Each connected client gets a
+``Subscriber`` with a bounded queue keyed by row: a newer change to a row a
+slow client hasn't received yet replaces the older one, and a client that
+falls ``EVENTS_QUEUE_SIZE`` distinct rows behind gets a single ``resync``
+event telling it to re-fetch instead of an unbounded backlog.
+
+Events only reach clients connected to the uvicorn worker that made the
+change; run a single worker (the add-on default) when clients rely on them.
+"""
+import asyncio
+import os
+from collections import OrderedDict
+from itertools import count
+from typing import AsyncIterator
+
+from pydantic_core import to_json
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from .generations import with_dependents
+
+EVENTS_QUEUE_SIZE = int(os.environ.get("EVENTS_QUEUE_SIZE", "256"))
+EVENTS_KEEPALIVE_SECONDS = float(os.environ.get("EVENTS_KEEPALIVE_SECONDS", "15"))
+
+# table -> entity name used in events
+TRACKED = {"floors": "floor", "rooms": "room", "containers": "container", "items": "item"}
+
+_PENDING_KEY = "pending_events"
+
+_sequence = count(1)
+
+class Subscriber:
+    """One client's pending events, at most one per row"""
+
+    def __init__(self, maxsize: int = EVENTS_QUEUE_SIZE):
+        self.maxsize = maxsize
+        self._pending: OrderedDict[tuple, dict] = OrderedDict()
+        self._ready = asyncio.Event()
+        self.overflowed = False
+
+    def put(self, change: dict) -> None:
+        key = (change["entity"], change["id"])
+        previous = self._pending.pop(key, None)
+        if previous is not None:
+            change = _coalesce(previous, change)
+            if change is None:
+                return
+        elif len(self._pending) >= self.maxsize:
+            # too far behind to catch up row by row
+            self._pending.clear()
+            self.overflowed = True
+        if not self.overflowed:
+            self._pending[key] = change
+        self._ready.set()
+
+    async def get(self, timeout: float | None = None) -> list[dict]:
+        """Wait up to ``timeout`` seconds for events; ``[{"op": "resync"}]`` after an overflow"""
+        if not self._pending and not self.overflowed:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        self._ready.clear()
+        if self.overflowed:
+            self.overflowed = False
+            return [{"seq": next(_sequence), "op": "resync"}]
+        changes = list(self._pending.values())
+        self._pending.clear()
+        return changes
+
+def _coalesce(previous: dict, change: dict) -> dict | None:
+    """Merge two undelivered changes to one row; None when they cancel out"""
+    if previous["op"] == "created" and change["op"] == "deleted":
+        return None  # the client never saw it
+    if previous["op"] in ("created", "updated") and change["op"] == "updated":
+        # an update carries only the columns loaded when it flushed, so keep the earlier values of the rest
+        return {**change, "op": previous["op"], "data": {**previous["data"], **change["data"]}}
+    return change
+
+class Broadcaster:
+    """Fans committed changes out to the subscribers on the event loop"""
+
+    def __init__(self):
+        self.subscribers: set[Subscriber] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def subscribe(self, maxsize: int = EVENTS_QUEUE_SIZE) -> Subscriber:
+        self._loop = asyncio.get_running_loop()
+        subscriber = Subscriber(maxsize)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self.subscribers.discard(subscriber)
+
+    def publish(self, changes: list[dict]) -> None:
+        """Deliver ``changes`` from any thread"""
+        loop = self._loop
+        if not self.subscribers or loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(self._deliver, changes)
+        except RuntimeError:
+            pass  # the loop shut down between the check and the call
+
+    def _deliver(self, changes: list[dict]) -> None:
+        for subscriber in self.subscribers:
+            for change in changes:
+                subscriber.put(change)
+
+broadcaster = Broadcaster()
+
+def _row(state) -> dict:
+    # loaded values only: touching an expired attribute here would cost a SELECT per row mid-flush
+    loaded = state.dict
+    return {attr.key: loaded[attr.key] for attr in state.mapper.column_attrs if attr.key in loaded}
+
+def _change(obj, op: str) -> dict | None:
+    table = getattr(obj, "__table__", None)
+    entity = TRACKED.get(table.name) if table is not None else None
+    if entity is None:
+        return None
+    # new rows have their key after the flush but aren't in the identity map until it ends
+    state = inspect(obj)
+    change = {"entity": entity, "op": op, "id": state.mapper.primary_key_from_instance(obj)[0]}
+    if op == "deleted":
+        cascade = sorted(with_dependents([table.name]) & TRACKED.keys() - {table.name})
+        if cascade:
+            change["cascade"] = cascade
+    else:
+        change["data"] = _row(state)
+    return change
+
+def _pending(session: Session) -> list[dict]:
+    return session.info.setdefault(_PENDING_KEY, [])
+
+@event.listens_for(Session, "after_flush")
+def _record_flushed_changes(session: Session, flush_context) -> None:
+    changes = [_change(obj, "created") for obj in session.new]
+    # include_collections=False: a parent whose child list changed hasn't changed itself
+    changes += [_change(obj, "updated") for obj in session.dirty if session.is_modified(obj, include_collections=False)]
+    changes += [_change(obj, "deleted") for obj in session.deleted]
+    _pending(session).extend(change for change in changes if change is not None)
+
+@event.listens_for(Session, "do_orm_execute")
+def _record_bulk_statements(orm_execute_state) -> None:
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    entity = TRACKED.get(mapper.local_table.name) if mapper is not None else None
+    if entity is None:
+        return
+    op = "bulk_updated" if orm_execute_state.is_update else "bulk_deleted"
+    _pending(orm_execute_state.session).append({"entity": entity, "op": op, "id": None})
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed(session: Session) -> None:
+    changes = session.info.pop(_PENDING_KEY, None)
+    if changes:
+        for change in changes:
+            change["seq"] = next(_sequence)
+        broadcaster.publish(changes)
+
+@event.listens_for(Session, "after_rollback")
+def _drop_rolled_back(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+def _format(change: dict) -> str:
+    lines = f"id: {change['seq']}\n"
+    if change["op"] == "resync":
+        lines += "event: resync\n"
+    return lines + f"data: {to_json(change).decode()}\n\n"
+
+async def stream(is_disconnected, keepalive: float = EVENTS_KEEPALIVE_SECONDS) -> AsyncIterator[str]:
+    """SSE lines for one client until ``is_disconnected()`` says it went away"""
+    subscriber = broadcaster.subscribe()
+    try:
+        yield "retry: 3000\n\n"
+        while not await is_disconnected():
+            changes = await subscriber.get(timeout=keepalive)
+            if not changes:
+                # comment line, so proxies and the browser keep the connection open
+                yield ": keepalive\n\n"
+            for change in changes:
+                yield _format(change)
+    finally:
+        broadcaster.unsubscribe(subscriber)
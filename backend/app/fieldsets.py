@@ -0,0 +1,53 @@
+"""
+Sparse fieldsets (``fields=``) and nested includes (``include=``).
+
+Services receive a ``Fieldset`` and use it to decide which columns to select
+and which joins or subqueries to run, so a client asking for
+``fields=id,name,item_count`` only pays for those. Without either parameter the
+endpoints keep their full default shape.
+"""
+from dataclasses import dataclass, field
+
+from fastapi import HTTPException, Query
+
+@dataclass(frozen=True)
+class Fieldset:
+    fields: tuple[str, ...]
+    include: frozenset[str] = field(default_factory=frozenset)
+
+    def wants(self, name: str) -> bool:
+        return name in self.fields or name in self.include
+
+def _split(value: str | None) -> list[str]:
+    return [part.strip() for part in value.split(",") if part.strip()] if value else []
+
+def fieldset_query(allowed_fields: tuple[str, ...], allowed_includes: tuple[str, ...] = ()):
+    """
+    Dependency factory parsing ``fields=`` and ``include=`` for one resource.
+
+    The dependency returns None when neither parameter is given. ``id`` is always
+    returned, and ``include`` without ``fields`` keeps every scalar field.
+    """
+    def parse_fieldset(
+        fields: str | None = Query(None, description=f"Comma-separated subset of: {', '.join(allowed_fields)}"),
+        include: str | None = Query(
+            None, description=f"Comma-separated nested objects: {', '.join(allowed_includes) or 'none'}"
+        ),
+    ) -> Fieldset | None:
+        if fields is None and include is None:
+            return None
+
+        requested = set(_split(fields)) or set(allowed_fields)
+        includes = set(_split(include))
+
+        unknown = (requested - set(allowed_fields)) | (includes - set(allowed_includes))
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown field(s): {', '.join(sorted(unknown))}")
+
+        requested.add("id")
+        return Fieldset(
+            fields=tuple(name for name in allowed_fields if name in requested),
+            include=frozenset(includes),
+        )
+
+    return parse_fieldset
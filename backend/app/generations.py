@@ -0,0 +1,116 @@
+"""
+Per-table write generations shared by every worker through storage.db.
+
+Each flush that touches a mapped table bumps that table's row in
+``table_generations`` inside the same transaction, so the counter commits or
+rolls back together with the data. In-process caches remember the generations
+they were built from and compare them with ``current()`` on each request,
+which keeps them correct when uvicorn runs with ``--workers N``.
+"""
+import time
+from typing import Iterable
+
+from sqlalchemy import event, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from .database import Base
+from .models import TableGeneration
+
+_SNAPSHOT_KEY = "table_generations"
+
+# Counters start from the clock so a recreated database never reuses a generation
+# that a long-running worker may still have cached.
+_BUMP_SQL = text(
+    "INSERT INTO table_generations (table_name, generation) VALUES (:table_name, :seed) "
+    "ON CONFLICT (table_name) DO UPDATE SET generation = generation + 1"
+)
+
+_dependents: dict[str, set[str]] | None = None
+
+def _cascade_dependents() -> dict[str, set[str]]:
+    """Map each table to the tables SQLite may change when its rows are deleted"""
+    global _dependents
+    if _dependents is None:
+        graph: dict[str, set[str]] = {}
+        for table in Base.metadata.tables.values():
+            for fk in table.foreign_keys:
+                if fk.ondelete and fk.ondelete.upper() in ("CASCADE", "SET NULL"):
+                    graph.setdefault(fk.column.table.name, set()).add(table.name)
+
+        # close over chains such as floors -> rooms -> items
+        for name in graph:
+            pending = list(graph[name])
+            while pending:
+                child = pending.pop()
+                for grandchild in graph.get(child, ()):
+                    if grandchild not in graph[name]:
+                        graph[name].add(grandchild)
+                        pending.append(grandchild)
+        _dependents = graph
+    return _dependents
+
+def with_dependents(tables: Iterable[str]) -> set[str]:
+    """Return ``tables`` plus every table reached by ON DELETE cascades"""
+    dependents = _cascade_dependents()
+    result = set(tables)
+    for name in list(result):
+        result |= dependents.get(name, set())
+    return result
+
+def bump(connection: Connection, tables: Iterable[str]) -> None:
+    """Increment the generation of ``tables`` on ``connection``'s transaction"""
+    names = sorted(set(tables) - {TableGeneration.__tablename__})
+    if not names:
+        return
+    seed = time.time_ns()
+    connection.execute(_BUMP_SQL, [{"table_name": name, "seed": seed} for name in names])
+
+def current(db: Session, tables: Iterable[str]) -> tuple[int, ...]:
+    """
+    Return the committed generations of ``tables``.
+
+    The whole counter table is read once and memoized on the session until its
+    next flush, commit or rollback, so a request pays for at most one tiny query.
+    """
+    snapshot = db.info.get(_SNAPSHOT_KEY)
+    if snapshot is None:
+        rows = db.execute(select(TableGeneration.table_name, TableGeneration.generation)).all()
+        snapshot = db.info[_SNAPSHOT_KEY] = dict(rows)
+    return tuple(snapshot.get(name, 0) for name in tables)
+
+def _forget_snapshot(session: Session, *args) -> None:
+    session.info.pop(_SNAPSHOT_KEY, None)
+
+def _table_of(obj) -> str | None:
+    table = getattr(obj, "__table__", None)
+    return table.name if table is not None else None
+
+@event.listens_for(Session, "after_flush")
+def _bump_flushed_tables(session: Session, flush_context) -> None:
+    written = {_table_of(obj) for obj in session.new}
+    written |= {_table_of(obj) for obj in session.dirty if session.is_modified(obj)}
+    written |= with_dependents(_table_of(obj) for obj in session.deleted)
+    written.discard(None)
+
+    if written:
+        bump(session.connection(), written)
+    _forget_snapshot(session)
+
+@event.listens_for(Session, "do_orm_execute")
+def _bump_bulk_statements(orm_execute_state) -> None:
+    # query.update() / query.delete() skip the flush, so bump their table here
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None:
+        return
+
+    tables = {mapper.local_table.name}
+    if orm_execute_state.is_delete:
+        tables = with_dependents(tables)
+    bump(orm_execute_state.session.connection(), tables)
+    _forget_snapshot(orm_execute_state.session)
+
+event.listen(Session, "after_commit", _forget_snapshot)
+event.listen(Session, "after_rollback", _forget_snapshot)
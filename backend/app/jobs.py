@@ -0,0 +1,313 @@
+"""
+Background jobs stored in storage.db.
+
+Work that shouldn't hold a request open is registered as a job type and queued
+as a row in the ``jobs`` table:
+
+    @jobs.handler("regenerate_qr_codes", executor="process")
+    def regenerate_qr_codes_job(payload: dict, progress: jobs.Progress) -> dict:
+        ...
+        progress(done / total, "rendered 40 of 120")
+        return {"rendered": done}
+
+    job_id = jobs.queue.enqueue("regenerate_qr_codes")
+
+``JobQueue`` runs ``JOB_WORKERS`` threads that claim due jobs one at a time
+with a single ``UPDATE ... RETURNING``. A ``thread`` handler runs in the
+worker thread; a ``process`` handler (CPU-bound work such as image rendering)
+runs in a pool of ``JOB_PROCESSES`` spawned processes, so it neither holds the
+GIL from requests nor shares their connections. Handlers report progress by
+writing it to their row, which ``GET /jobs/{id}`` reads.
+
+A handler that raises is retried with exponential backoff (``run_after``)
+until it has run ``max_attempts`` times, then marked failed with the error.
+Because the queue lives in the database, jobs survive restarts: one process
+at a time runs workers (it holds a lock file next to the database), and when
+it takes over it puts the jobs a previous holder left ``running`` back in the
+queue. Other uvicorn workers only enqueue, as does every process when
+``JOB_WORKERS=0``.
+"""
+import json
+import logging
+import os
+import threading
+import traceback
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from sqlalchemy import Engine, create_engine, select, update
+
+from . import generations, memory, sync  # noqa: F401 - session listeners, needed in spawned job processes too
+from .database import engine as default_engine
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = memory.setting("JOB_WORKERS", 2, 1)
+JOB_PROCESSES = memory.setting("JOB_PROCESSES", 1, 1)
+JOB_POLL_SECONDS = float(os.environ.get("JOB_POLL_SECONDS", "2"))
+
+BACKOFF_SECONDS = 5.0  # first retry delay, doubled for each attempt after that
+BACKOFF_MAX_SECONDS = 15 * 60
+DEFAULT_MAX_ATTEMPTS = 3
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+
+@dataclass(frozen=True)
+class JobType:
+    kind: str
+    run: Callable[[dict, "Progress"], dict | None]
+    executor: str = "thread"  # or "process"
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
+
+HANDLERS: dict[str, JobType] = {}
+
+def handler(kind: str, executor: str = "thread", max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+    """Register the decorated function as the handler for jobs of ``kind``"""
+    if executor not in ("thread", "process"):
+        raise ValueError(f"Unknown executor: {executor}")
+
+    def register(function):
+        HANDLERS[kind] = JobType(kind, function, executor, max_attempts)
+        return function
+
+    return register
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+def backoff(attempts: int) -> float:
+    """Seconds to wait before retrying a job that has failed ``attempts`` times"""
+    return min(BACKOFF_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS)
+
+_engines: dict[str, Engine] = {}
+
+def _engine_for(url: str) -> Engine:
+    # a spawned process opens its own connections to the queue's database
+    if url == default_engine.url.render_as_string(hide_password=False):
+        return default_engine
+    if url not in _engines:
+        _engines[url] = create_engine(url)
+    return _engines[url]
+
+class Progress:
+    """Callable a handler uses to record how far it got; picklable so process handlers get one too"""
+
+    def __init__(self, job_id: int, database_url: str):
+        self.job_id = job_id
+        self.database_url = database_url
+
+    def __call__(self, fraction: float, message: str | None = None) -> None:
+        with _engine_for(self.database_url).begin() as connection:
+            connection.execute(
+                update(Job).where(Job.id == self.job_id).values(progress=max(0.0, min(1.0, fraction)), message=message)
+            )
+
+def job_dict(row) -> dict:
+    job = dict(row._mapping)
+    job["payload"] = json.loads(job["payload"])
+    job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+    return job
+
+class JobQueue:
+    """Jobs table access and the worker pool that drains it"""
+
+    def __init__(self, engine: Engine, workers: int = JOB_WORKERS, processes: int = JOB_PROCESSES, poll: float = JOB_POLL_SECONDS):
+        self.engine = engine
+        self.workers = workers
+        self.processes = processes
+        self.poll = poll
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._executor = None  # ProcessPoolExecutor, started for the first process job
+        self._executor_lock = threading.Lock()
+        self._lock_file = None
+
+    def enqueue(self, kind: str, payload: dict | None = None, delay: float = 0, max_attempts: int | None = None) -> int:
+        """Queue a job of a registered ``kind``; returns its id"""
+        job_type = HANDLERS.get(kind)
+        if job_type is None:
+            raise ValueError(f"Unknown job kind: {kind}")
+        now = _now()
+        with self.engine.begin() as connection:
+            job_id = connection.execute(
+                Job.__table__.insert().values(
+                    kind=kind,
+                    payload=json.dumps(payload or {}),
+                    status=QUEUED,
+                    attempts=0,
+                    max_attempts=max_attempts or job_type.max_attempts,
+                    progress=0.0,
+                    run_after=now + timedelta(seconds=delay),
+                    created_at=now,
+                )
+            ).inserted_primary_key[0]
+        self._wake.set()
+        return job_id
+
+    def get(self, job_id: int) -> dict | None:
+        with self.engine.connect() as connection:
+            row = connection.execute(select(Job.__table__).where(Job.id == job_id)).first()
+        return job_dict(row) if row is not None else None
+
+    def claim(self) -> dict | None:
+        """Mark the oldest due queued job running and return it, or None when there is nothing to do"""
+        now = _now()
+        due = select(Job.id).where(Job.status == QUEUED, Job.run_after <= now)
+        with self.engine.connect() as connection:
+            # a read first, so idle polling never takes the write lock
+            if connection.execute(due.limit(1)).first() is None:
+                return None
+        with self.engine.begin() as connection:
+            row = connection.execute(
+                update(Job)
+                .where(Job.id == due.order_by(Job.run_after, Job.id).limit(1).scalar_subquery())
+                .values(status=RUNNING, attempts=Job.attempts + 1, started_at=now)
+                .returning(*Job.__table__.columns)
+            ).first()
+        return job_dict(row) if row is not None else None
+
+    def run(self, job: dict) -> None:
+        """Run a claimed job and record its result, or its error and next attempt"""
+        job_type = HANDLERS.get(job["kind"])
+        progress = Progress(job["id"], self.engine.url.render_as_string(hide_password=False))
+        try:
+            if job_type is None:
+                raise LookupError(f"No handler registered for job kind {job['kind']!r}")
+            if job_type.executor == "process":
+                result = self._run_in_process(job_type, job["payload"], progress)
+            else:
+                result = job_type.run(job["payload"], progress)
+        except Exception as exc:
+            retry = job_type is not None and job["attempts"] < job["max_attempts"]
+            logger.warning("Job %s (%s) failed on attempt %s%s", job["id"], job["kind"], job["attempts"],
+                           ", will retry" if retry else "", exc_info=True)
+            values = {"error": "".join(traceback.format_exception_only(exc)).strip()}
+            if retry:
+                values.update(status=QUEUED, run_after=_now() + timedelta(seconds=backoff(job["attempts"])))
+            else:
+                values.update(status=FAILED, finished_at=_now())
+        else:
+            values = {
+                "status": SUCCEEDED,
+                "progress": 1.0,
+                "result": json.dumps(result) if result is not None else None,
+                "finished_at": _now(),
+            }
+        with self.engine.begin() as connection:
+            connection.execute(update(Job).where(Job.id == job["id"]).values(**values))
+
+    def requeue_interrupted(self) -> int:
+        """Put jobs a stopped process left running back in the queue, or fail those out of attempts"""
+        now = _now()
+        with self.engine.begin() as connection:
+            requeued = connection.execute(
+                update(Job)
+                .where(Job.status == RUNNING, Job.attempts < Job.max_attempts)
+                .values(status=QUEUED, run_after=now)
+            ).rowcount
+            connection.execute(
+                update(Job)
+                .where(Job.status == RUNNING)
+                .values(status=FAILED, error="interrupted by a restart", finished_at=now)
+            )
+        return requeued
+
+    def start(self) -> None:
+        """Start the supervisor, which runs workers once this process holds the queue lock"""
+        if self.workers < 1:
+            return  # JOB_WORKERS=0: this process only enqueues
+        self._stopping.clear()
+        supervisor = threading.Thread(target=self._supervise, name="jobs", daemon=True)
+        supervisor.start()
+        self._threads = [supervisor]
+
+    def stop(self, timeout: float = 5) -> None:
+        self._stopping.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        self._reset_process_pool()
+        if self._lock_file is not None:
+            self._lock_file.close()  # releases the flock
+            self._lock_file = None
+
+    def _acquire(self) -> bool:
+        database = self.engine.url.database
+        if not database or database == ":memory:":
+            return True
+
+        import fcntl
+
+        lock_file = open(f"{database}.jobs-lock", "w")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def _supervise(self) -> None:
+        # another uvicorn worker may hold the lock; take over if it goes away
+        while not self._acquire():
+            if self._stopping.wait(self.poll):
+                return
+        try:
+            requeued = self.requeue_interrupted()
+        except Exception:
+            logger.exception("Could not requeue interrupted jobs")
+        else:
+            if requeued:
+                logger.info("Requeued %s interrupted jobs", requeued)
+
+        workers = [threading.Thread(target=self._work, name=f"jobs-{n}", daemon=True) for n in range(self.workers)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+    def _work(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                job = self.claim()
+            except Exception:
+                logger.exception("Could not claim a job")
+                job = None
+            if job is None:
+                self._wake.wait(self.poll)
+                self._wake.clear()
+                continue
+            self.run(job)
+
+    def _run_in_process(self, job_type: JobType, payload: dict, progress: Progress):
+        # imported here: concurrent.futures.process loads multiprocessing, which startup shouldn't pay for
+        from concurrent.futures.process import BrokenProcessPool
+
+        try:
+            return self._process_pool().submit(job_type.run, payload, progress).result()
+        except BrokenProcessPool:
+            # a child died (e.g. out of memory); start a fresh pool for the next job
+            self._reset_process_pool()
+            raise
+
+    def _process_pool(self):
+        with self._executor_lock:
+            if self._executor is None:
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+
+                # spawned, not forked: a fork would inherit this process's pooled connections and threads
+                self._executor = ProcessPoolExecutor(self.processes, mp_context=multiprocessing.get_context("spawn"))
+            return self._executor
+
+    def _reset_process_pool(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+queue = JobQueue(default_engine)
@@ -1,17 +1,59 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from sqlalchemy.exc import OperationalError
 import os
 
-from .database import engine, Base, DATA_DIR
-from .routers import containers, items, rooms, floors, search
+from .database import engine, DATA_DIR
+from . import generations  # registers the write-generation session listeners
+from . import backups, events, jobs, maintenance, metrics, migrations, sync
+from .statements import SQL_DEBUG, StatementCountMiddleware
+from .timing import SERVER_TIMING, ServerTimingMiddleware
+from .routers import admin, containers, items, jobs as jobs_router, rooms, floors, search, sync as sync_router
+from .services import containers as containers_service
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Filesystem and schema setup, the job workers and the backup and maintenance schedules, kept out of import so starting (and testing) the app stays cheap"""
+    os.makedirs(containers_service.QR_DIR, exist_ok=True)
+    # bring storage.db up to the current schema; index builds finish in the background
+    migrations.migrate_for_startup(engine)
+    # picks up jobs queued or interrupted before a restart
+    jobs.queue.start()
+
+    schedules = []
+    if backups.BACKUP_INTERVAL_HOURS > 0:
+        schedules.append(asyncio.create_task(backups.run_schedule()))
+    if maintenance.MAINTENANCE:
+        schedules.append(asyncio.create_task(maintenance.run_schedule()))
+    yield
+    for schedule in schedules:
+        schedule.cancel()
+    jobs.queue.stop()
 
-# create db tables
-Base.metadata.create_all(bind=engine)
+app = FastAPI(title="Storage Assistant", version="1.0.0", lifespan=lifespan)
 
-app = FastAPI(title="Storage Assistant", version="1.0.0")
+if SQL_DEBUG:
+    app.add_middleware(StatementCountMiddleware)
+if SERVER_TIMING:
+    app.add_middleware(ServerTimingMiddleware)
+if metrics.METRICS:
+    app.add_middleware(metrics.MetricsMiddleware)
+if maintenance.MAINTENANCE:
+    app.add_middleware(maintenance.ActivityMiddleware)
 
-# mount static files
-app.mount("/static", StaticFiles(directory=DATA_DIR), name="static")
+# mount static files; DATA_DIR may not exist until the lifespan creates it
+app.mount("/static", StaticFiles(directory=DATA_DIR, check_dir=False), name="static")
+
+@app.exception_handler(OperationalError)
+async def database_locked_handler(request: Request, exc: OperationalError):
+    """Report SQLite lock timeouts as a retryable 503 instead of a bare 500"""
+    if "database is locked" not in str(exc.orig):
+        raise exc
+    return JSONResponse(status_code=503, content={"detail": "database is locked"}, headers={"Retry-After": "1"})
 
 # add routers
 app.include_router(containers.router, prefix="/containers", tags=["containers"])
@@ -19,6 +61,9 @@ app.include_router(items.router, prefix="/items", tags=["items"])
 app.include_router(search.router, prefix="/search", tags=["search"])
 app.include_router(rooms.router, prefix="/rooms", tags=["rooms"])
 app.include_router(floors.router, prefix="/floors", tags=["floors"])
+app.include_router(sync_router.router, prefix="/sync", tags=["sync"])
+app.include_router(jobs_router.router, prefix="/jobs", tags=["jobs"])
+app.include_router(admin.router, prefix="/admin", tags=["admin"])
 
 @app.get("/")
 async def root():
@@ -26,4 +71,19 @@ async def root():
 
 @app.get("/health")
 async def health():
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint():
+    """Prometheus scrape target"""
+    return PlainTextResponse(metrics.render(engine.url.database), media_type="text/plain; version=0.0.4")
+
+@app.get("/events")
+async def events_stream(request: Request):
+    """Server-Sent Events for every committed create, update and delete of floors, rooms, containers and items"""
+    return StreamingResponse(
+        events.stream(request.is_disconnected),
+        media_type="text/event-stream",
+        # no caching or proxy buffering, or events arrive in bursts
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,257 @@
+"""
+Background maintenance of storage.db while the add-on is idle.
+
+Four tasks, each with its own interval:
+
+- ``optimize``: ``ANALYZE`` the first time, ``PRAGMA optimize`` after that, so
+  the query planner has ``sqlite_stat1`` statistics that follow the data
+- ``vacuum``: ``PRAGMA incremental_vacuum`` in batches of
+  ``MAINTENANCE_VACUUM_PAGES`` pages, one short write transaction each, until
+  the free list is empty or requests come back (needs the incremental
+  auto-vacuum mode set by migration 0003)
+- ``checkpoint``: a passive WAL checkpoint, which never waits on readers or
+  writers, so the WAL restarts from the beginning instead of growing
+- ``tombstones``: drop delete records older than ``SYNC_TOMBSTONE_DAYS``
+  (``app.sync``)
+
+``ActivityMiddleware`` tracks requests in flight and when the last one ended.
+Every ``MAINTENANCE_CHECK_SECONDS`` the schedule started by ``main.lifespan``
+runs the tasks that are due, provided no request has been seen for
+``MAINTENANCE_IDLE_SECONDS`` and no backup is being written. Activity is per
+process; with several uvicorn workers a lock file next to the database keeps
+maintenance to one worker at a time. ``MAINTENANCE=0`` turns it all off.
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Iterator
+
+from sqlalchemy import Engine
+
+from . import backups, sync
+from .database import engine as default_engine
+
+logger = logging.getLogger(__name__)
+
+MAINTENANCE = os.environ.get("MAINTENANCE", "1") != "0"
+MAINTENANCE_IDLE_SECONDS = float(os.environ.get("MAINTENANCE_IDLE_SECONDS", "60"))
+MAINTENANCE_CHECK_SECONDS = float(os.environ.get("MAINTENANCE_CHECK_SECONDS", "15"))
+MAINTENANCE_VACUUM_PAGES = int(os.environ.get("MAINTENANCE_VACUUM_PAGES", "256"))
+
+STREAMING_PATHS = ("/events",)
+VACUUM_PAUSE = 0.05  # seconds between vacuum batches for requests waiting on the write lock
+
+class Activity:
+    """Requests in flight and when the last one finished, for idle detection"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.last_request = time.monotonic()
+
+    def started(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+
+    def finished(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.last_request = time.monotonic()
+
+    def idle_for(self) -> float:
+        """Seconds since the last request ended, or 0 while one is running"""
+        with self._lock:
+            return 0.0 if self.in_flight else time.monotonic() - self.last_request
+
+activity = Activity()
+
+def is_idle() -> bool:
+    return activity.idle_for() >= MAINTENANCE_IDLE_SECONDS and not backups.backup_running()
+
+class ActivityMiddleware:
+    """ASGI middleware recording request activity for the maintenance schedule"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        # an open event stream is a client waiting, not load
+        if scope["type"] != "http" or scope["path"] in STREAMING_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        activity.started()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            activity.finished()
+
+def _autocommit(engine: Engine):
+    # PRAGMA optimize and incremental_vacuum manage their own transactions
+    return engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+
+def optimize(engine: Engine, should_continue: Callable[[], bool]) -> dict:
+    with _autocommit(engine) as connection:
+        analyzed = connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+        ).first() is not None
+        if analyzed:
+            # 0x10002: consider every table, not just the ones this fresh connection has queried
+            connection.exec_driver_sql("PRAGMA optimize = 0x10002")
+        else:
+            connection.exec_driver_sql("ANALYZE")
+    return {"statement": "PRAGMA optimize" if analyzed else "ANALYZE"}
+
+def vacuum(engine: Engine, should_continue: Callable[[], bool], pages: int | None = None) -> dict:
+    pages = pages or MAINTENANCE_VACUUM_PAGES
+    freed = batches = 0
+    with _autocommit(engine) as connection:
+        if connection.exec_driver_sql("PRAGMA auto_vacuum").scalar() != 2:
+            return {"skipped": "auto_vacuum is not incremental", "freed_pages": 0, "free_pages": None}
+        free = connection.exec_driver_sql("PRAGMA freelist_count").scalar()
+        while free and should_continue():
+            # sqlite3 steps the pragma once, which frees a single page, so a batch is
+            # that many one-page runs in one write transaction
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+            try:
+                for _ in range(min(pages, free)):
+                    connection.exec_driver_sql("PRAGMA incremental_vacuum(1)")
+            except Exception:
+                connection.exec_driver_sql("ROLLBACK")
+                raise
+            connection.exec_driver_sql("COMMIT")
+            remaining = connection.exec_driver_sql("PRAGMA freelist_count").scalar()
+            freed += free - remaining
+            batches += 1
+            free = remaining
+            if free:
+                time.sleep(VACUUM_PAUSE)
+    return {"freed_pages": freed, "batches": batches, "free_pages": free}
+
+def checkpoint(engine: Engine, should_continue: Callable[[], bool]) -> dict:
+    with _autocommit(engine) as connection:
+        if connection.exec_driver_sql("PRAGMA journal_mode").scalar() != "wal":
+            return {"skipped": "not in WAL mode"}
+        busy, wal_frames, checkpointed = connection.exec_driver_sql("PRAGMA wal_checkpoint(PASSIVE)").one()
+    return {"busy": bool(busy), "wal_frames": wal_frames, "checkpointed_frames": checkpointed}
+
+def prune_tombstones(engine: Engine, should_continue: Callable[[], bool]) -> dict:
+    with engine.begin() as connection:
+        return {"deleted": sync.prune_tombstones(connection)}
+
+@dataclass(frozen=True)
+class Task:
+    name: str
+    interval: float  # seconds
+    run: Callable[[Engine, Callable[[], bool]], dict]
+
+TASKS = (
+    Task("checkpoint", 5 * 60, checkpoint),
+    Task("vacuum", 60 * 60, vacuum),
+    Task("optimize", 6 * 60 * 60, optimize),
+    Task("tombstones", 24 * 60 * 60, prune_tombstones),
+)
+
+# task name -> {"runs", "last_run_at", "duration_ms", "result", "error"} for this process
+status: dict[str, dict] = {}
+_status_lock = threading.Lock()
+_last_started: dict[str, float] = {}
+
+@contextmanager
+def _exclusive(engine: Engine) -> Iterator[bool]:
+    """Yield whether this process holds the maintenance lock for ``engine``'s database file"""
+    database = engine.url.database
+    if not database or database == ":memory:":
+        yield True
+        return
+
+    import fcntl
+
+    with open(f"{database}.maintenance-lock", "w") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def _due(task: Task, now: float) -> bool:
+    last = _last_started.get(task.name)
+    return last is None or now - last >= task.interval
+
+def run_task(task: Task, engine: Engine = default_engine, should_continue: Callable[[], bool] = lambda: True) -> dict:
+    """Run ``task`` now and record its outcome in ``status``"""
+    _last_started[task.name] = time.monotonic()
+    started = time.perf_counter()
+    entry = {"last_run_at": datetime.now(timezone.utc).isoformat(), "result": None, "error": None}
+    try:
+        entry["result"] = task.run(engine, should_continue)
+    except Exception as exc:
+        logger.exception("Maintenance task %s failed", task.name)
+        entry["error"] = str(exc)
+    entry["duration_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    with _status_lock:
+        entry["runs"] = status.get(task.name, {}).get("runs", 0) + 1
+        status[task.name] = entry
+    return entry
+
+def run_due(engine: Engine = default_engine, should_continue: Callable[[], bool] = is_idle) -> list[str]:
+    """
+    Run the tasks whose interval has passed, stopping early once ``should_continue`` turns false.
+
+    Returns:
+        list: names of the tasks run
+    """
+    ran = []
+    with _exclusive(engine) as acquired:
+        if not acquired:
+            return ran
+        now = time.monotonic()
+        for task in TASKS:
+            if not should_continue():
+                break
+            if _due(task, now):
+                run_task(task, engine, should_continue)
+                ran.append(task.name)
+    return ran
+
+def report() -> dict:
+    """Idle state and the last run of each task, for ``GET /admin/maintenance``"""
+    now = time.monotonic()
+    with _status_lock:
+        tasks = [
+            {
+                "name": task.name,
+                "interval_seconds": task.interval,
+                "next_due_in_seconds": max(0.0, round(_last_started[task.name] + task.interval - now, 1))
+                if task.name in _last_started else 0.0,
+                **status.get(task.name, {"runs": 0, "last_run_at": None, "duration_ms": None, "result": None, "error": None}),
+            }
+            for task in TASKS
+        ]
+    return {
+        "enabled": MAINTENANCE,
+        "idle": is_idle(),
+        "idle_for_seconds": round(activity.idle_for(), 1),
+        "in_flight": activity.in_flight,
+        "tasks": tasks,
+    }
+
+async def run_schedule(check_seconds: float = MAINTENANCE_CHECK_SECONDS) -> None:
+    """Run due tasks whenever the app is idle (started by main.lifespan)"""
+    while True:
+        await asyncio.sleep(check_seconds)
+        if not is_idle():
+            continue
+        try:
+            await asyncio.to_thread(run_due)
+        except Exception:
+            logger.exception("Maintenance run failed")
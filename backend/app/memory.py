@@ -0,0 +1,36 @@
+"""
+Memory limits for small boards.
+
+``LOW_MEMORY=1`` picks smaller defaults for the SQLite page cache, the
+connection pool and every in-process cache, for 1 GB armhf/armv7 devices
+shared with Home Assistant. Each limit can also be set on its own:
+
+- ``SQLITE_CACHE_KB``: page cache per pooled connection
+- ``DB_POOL_SIZE`` / ``DB_MAX_OVERFLOW``: pooled connections kept / extra under load
+- ``CACHE_MAXSIZE``: entries per in-process cache, and ``CACHE_MAXSIZE_<NAME>``
+  for one cache (e.g. ``CACHE_MAXSIZE_ITEM_PAGES``); ``0`` disables a cache
+
+Cache names are the ones reported by ``GET /admin/cache``, plus ``sql_shapes``
+(normalized statements behind the ``/metrics`` SQL histogram).
+"""
+import os
+
+LOW_MEMORY = os.environ.get("LOW_MEMORY", "") == "1"
+
+def setting(name: str, default: int, low_memory: int) -> int:
+    """Integer setting from the environment, with a smaller default in low-memory mode"""
+    value = os.environ.get(name)
+    if value is not None:
+        return int(value)
+    return low_memory if LOW_MEMORY else default
+
+SQLITE_CACHE_KB = setting("SQLITE_CACHE_KB", 2000, 512)  # 2000 is SQLite's own default
+DB_POOL_SIZE = setting("DB_POOL_SIZE", 5, 2)
+DB_MAX_OVERFLOW = setting("DB_MAX_OVERFLOW", 10, 2)
+
+def cache_maxsize(name: str, default: int, low_memory: int) -> int:
+    """Entry limit for the cache called ``name``"""
+    value = os.environ.get(f"CACHE_MAXSIZE_{name.upper()}")
+    if value is not None:
+        return int(value)
+    return setting("CACHE_MAXSIZE", default, low_memory)
@@ -0,0 +1,215 @@
+"""
+In-process metrics exposed at ``/metrics`` in the Prometheus text format.
+
+Histograms are plain bucket counters behind a lock, observed on the request
+path: request latency per route template (``MetricsMiddleware``), SQL latency
+per statement shape (cursor events on the app's engine), connection pool wait
+(``database.get_db``) and image render time. Cache counters and SQLite file
+sizes are read when the endpoint is scraped. Set ``METRICS=0`` to turn the
+instrumentation off.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import lru_cache
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from . import memory
+from .statements import statement_shape
+
+METRICS = os.environ.get("METRICS", "1") != "0"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by label values"""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._series: dict[tuple, list] = {}  # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def time(self, *labels: str) -> "_Timer":
+        return _Timer(self, labels)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+
+        for labels, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), values[:-1]):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {values[-1]:.6f}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+class _Timer:
+    __slots__ = ("_histogram", "_labels", "_started")
+
+    def __init__(self, histogram: Histogram, labels: tuple[str, ...]):
+        self._histogram = histogram
+        self._labels = labels
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self._histogram.observe(time.perf_counter() - self._started, *self._labels)
+
+_registry: list[Histogram] = []
+
+request_latency = Histogram(
+    "storage_http_request_duration_seconds", "HTTP request latency by route template", ("method", "route", "status")
+)
+sql_latency = Histogram(
+    "storage_sql_statement_duration_seconds", "SQL statement latency by statement shape", ("statement",), SQL_BUCKETS
+)
+pool_wait = Histogram(
+    "storage_db_pool_wait_seconds", "Time to check a connection out of the pool per request", (), SQL_BUCKETS
+)
+render_time = Histogram(
+    "storage_image_render_seconds", "Time to render and save generated images", ("kind",)
+)
+
+@lru_cache(maxsize=memory.cache_maxsize("sql_shapes", 1024, 128))
+def _shape(statement: str) -> str:
+    return statement_shape(statement)
+
+def _sql_started(conn, cursor, statement, parameters, context, executemany):
+    conn.info["metrics_started"] = time.perf_counter()
+
+def _sql_finished(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop("metrics_started", None)
+    if started is not None:
+        sql_latency.observe(time.perf_counter() - started, _shape(statement))
+
+def _sql_failed(exception_context):
+    if exception_context.connection is not None:
+        exception_context.connection.info.pop("metrics_started", None)
+
+_SQL_LISTENERS = (
+    ("before_cursor_execute", _sql_started),
+    ("after_cursor_execute", _sql_finished),
+    ("handle_error", _sql_failed),
+)
+
+def instrument(engine: Engine) -> None:
+    """Observe statement latency on ``engine``; only the app's engine, so seed, job and benchmark engines stay out of ``/metrics``"""
+    if METRICS:
+        for name, listener in _SQL_LISTENERS:
+            event.listen(engine, name, listener)
+
+def uninstrument(engine: Engine) -> None:
+    for name, listener in _SQL_LISTENERS:
+        if event.contains(engine, name, listener):
+            event.remove(engine, name, listener)
+
+class MetricsMiddleware:
+    """ASGI middleware observing request latency labelled with the matched route template"""
+
+    def __init__(self, app):
+        self.app = app
+        self._templates: dict | None = None
+
+    def _route(self, scope) -> str:
+        if self._templates is None:
+            self._templates = {
+                getattr(route, "endpoint", None): route.path_format
+                for route in scope["app"].routes
+                if hasattr(route, "path_format")
+            }
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            # mounts (static files) don't set an endpoint; unmatched paths would explode the label set
+            return scope.get("root_path") or "unmatched"
+        return self._templates.get(endpoint, "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            request_latency.observe(time.perf_counter() - started, scope["method"], self._route(scope), str(status))
+
+def _gauge(name: str, help: str, kind: str, samples: list[tuple[str, float]]) -> list[str]:
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    lines += [f"{name}{labels} {value}" for labels, value in samples]
+    return lines
+
+def render(database_path: str | None) -> str:
+    """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+    from .cache import cache_stats
+
+    lines: list[str] = []
+    for histogram in _registry:
+        lines += histogram.render()
+
+    stats = sorted(cache_stats().items())
+    for field, kind, help in (
+        ("hits", "counter", "Cache lookups served from memory"),
+        ("misses", "counter", "Cache lookups that ran the loader"),
+        ("entries", "gauge", "Entries currently held"),
+    ):
+        suffix = "_total" if kind == "counter" else ""
+        lines += _gauge(
+            f"storage_cache_{field}{suffix}", help, kind,
+            [(_labels(("cache",), (name,)), values[field]) for name, values in stats],
+        )
+
+    if database_path:
+        sizes = []
+        for file, suffix in (("db", ""), ("wal", "-wal"), ("shm", "-shm")):
+            path = database_path + suffix
+            sizes.append((_labels(("file",), (file,)), os.path.getsize(path) if os.path.exists(path) else 0))
+        lines += _gauge("storage_sqlite_file_bytes", "Size of the SQLite database, WAL and shared-memory files", "gauge", sizes)
+
+    return "\n".join(lines) + "\n"
+
+def clear() -> None:
+    for histogram in _registry:
+        histogram.clear()
@@ -0,0 +1,15 @@
+"""Create any missing tables (and their indexes) from the models"""
+from sqlalchemy import Engine
+
+from ..database import Base
+from .. import models  # noqa: F401 - registers the tables on Base.metadata
+
+def upgrade(engine: Engine) -> None:
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        tables = {row[0] for row in connection.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if tables <= {"schema_version"}:
+            # a new file: take incremental auto-vacuum (see 0003) before the tables exist, so it
+            # never needs the full rebuild; VACUUM only has the empty schema_version to copy
+            connection.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+            connection.exec_driver_sql("VACUUM")
+    Base.metadata.create_all(bind=engine, checkfirst=True)
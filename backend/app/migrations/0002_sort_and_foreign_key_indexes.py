@@ -0,0 +1,30 @@
+"""Foreign key and sort-order indexes for databases created before they were added to the models"""
+from sqlalchemy import Engine
+
+from . import create_index
+
+# the query planner picks these up as they appear, so the app can serve while they build
+background = True
+
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS ix_rooms_floor_id ON rooms (floor_id)",
+    "CREATE INDEX IF NOT EXISTS ix_containers_room_id ON containers (room_id)",
+    "CREATE INDEX IF NOT EXISTS ix_containers_room_name ON containers (room_id, name)",
+    "CREATE INDEX IF NOT EXISTS ix_containers_room_created_at ON containers (room_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_containers_created_at ON containers (created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_items_container_id ON items (container_id)",
+    "CREATE INDEX IF NOT EXISTS ix_items_container_name ON items (container_id, name)",
+    "CREATE INDEX IF NOT EXISTS ix_items_container_quantity ON items (container_id, quantity)",
+    "CREATE INDEX IF NOT EXISTS ix_items_container_created_at ON items (container_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_items_container_room_name ON items (container_id, room_id, name)",
+    "CREATE INDEX IF NOT EXISTS ix_items_room_id ON items (room_id)",
+    "CREATE INDEX IF NOT EXISTS ix_items_room_name ON items (room_id, name)",
+    "CREATE INDEX IF NOT EXISTS ix_items_room_quantity ON items (room_id, quantity)",
+    "CREATE INDEX IF NOT EXISTS ix_items_room_created_at ON items (room_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_items_quantity ON items (quantity)",
+    "CREATE INDEX IF NOT EXISTS ix_items_created_at ON items (created_at)",
+)
+
+def upgrade(engine: Engine) -> None:
+    for statement in INDEXES:
+        create_index(engine, statement)
@@ -0,0 +1,19 @@
+"""Switch storage.db to incremental auto-vacuum so maintenance can return freed pages to the filesystem"""
+from sqlalchemy import Engine
+
+# databases created since 0001 sets the mode skip this. On an older one the VACUUM rewrites the
+# whole file and holds the write lock until it is done: reads carry on (WAL), but every write
+# waits, or fails once it has waited out the busy timeout, for the length of the rebuild, which
+# for a large database on a Pi is minutes. It runs once, in the background after startup
+background = True
+
+INCREMENTAL = 2
+
+def upgrade(engine: Engine) -> None:
+    # VACUUM can't run inside a transaction
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        if connection.exec_driver_sql("PRAGMA auto_vacuum").scalar() == INCREMENTAL:
+            return
+        # the new mode only takes effect for a database with tables once VACUUM rebuilds it
+        connection.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+        connection.exec_driver_sql("VACUUM")
@@ -0,0 +1,26 @@
+"""Jobs table for the background job queue (app.jobs)"""
+from sqlalchemy import Engine
+
+STATEMENTS = (
+    "CREATE TABLE IF NOT EXISTS jobs ("
+    "id INTEGER NOT NULL PRIMARY KEY, "
+    "kind VARCHAR NOT NULL, "
+    "payload TEXT NOT NULL, "
+    "status VARCHAR NOT NULL, "
+    "attempts INTEGER NOT NULL, "
+    "max_attempts INTEGER NOT NULL, "
+    "progress FLOAT NOT NULL, "
+    "message VARCHAR, "
+    "result TEXT, "
+    "error TEXT, "
+    "run_after DATETIME NOT NULL, "
+    "created_at DATETIME NOT NULL, "
+    "started_at DATETIME, "
+    "finished_at DATETIME)",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_status_run_after ON jobs (status, run_after)",
+)
+
+def upgrade(engine: Engine) -> None:
+    with engine.begin() as connection:
+        for statement in STATEMENTS:
+            connection.exec_driver_sql(statement)
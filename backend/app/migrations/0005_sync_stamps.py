@@ -0,0 +1,37 @@
+"""updated_at columns, tombstones and the sync clock for GET /sync"""
+from sqlalchemy import Engine
+
+from . import backfill, column_exists, create_index
+from ..models import SYNC_TABLES, START_CLOCK, tombstone_trigger
+
+TABLES = (
+    "CREATE TABLE IF NOT EXISTS tombstones ("
+    "id INTEGER NOT NULL PRIMARY KEY, "
+    "table_name VARCHAR NOT NULL, "
+    "row_id INTEGER NOT NULL, "
+    "deleted_at DATETIME NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS ix_tombstones_deleted_at ON tombstones (deleted_at)",
+    "CREATE TABLE IF NOT EXISTS sync_clock ("
+    "id INTEGER NOT NULL PRIMARY KEY, "
+    "value INTEGER NOT NULL, "
+    "horizon INTEGER NOT NULL)",
+)
+
+def upgrade(engine: Engine) -> None:
+    missing = [table for table in SYNC_TABLES if not column_exists(engine, table, "updated_at")]
+    with engine.begin() as connection:
+        for statement in TABLES:
+            connection.exec_driver_sql(statement)
+        for table in missing:
+            connection.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN updated_at DATETIME")
+
+    # existing rows count as last written when they were created
+    for table in SYNC_TABLES:
+        backfill(engine, table, "updated_at = coalesce(created_at, '1970-01-01 00:00:00.000000')", where="updated_at IS NULL")
+        create_index(engine, f"CREATE INDEX IF NOT EXISTS ix_{table}_updated_at ON {table} (updated_at)")
+
+    with engine.begin() as connection:
+        # the clock starts now, past every backfilled stamp
+        connection.exec_driver_sql(START_CLOCK)
+        for table in SYNC_TABLES:
+            connection.exec_driver_sql(tombstone_trigger(table))
@@ -0,0 +1,191 @@
+"""
+Versioned schema migrations for storage.db.
+
+Migrations are the numbered modules in this package (``0001_initial.py``,
+``0002_...``), applied in order and recorded one row per version in the
+``schema_version`` table. Each module has a docstring describing it, an
+``upgrade(engine)`` function and optionally ``background = True``.
+
+``upgrade`` manages its own transactions so long steps can commit as they go:
+``create_index`` builds one index per transaction and ``backfill`` updates a
+table in rowid ranges, pausing between chunks so requests can take the write
+lock. Because ``0001`` creates the current models on a fresh database, and a
+crash can interrupt a migration before its version is recorded, every
+upgrade must be safe to run again (``IF NOT EXISTS``, column checks).
+
+At startup ``migrate_for_startup`` applies the migrations the app needs in
+order to serve, and leaves ``background`` ones (index builds and other work
+that only makes the database faster or smaller) to a thread, wherever they sit
+in the order. A later migration must therefore never depend on a background
+one. Workers serialize on
+a lock file next to the database, and re-check the recorded versions once they
+hold it, so each migration runs once however many uvicorn workers start.
+"""
+import importlib
+import logging
+import os
+import pkgutil
+import re
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Iterator
+
+from sqlalchemy import Engine
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_CHUNK = 5_000
+CHUNK_PAUSE = 0.05  # seconds between chunks for requests waiting on the write lock
+
+_MODULE_NAME = re.compile(r"^(\d{4})_(\w+)$")
+
+_CREATE_SCHEMA_VERSION = (
+    "CREATE TABLE IF NOT EXISTS schema_version ("
+    "version INTEGER PRIMARY KEY, "
+    "name TEXT NOT NULL, "
+    "applied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+)
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    description: str
+    upgrade: Callable[[Engine], None]
+    background: bool = False
+
+def discover() -> list[Migration]:
+    """Every migration module in this package, in version order"""
+    migrations = []
+    for module_info in pkgutil.iter_modules(__path__):
+        match = _MODULE_NAME.match(module_info.name)
+        if not match:
+            continue
+        module = importlib.import_module(f"{__name__}.{module_info.name}")
+        migrations.append(Migration(
+            version=int(match.group(1)),
+            name=match.group(2),
+            description=(module.__doc__ or "").strip(),
+            upgrade=module.upgrade,
+            background=getattr(module, "background", False),
+        ))
+    return sorted(migrations, key=lambda m: m.version)
+
+def applied_versions(engine: Engine) -> set[int]:
+    with engine.begin() as connection:
+        connection.exec_driver_sql(_CREATE_SCHEMA_VERSION)
+        return {row[0] for row in connection.exec_driver_sql("SELECT version FROM schema_version")}
+
+def pending(engine: Engine) -> list[Migration]:
+    applied = applied_versions(engine)
+    return [migration for migration in discover() if migration.version not in applied]
+
+@contextmanager
+def _exclusive(engine: Engine) -> Iterator[None]:
+    """Hold the migration lock for ``engine``'s database file (in-memory databases have no other users)"""
+    database = engine.url.database
+    if not database or database == ":memory:":
+        yield
+        return
+
+    import fcntl
+
+    with open(f"{database}.migrate-lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def _apply(engine: Engine, migration: Migration) -> bool:
+    """Run ``migration`` unless another worker already has; True when this call applied it"""
+    with _exclusive(engine):
+        if migration.version in applied_versions(engine):
+            return False
+
+        started = time.perf_counter()
+        logger.info("Applying migration %04d_%s", migration.version, migration.name)
+        migration.upgrade(engine)
+        with engine.begin() as connection:
+            connection.exec_driver_sql(
+                "INSERT INTO schema_version (version, name) VALUES (?, ?)", (migration.version, migration.name)
+            )
+        logger.info("Applied migration %04d_%s in %.1fs", migration.version, migration.name, time.perf_counter() - started)
+        return True
+
+def migrate(engine: Engine, migrations: list[Migration] | None = None) -> list[Migration]:
+    """
+    Apply ``migrations`` (default: every pending one) in order.
+
+    Returns:
+        list: the migrations this call applied
+    """
+    if migrations is None:
+        migrations = pending(engine)
+    return [migration for migration in migrations if _apply(engine, migration)]
+
+def migrate_for_startup(engine: Engine) -> threading.Thread | None:
+    """
+    Apply the pending migrations that aren't ``background``, in order, and
+    start a daemon thread for the background ones.
+
+    Returns:
+        Thread | None: the background thread, if there was anything left to run
+    """
+    migrations = pending(engine)
+    deferred = [migration for migration in migrations if migration.background]
+
+    migrate(engine, [migration for migration in migrations if not migration.background])
+    if not deferred:
+        return None
+
+    def run_deferred():
+        try:
+            migrate(engine, deferred)
+        except Exception:
+            # the app serves without these; the next start retries them
+            logger.exception("Background migration failed")
+
+    thread = threading.Thread(target=run_deferred, name="migrations", daemon=True)
+    thread.start()
+    return thread
+
+def create_index(engine: Engine, statement: str) -> None:
+    """Run one ``CREATE INDEX IF NOT EXISTS`` in its own transaction, then let waiting writers in"""
+    with engine.begin() as connection:
+        connection.exec_driver_sql(statement)
+    time.sleep(CHUNK_PAUSE)
+
+def column_exists(engine: Engine, table: str, column: str) -> bool:
+    with engine.connect() as connection:
+        return any(row[1] == column for row in connection.exec_driver_sql(f"PRAGMA table_info({table})"))
+
+def backfill(
+    engine: Engine,
+    table: str,
+    assignments: str,
+    where: str | None = None,
+    chunk_size: int = BACKFILL_CHUNK,
+    pause: float = CHUNK_PAUSE,
+) -> int:
+    """
+    ``UPDATE table SET assignments [WHERE where]`` in rowid ranges of
+    ``chunk_size``, one transaction per chunk, sleeping ``pause`` between chunks.
+
+    Returns:
+        int: rows updated
+    """
+    with engine.connect() as connection:
+        last = connection.exec_driver_sql(f"SELECT max(rowid) FROM {table}").scalar() or 0
+
+    condition = f" AND ({where})" if where else ""
+    statement = f"UPDATE {table} SET {assignments} WHERE rowid > ? AND rowid <= ?{condition}"
+    updated = 0
+    for start in range(0, last, chunk_size):
+        with engine.begin() as connection:
+            updated += connection.exec_driver_sql(statement, (start, start + chunk_size)).rowcount
+        if start + chunk_size < last:
+            time.sleep(pause)
+    return updated
@@ -0,0 +1,23 @@
+"""Apply pending migrations to the configured database (``python -m app.migrations``)"""
+import argparse
+
+from app.database import engine
+from app.migrations import applied_versions, discover, migrate
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations to storage.db")
+    parser.add_argument("--status", action="store_true", help="list migrations and whether they are applied")
+    args = parser.parse_args()
+
+    if args.status:
+        applied = applied_versions(engine)
+        for migration in discover():
+            state = "applied" if migration.version in applied else "pending"
+            print(f"{migration.version:04d}_{migration.name:<40}{state:<10}{migration.description}")
+        return
+
+    for migration in migrate(engine):
+        print(f"Applied {migration.version:04d}_{migration.name}")
+
+if __name__ == "__main__":
+    main()
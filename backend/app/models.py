@@ -1,8 +1,19 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Index, Text, event, text
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from .database import Base
 
+def utcnow() -> datetime:
+    """Column default evaluated per row (a bare datetime.now() would be evaluated once, at import)"""
+    return datetime.now(timezone.utc)
+
+# a clock value in SQLAlchemy's DateTime storage format
+_CLOCK_AS_DATETIME = "strftime('%Y-%m-%d %H:%M:%S', value / 1000000, 'unixepoch') || printf('.%06d', value % 1000000)"
+
+# the stamp of rows the flush updates without them being dirty first, such as items
+# whose container is deleted: app.sync has ticked the clock for the transaction by then
+CLOCK_STAMP = text(f"(SELECT {_CLOCK_AS_DATETIME} FROM sync_clock WHERE id = 1)")
+
 class Floor(Base):
     __tablename__ = "floors"
 
@@ -10,10 +21,12 @@ class Floor(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=True)
     floor_number = Column(Integer, nullable=True)
-    created_at = Column(DateTime, default=datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=utcnow)
+    updated_at = Column(DateTime, default=utcnow, onupdate=CLOCK_STAMP, index=True) # sync stamp of the last write (app.sync)
 
     # define relationships
-    rooms = relationship("Room", back_populates="floor", cascade="all, delete-orphan") # rooms on the floor
+    # passive_deletes: ON DELETE CASCADE removes the children, so deleting a floor doesn't load them all first
+    rooms = relationship("Room", back_populates="floor", cascade="all, delete-orphan", passive_deletes=True) # rooms on the floor
 
 class Room(Base):
     __tablename__ = "rooms"
@@ -21,13 +34,14 @@ class Room(Base):
     # define base cols
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True) # name of the room
-    floor_id = Column(Integer, ForeignKey("floors.id", ondelete="CASCADE"), nullable=True) # floor the room belongs to
-    created_at = Column(DateTime, default=datetime.now(timezone.utc))
+    floor_id = Column(Integer, ForeignKey("floors.id", ondelete="CASCADE"), nullable=True, index=True) # floor the room belongs to
+    created_at = Column(DateTime, default=utcnow)
+    updated_at = Column(DateTime, default=utcnow, onupdate=CLOCK_STAMP, index=True) # sync stamp of the last write (app.sync)
 
     # define relationships
     floor = relationship("Floor", back_populates="rooms") # floor the room belongs to
-    containers = relationship("Container", back_populates="room", cascade="all, delete-orphan") # containers in the room
-    items = relationship("Item", back_populates="room", cascade="all, delete-orphan") # items in the room
+    containers = relationship("Container", back_populates="room", cascade="all, delete-orphan", passive_deletes=True) # containers in the room
+    items = relationship("Item", back_populates="room", cascade="all, delete-orphan", passive_deletes=True) # items in the room
 
 class Container(Base):
     __tablename__ = "containers"
@@ -36,7 +50,8 @@ class Container(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True) # name of the container
     qr_code_path = Column(String, nullable=True) # path to the QR code image
-    created_at = Column(DateTime, default=datetime.now(timezone.utc)) # timestamp of creation
+    created_at = Column(DateTime, default=utcnow) # timestamp of creation
+    updated_at = Column(DateTime, default=utcnow, onupdate=CLOCK_STAMP, index=True) # sync stamp of the last write (app.sync)
     room_id = Column(Integer, ForeignKey("rooms.id", ondelete="CASCADE"), nullable=True) # room the container belongs to
 
     # define relationships
@@ -44,6 +59,15 @@ class Container(Base):
     items = relationship("Item", back_populates="container") # items in the container
     photos = relationship("Photo", back_populates="container") # photos in the container
 
+    # one index per sort= order (services.containers.ContainerSort), alone and within a room;
+    # the sqlite rowid at the end of each index is the id tie-breaker
+    __table_args__ = (
+        Index("ix_containers_created_at", "created_at"),
+        Index("ix_containers_room_id", "room_id"),
+        Index("ix_containers_room_name", "room_id", "name"),
+        Index("ix_containers_room_created_at", "room_id", "created_at"),
+    )
+
     @property
     def item_count(self) -> int:
         """Return the number of items in this container"""
@@ -58,11 +82,28 @@ class Item(Base):
     room_id = Column(Integer, ForeignKey("rooms.id", ondelete="CASCADE"), nullable=False)
     name = Column(String, nullable=False, index=True) # item name
     quantity = Column(Integer, default=1) # quantity of the item
-    created_at = Column(DateTime, default=datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=utcnow)
+    updated_at = Column(DateTime, default=utcnow, onupdate=CLOCK_STAMP, index=True) # sync stamp of the last write (app.sync)
 
     room = relationship("Room", back_populates="items") # room the item belongs to
     container = relationship("Container", back_populates="items") # container the item belongs to
 
+    # one index per sort= order (services.items.ItemSort), alone and within a room or container;
+    # the sqlite rowid at the end of each index is the id tie-breaker
+    __table_args__ = (
+        Index("ix_items_quantity", "quantity"),
+        Index("ix_items_created_at", "created_at"),
+        Index("ix_items_room_id", "room_id"),
+        Index("ix_items_room_name", "room_id", "name"),
+        Index("ix_items_room_quantity", "room_id", "quantity"),
+        Index("ix_items_room_created_at", "room_id", "created_at"),
+        Index("ix_items_container_id", "container_id"),
+        Index("ix_items_container_name", "container_id", "name"),
+        Index("ix_items_container_quantity", "container_id", "quantity"),
+        Index("ix_items_container_created_at", "container_id", "created_at"),
+        Index("ix_items_container_room_name", "container_id", "room_id", "name"),
+    )
+
 class Photo(Base):
     __tablename__ = "photos"
 
@@ -70,6 +111,83 @@ class Photo(Base):
     id = Column(Integer, primary_key=True, index=True)
     container_id = Column(Integer, ForeignKey("containers.id", ondelete="CASCADE"), nullable=False)
     file_path = Column(String, nullable=False)
-    created_at = Column(DateTime, default=datetime.now(timezone.utc))
-
-    container = relationship("Container", back_populates="photos")
\ No newline at end of file
+    created_at = Column(DateTime, default=utcnow)
+
+    container = relationship("Container", back_populates="photos")
+
+class TableGeneration(Base):
+    __tablename__ = "table_generations"
+
+    # one row per mapped table, bumped in the same transaction as every write to it
+    table_name = Column(String, primary_key=True)
+    generation = Column(Integer, nullable=False, default=0)
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    # background work queued by app.jobs; payload and result are JSON text
+    id = Column(Integer, primary_key=True)
+    kind = Column(String, nullable=False) # registered handler name
+    payload = Column(Text, nullable=False, default="{}")
+    status = Column(String, nullable=False, default="queued") # queued, running, succeeded or failed
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    progress = Column(Float, nullable=False, default=0.0) # 0 to 1
+    message = Column(String, nullable=True) # latest progress note
+    result = Column(Text, nullable=True)
+    error = Column(Text, nullable=True) # last failure, kept across retries
+    run_after = Column(DateTime, nullable=False) # not claimed before this (retry backoff)
+    created_at = Column(DateTime, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    # workers look for the oldest due job in one status
+    __table_args__ = (
+        Index("ix_jobs_status_run_after", "status", "run_after"),
+    )
+
+class Tombstone(Base):
+    __tablename__ = "tombstones"
+
+    # one row per deleted synced row, written by the triggers below so ON DELETE cascades are covered too
+    id = Column(Integer, primary_key=True)
+    table_name = Column(String, nullable=False)
+    row_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, nullable=False, index=True) # sync stamp of the delete
+
+class SyncClock(Base):
+    __tablename__ = "sync_clock"
+
+    # a single row (id 1); every write transaction advances it while holding SQLite's write lock
+    id = Column(Integer, primary_key=True)
+    value = Column(Integer, nullable=False) # microseconds since the epoch, strictly increasing
+    horizon = Column(Integer, nullable=False, default=0) # tombstones stamped before this were pruned
+
+# tables served by GET /sync, in the order their changes are listed
+SYNC_TABLES = ("floors", "rooms", "containers", "items")
+
+# current time in microseconds
+_NOW_MICROSECONDS = (
+    "CAST(strftime('%s', 'now') AS INTEGER) * 1000000 + CAST(substr(strftime('%f', 'now'), 4) AS INTEGER) * 1000"
+)
+
+def tombstone_trigger(table: str) -> str:
+    return (
+        f"CREATE TRIGGER IF NOT EXISTS tombstone_{table} AFTER DELETE ON {table} BEGIN "
+        f"UPDATE sync_clock SET value = max(value + 1, {_NOW_MICROSECONDS}) WHERE id = 1; "
+        f"INSERT INTO tombstones (table_name, row_id, deleted_at) "
+        f"SELECT '{table}', OLD.id, {_CLOCK_AS_DATETIME} FROM sync_clock WHERE id = 1; "
+        f"END"
+    )
+
+START_CLOCK = f"INSERT OR IGNORE INTO sync_clock (id, value, horizon) VALUES (1, {_NOW_MICROSECONDS}, 0)"
+
+def _create_tombstone_trigger(table, connection, **kw):
+    connection.exec_driver_sql(tombstone_trigger(table.name))
+
+def _start_clock(table, connection, **kw):
+    connection.exec_driver_sql(START_CLOCK)
+
+for _name in SYNC_TABLES:
+    event.listen(Base.metadata.tables[_name], "after_create", _create_tombstone_trigger)
+event.listen(SyncClock.__table__, "after_create", _start_clock)
@@ -0,0 +1,66 @@
+import logging
+import threading
+
+from fastapi import APIRouter, HTTPException, Query
+
+from .. import backups, jobs, maintenance, slow_queries
+from ..cache import cache_stats
+from ..schemas.jobs import JobResponse
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+@router.get("/cache")
+def get_cache_stats():
+    """Hit/miss statistics for the in-process caches"""
+    return cache_stats()
+
+@router.get("/slow-queries")
+def get_slow_queries(limit: int = Query(20, ge=1, le=200)):
+    """Logged slow statements grouped by shape, worst total time first"""
+    return {
+        "threshold_ms": slow_queries.SLOW_QUERY_MS,
+        "shapes": slow_queries.aggregate(slow_queries.log.read(), limit),
+    }
+
+@router.get("/backups")
+def get_backups():
+    """Backup manifests, newest first, whether one is being written, and the last failure"""
+    return {"running": backups.backup_running(), "last_error": backups.last_error, "backups": backups.list_backups()}
+
+@router.post("/backups", status_code=202)
+def start_backup():
+    """Start an online backup in the background; poll GET /admin/backups for the result"""
+    if backups.backup_running():
+        raise HTTPException(status_code=409, detail="A backup is already running")
+
+    def run():
+        try:
+            backups.create_backup()
+        except backups.BackupInProgress:
+            pass
+        except Exception:
+            # kept in backups.last_error for GET /admin/backups
+            logger.exception("Backup failed")
+
+    threading.Thread(target=run, name="backup", daemon=True).start()
+    return {"status": "started"}
+
+@router.post("/backups/{name}/verify")
+def verify_backup(name: str):
+    """Restore a backup to a temporary file and check its integrity and row counts"""
+    try:
+        return backups.verify_backup(name)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Backup not found")
+
+@router.get("/maintenance")
+def get_maintenance():
+    """Whether the app is idle enough for maintenance, and the last run of each task"""
+    return maintenance.report()
+
+@router.post("/qr-codes", status_code=202, response_model=JobResponse)
+def regenerate_qr_codes():
+    """Queue a job rendering every missing container QR code; poll GET /jobs/{id} for progress"""
+    return jobs.queue.get(jobs.queue.enqueue("regenerate_qr_codes"))
@@ -1,7 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 
 from ..database import get_db
+from ..etags import etag
+from ..fieldsets import Fieldset, fieldset_query
+from ..serialization import json_response
 from ..schemas.containers import (
     ContainerCreate,
     ContainerUpdate,
@@ -14,11 +18,22 @@ from ..schemas.containers import (
 )
 from ..schemas.items import ItemResponse
 from ..services import containers as containers_service
+from ..services.containers import ContainerSort
+from ..services.items import ItemSort
+from ..services.pagination import TotalMode
 
 router = APIRouter()
 
-@router.get("/search", response_model=list[ContainerOption])
+_container_options = TypeAdapter(list[ContainerOption])
+
+container_fieldset = fieldset_query(containers_service.CONTAINER_FIELDS, containers_service.CONTAINER_INCLUDES)
+container_detail_fieldset = fieldset_query(
+    containers_service.CONTAINER_FIELDS, containers_service.CONTAINER_DETAIL_INCLUDES
+)
+
+@router.get("/search", response_model=list[ContainerOption], dependencies=[Depends(etag("containers"))])
 def search_containers(
+    response: Response,
     q: str = Query(..., min_length=1),
     rooms: str | None = Query(None),
     db: Session = Depends(get_db)
@@ -26,26 +41,35 @@ def search_containers(
     """Search containers by name, optionally filtered by rooms"""
     room_ids = [int(r) for r in rooms.split(",")] if rooms else None
     containers = containers_service.search_containers(db, q, room_ids)
-    return [ContainerOption.model_validate(c) for c in containers]
+    options = _container_options.validate_python(containers, from_attributes=True)
+    return json_response(options, response, _container_options)
 
 @router.post("/", response_model=ContainerResponse)
 def create_container(data: ContainerCreate, db: Session = Depends(get_db)): # create a new container
     """Create a new container and generate its QR code"""
     return containers_service.create_container(db, data)
 
-@router.get("/", response_model=PaginatedContainerResponse)
+@router.get("/", response_model=PaginatedContainerResponse, dependencies=[Depends(etag("containers", "rooms", "items"))])
 def list_containers(
+    response: Response,
     page: int = Query(1, ge=1),
     name: str | None = Query(None),
     rooms: str | None = Query(None),
+    total: TotalMode = Query(TotalMode.exact),
+    sort: ContainerSort = Query(ContainerSort.id),
+    fieldset: Fieldset | None = Depends(container_fieldset),
     db: Session = Depends(get_db)
 ):
     """List all containers with optional filters"""
     room_ids = [int(r) for r in rooms.split(",")] if rooms else None
-    return containers_service.list_containers_paginated(db, page=page, name=name, rooms=room_ids)
+    result = containers_service.list_containers_paginated(
+        db, page=page, name=name, rooms=room_ids, total_mode=total, fieldset=fieldset, sort=sort
+    )
+    return json_response(result, response)
 
-@router.get("/all", response_model=ContainerOptionsResponse)
+@router.get("/all", response_model=ContainerOptionsResponse, dependencies=[Depends(etag("containers"))])
 def list_all_containers(
+    response: Response,
     limit: int = Query(200, ge=1, le=500),
     rooms: str | None = Query(None),
     db: Session = Depends(get_db)
@@ -53,20 +77,39 @@ def list_all_containers(
     """List all containers up to a limit (for dropdowns), optionally filtered by rooms"""
     room_ids = [int(r) for r in rooms.split(",")] if rooms else None
     containers, total, has_more = containers_service.list_all_containers(db, limit=limit, room_ids=room_ids)
-    return ContainerOptionsResponse(
-        data=[ContainerOption.model_validate(c) for c in containers],
-        total=total,
-        hasMore=has_more,
+    return json_response(
+        ContainerOptionsResponse.model_construct(data=containers, total=total, hasMore=has_more),
+        response,
     )
 
-@router.get("/{container_id}", response_model=ContainerDetailResponse)
-def get_container(container_id: int, db: Session = Depends(get_db)):
-    """Get a container with all its items and photos"""
-    container = containers_service.get_container_detail(db, container_id)
+@router.get("/{container_id}", response_model=ContainerDetailResponse, dependencies=[Depends(etag("containers", "rooms", "items"))])
+def get_container(
+    container_id: int,
+    response: Response,
+    items_page: int = Query(1, ge=1),
+    items_page_size: int = Query(containers_service.ITEMS_PAGE_SIZE, ge=1, le=200),
+    items_cursor: str | None = Query(None, description="items_next_cursor of the previous page"),
+    items_sort: ItemSort = Query(ItemSort.id),
+    fieldset: Fieldset | None = Depends(container_detail_fieldset),
+    db: Session = Depends(get_db)
+):
+    """Get a container with one page of its items"""
+    try:
+        container = containers_service.get_container_detail(
+            db,
+            container_id,
+            fieldset,
+            items_page=items_page,
+            items_page_size=items_page_size,
+            items_cursor=items_cursor,
+            items_sort=items_sort,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not container:
         raise HTTPException(status_code=404, detail="Container not found")
 
-    return container
+    return json_response(container, response)
 
 @router.put("/{container_id}")
 def update_container(container_id: int, data: ContainerUpdate, db: Session = Depends(get_db)):
@@ -1,23 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 from ..database import get_db
+from ..etags import etag
+from ..serialization import json_response
 from ..services import floors as floors_service
+from ..services.pagination import TotalMode
 from ..schemas.floors import FloorCreate, FloorUpdate, FloorResponse, PaginatedFloorResponse
 from ..schemas.rooms import RoomOption
 
 router = APIRouter()
 
+_room_options = TypeAdapter(list[RoomOption])
+
 @router.post("/", response_model=FloorResponse)
 def create_floor(data: FloorCreate, db: Session = Depends(get_db)):
     """Create a new floor"""
     return floors_service.create_floor(db, data)
 
-@router.get("/", response_model=PaginatedFloorResponse)
-def list_floors(page: int = Query(1, ge=1),db: Session = Depends(get_db)):
+@router.get("/", response_model=PaginatedFloorResponse, dependencies=[Depends(etag("floors", "rooms"))])
+def list_floors(
+    response: Response,
+    page: int = Query(1, ge=1),
+    total: TotalMode = Query(TotalMode.exact),
+    db: Session = Depends(get_db)
+):
     """List all floors"""
-    return floors_service.list_floors_paginated(db, page=page)
+    return json_response(floors_service.list_floors_paginated(db, page=page, total_mode=total), response)
 
-@router.get("/{floor_id}", response_model=FloorResponse)
+@router.get("/{floor_id}", response_model=FloorResponse, dependencies=[Depends(etag("floors", "rooms", "containers", "items"))])
 def get_floor(floor_id: int, db: Session = Depends(get_db)):
     """Get a floor by ID"""
     floor = floors_service.get_floor_detail(db, floor_id)
@@ -36,21 +47,21 @@ def update_floor(floor_id: int, data: FloorUpdate, db: Session = Depends(get_db)
     
     return floor
 
-@router.get("/{floor_id}/rooms", response_model=list[RoomOption])
-def get_floor_rooms(floor_id: int, db: Session = Depends(get_db)):
+@router.get("/{floor_id}/rooms", response_model=list[RoomOption], dependencies=[Depends(etag("floors", "rooms"))])
+def get_floor_rooms(floor_id: int, response: Response, db: Session = Depends(get_db)):
     """Get all rooms for a floor"""
     
-    if not floors_service.get_floor(db, floor_id):
+    if not floors_service.floor_exists(db, floor_id):
         raise HTTPException(status_code=404, detail="Floor not found")
 
-    return floors_service.get_rooms_for_floor(db, floor_id)
+    return json_response(floors_service.get_rooms_for_floor(db, floor_id), response, _room_options)
 
 @router.delete("/{floor_id}")
-async def delete_floor(floor_id: int, db: Session = Depends(get_db)):
+def delete_floor(floor_id: int, db: Session = Depends(get_db)):
     """Delete a floor by ID"""
     try:
-        await floors_service.delete_floor(db, floor_id)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        floors_service.delete_floor(db, floor_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
         
     return {"message": "Floor deleted successfully"}
\ No newline at end of file
@@ -1,12 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from ..database import get_db
-from ..schemas.items import ItemCreate, ItemUpdate, ItemResponse
+from ..etags import etag
+from ..fieldsets import Fieldset, fieldset_query
+from ..serialization import json_response
+from ..schemas.items import ItemCreate, ItemUpdate, ItemResponse, PaginatedItemResponse
 from ..services import items as items_service
+from ..services.items import ItemSort
+from ..services.pagination import TotalMode
 
 router = APIRouter()
 
+item_fieldset = fieldset_query(items_service.ITEM_FIELDS, items_service.ITEM_INCLUDES)
+
 @router.post("/", response_model=ItemResponse, status_code=201)
 def create_item(data: ItemCreate, db: Session = Depends(get_db)):
     """Create a new item assigned to a room and optionally a container."""
@@ -19,12 +26,16 @@ def create_item(data: ItemCreate, db: Session = Depends(get_db)):
     
     return item
 
-@router.get("/")
+@router.get("/", response_model=PaginatedItemResponse, dependencies=[Depends(etag("items", "rooms", "containers"))])
 def get_items(
+        response: Response,
         page: int = Query(1, ge=1),
         name: str | None = Query(None),
         rooms: str | None = Query(None),
         containers: str | None = Query(None),
+        total: TotalMode = Query(TotalMode.exact),
+        sort: ItemSort = Query(ItemSort.id),
+        fieldset: Fieldset | None = Depends(item_fieldset),
         db: Session = Depends(get_db)
     ):
     """Get all items with optional filters"""
@@ -32,7 +43,7 @@ def get_items(
     container_ids = [int(c) for c in containers.split(",")] if containers else None
     
     result, error = items_service.get_items_paginated(
-        db, page=page, name=name, rooms=room_ids, containers=container_ids
+        db, page=page, name=name, rooms=room_ids, containers=container_ids, total_mode=total, fieldset=fieldset, sort=sort
     )
     
     if error == "container_room_mismatch":
@@ -41,16 +52,21 @@ def get_items(
             detail="One or more containers do not belong to the specified rooms"
         )
     
-    return result
+    return json_response(result, response)
 
 
-@router.get("/{item_id}", response_model=ItemResponse)
-def get_item(item_id: int, db: Session = Depends(get_db)):
+@router.get("/{item_id}", response_model=ItemResponse, dependencies=[Depends(etag("items", "rooms", "containers"))])
+def get_item(
+    item_id: int,
+    response: Response,
+    fieldset: Fieldset | None = Depends(item_fieldset),
+    db: Session = Depends(get_db)
+):
     """Get a single item by ID"""
-    item = items_service.get_item(db, item_id)
+    item = items_service.get_item(db, item_id, fieldset)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
-    return item
+    return json_response(item, response)
 
 
 @router.put("/{item_id}")
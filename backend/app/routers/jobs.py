@@ -0,0 +1,15 @@
+from fastapi import APIRouter, HTTPException
+
+from .. import jobs
+from ..schemas.jobs import JobResponse
+
+router = APIRouter()
+
+@router.get("/{job_id}", response_model=JobResponse)
+def get_job(job_id: int):
+    """Get a background job's status, progress and result"""
+    job = jobs.queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return job
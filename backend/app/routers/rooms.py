@@ -1,48 +1,73 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 
 from ..database import get_db
+from ..etags import etag
+from ..fieldsets import Fieldset, fieldset_query
+from ..serialization import json_response
 from ..schemas.rooms import RoomCreate, RoomUpdate, RoomResponse, RoomItemCreate, PaginatedRoomResponse, RoomOption, RoomOptionsResponse
 from ..schemas.containers import ContainerOption
 from ..schemas.items import ItemResponse, PaginatedItemResponse
+from ..services import items as items_service
 from ..services import rooms as rooms_service
+from ..services.items import ItemSort
+from ..services.pagination import TotalMode
 
 router = APIRouter()
 
-@router.get("/search", response_model=list[RoomOption])
-def search_rooms(q: str = Query(..., min_length=1), db: Session = Depends(get_db)):
+_room_options = TypeAdapter(list[RoomOption])
+_container_options = TypeAdapter(list[ContainerOption])
+
+room_fieldset = fieldset_query(rooms_service.ROOM_FIELDS)
+item_fieldset = fieldset_query(items_service.ITEM_FIELDS, items_service.ITEM_INCLUDES)
+
+@router.get("/search", response_model=list[RoomOption], dependencies=[Depends(etag("rooms"))])
+def search_rooms(response: Response, q: str = Query(..., min_length=1), db: Session = Depends(get_db)):
     """Search rooms by name"""
     rooms = rooms_service.search_rooms(db, q)
-    return [RoomOption.model_validate(r) for r in rooms]
+    options = _room_options.validate_python(rooms, from_attributes=True)
+    return json_response(options, response, _room_options)
 
 @router.post("/", response_model=RoomResponse)
 def create_room(data: RoomCreate, db: Session = Depends(get_db)):
     """Create a new room"""
     return rooms_service.create_room(db, data)
 
-@router.get("/", response_model=PaginatedRoomResponse)
-def list_rooms(page: int = Query(1, ge=1), db: Session = Depends(get_db)):
+@router.get("/", response_model=PaginatedRoomResponse, dependencies=[Depends(etag("rooms", "containers", "items"))])
+def list_rooms(
+    response: Response,
+    page: int = Query(1, ge=1),
+    total: TotalMode = Query(TotalMode.exact),
+    fieldset: Fieldset | None = Depends(room_fieldset),
+    db: Session = Depends(get_db)
+):
     """List all rooms paginated"""
-    return rooms_service.get_rooms_paginated(db, page=page)
+    result = rooms_service.get_rooms_paginated(db, page=page, total_mode=total, fieldset=fieldset)
+    return json_response(result, response)
 
-@router.get("/all", response_model=RoomOptionsResponse)
-def list_all_rooms(limit: int = Query(200, ge=1, le=500), db: Session = Depends(get_db)):
+@router.get("/all", response_model=RoomOptionsResponse, dependencies=[Depends(etag("rooms"))])
+def list_all_rooms(response: Response, limit: int = Query(200, ge=1, le=500), db: Session = Depends(get_db)):
     """List all rooms up to a limit (for dropdowns)"""
     rooms, total, has_more = rooms_service.list_all_rooms(db, limit=limit)
-    return RoomOptionsResponse(
-        data=[RoomOption.model_validate(r) for r in rooms],
-        total=total,
-        hasMore=has_more,
+    return json_response(
+        RoomOptionsResponse.model_construct(data=rooms, total=total, hasMore=has_more),
+        response,
     )
 
-@router.get("/{room_id}", response_model=RoomResponse)
-def get_room(room_id: int, db: Session = Depends(get_db)):
+@router.get("/{room_id}", response_model=RoomResponse, dependencies=[Depends(etag("rooms", "containers", "items"))])
+def get_room(
+    room_id: int,
+    response: Response,
+    fieldset: Fieldset | None = Depends(room_fieldset),
+    db: Session = Depends(get_db)
+):
     """Get a room by ID"""
-    room = rooms_service.get_room_detail(db, room_id)
+    room = rooms_service.get_room_detail(db, room_id, fieldset)
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
     
-    return room
+    return json_response(room, response)
 
 @router.put("/{room_id}", response_model=RoomResponse)
 def update_room(room_id: int, data: RoomUpdate, db: Session = Depends(get_db)):
@@ -53,13 +78,13 @@ def update_room(room_id: int, data: RoomUpdate, db: Session = Depends(get_db)):
     
     return room
 
-@router.get("/{room_id}/containers", response_model=list[ContainerOption])
-def get_room_containers(room_id: int, db: Session = Depends(get_db)):
+@router.get("/{room_id}/containers", response_model=list[ContainerOption], dependencies=[Depends(etag("rooms", "containers"))])
+def get_room_containers(room_id: int, response: Response, db: Session = Depends(get_db)):
     """Get all containers for a room"""
-    if not rooms_service.get_room(db, room_id):
+    if not rooms_service.room_exists(db, room_id):
         raise HTTPException(status_code=404, detail="Room not found")
 
-    return rooms_service.get_containers_for_room(db, room_id)
+    return json_response(rooms_service.get_containers_for_room(db, room_id), response, _container_options)
 
 @router.post("/{room_id}/items", response_model=ItemResponse)
 def create_item(room_id: int, data: RoomItemCreate, db: Session = Depends(get_db)):
@@ -70,17 +95,23 @@ def create_item(room_id: int, data: RoomItemCreate, db: Session = Depends(get_db
         raise HTTPException(status_code=404, detail="Room not found")
     return item
 
-@router.get("/{room_id}/items", response_model=PaginatedItemResponse)
+@router.get("/{room_id}/items", response_model=PaginatedItemResponse, dependencies=[Depends(etag("rooms", "containers", "items"))])
 def list_items(
     room_id: int,
-    page: int = 1,
-    page_size: int = 50,
+    response: Response,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1),
+    total: TotalMode = Query(TotalMode.exact),
+    sort: ItemSort = Query(ItemSort.id),
+    fieldset: Fieldset | None = Depends(item_fieldset),
     db: Session = Depends(get_db)
 ):
     """List all items in a room (paginated)"""
-    items = rooms_service.list_items_in_room(db, room_id, page=page, page_size=page_size)
+    items = rooms_service.list_items_in_room(
+        db, room_id, page=page, page_size=page_size, total_mode=total, fieldset=fieldset, sort=sort
+    )
 
     if not items:
         raise HTTPException(status_code=404, detail="Room not found")
 
-    return items
+    return json_response(items, response)
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from ..database import get_db
+from ..serialization import json_response
+from ..services import sync as sync_service
+from ..schemas.sync import SyncResponse
+
+router = APIRouter()
+
+@router.get("", response_model=SyncResponse)
+def get_changes(
+    since: str | None = Query(None, description="token from the previous response; omit for a full sync"),
+    limit: int = Query(sync_service.BATCH_SIZE, ge=1, le=5000),
+    db: Session = Depends(get_db),
+):
+    """Rows created, updated or deleted since a sync token, in batches"""
+    try:
+        return json_response(sync_service.changes_since(db, since, limit))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -27,9 +27,10 @@ class ContainerResponse(BaseModel):
 
 class PaginatedContainerResponse(BaseModel):
     data: list[ContainerResponse]
-    total: int
+    total: int | None = None  # None when requested with total=none
     page: int
     pageSize: int
+    hasMore: bool = False
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -50,7 +51,10 @@ class ContainerOptionsResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 class ContainerDetailResponse(ContainerResponse):
-    items: list[ItemResponse]
+    items: list[ItemResponse]  # one page of items, see items_page/items_cursor
+    items_total: int = 0
+    items_has_more: bool = False
+    items_next_cursor: str | None = None
 
 class ContainerItemCreate(ItemCreateBase):
     """Schema for creating items within a container context (container_id from URL)."""
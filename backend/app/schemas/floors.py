@@ -1,5 +1,5 @@
 from datetime import datetime, timezone
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from .rooms import RoomResponse
 
 class FloorCreate(BaseModel):
@@ -14,7 +14,7 @@ class FloorResponse(BaseModel):
     id: int
     name: str | None = None
     floor_number: int | None = None
-    created_at: datetime = datetime.now(timezone.utc)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     room_count: int = 0
     rooms: list[RoomResponse] | None = None
 
@@ -22,8 +22,9 @@ class FloorResponse(BaseModel):
 
 class PaginatedFloorResponse(BaseModel):
     data: list[FloorResponse]
-    total: int
+    total: int | None = None  # None when requested with total=none
     page: int
     pageSize: int
+    hasMore: bool = False
 
     model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
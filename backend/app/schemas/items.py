@@ -1,5 +1,5 @@
 from datetime import datetime, timezone
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 class ItemRoomResponse(BaseModel):
     id: int
@@ -35,7 +35,7 @@ class ItemResponse(BaseModel):
     room_id: int
     container_id: int | None = None
     quantity: int
-    created_at: datetime = datetime.now(timezone.utc)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     room: ItemRoomResponse
     container: ItemContainerResponse | None = None
 
@@ -43,8 +43,9 @@ class ItemResponse(BaseModel):
 
 class PaginatedItemResponse(BaseModel):
     data: list[ItemResponse]
-    total: int
+    total: int | None = None  # None when requested with total=none
     page: int
     pageSize: int
+    hasMore: bool = False
 
     model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,19 @@
+from datetime import datetime
+from typing import Any
+from pydantic import BaseModel
+
+class JobResponse(BaseModel):
+    id: int
+    kind: str
+    status: str  # queued, running, succeeded or failed
+    payload: dict[str, Any]
+    attempts: int
+    max_attempts: int
+    progress: float
+    message: str | None = None
+    result: Any = None
+    error: str | None = None
+    run_after: datetime
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
@@ -1,5 +1,5 @@
 from datetime import datetime, timezone
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 from .items import PaginatedItemResponse, ItemCreateBase
 
@@ -15,7 +15,7 @@ class RoomResponse(BaseModel):
     id: int
     name: str | None = None
     floor_id: int | None = None
-    created_at: datetime = datetime.now(timezone.utc)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     container_count: int | None = None
     item_count: int | None = None
 
@@ -23,9 +23,10 @@ class RoomResponse(BaseModel):
 
 class PaginatedRoomResponse(BaseModel):
     data: list[RoomResponse]
-    total: int
+    total: int | None = None  # None when requested with total=none
     page: int
     pageSize: int
+    hasMore: bool = False
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -0,0 +1,10 @@
+from typing import Any
+from pydantic import BaseModel
+
+class PaginatedSparseResponse(BaseModel):
+    """Paginated rows shaped by the fields= / include= query parameters"""
+    data: list[dict[str, Any]]
+    total: int | None = None  # None when requested with total=none
+    page: int
+    pageSize: int
+    hasMore: bool = False
@@ -0,0 +1,13 @@
+from typing import Any
+from pydantic import BaseModel
+
+class TableChanges(BaseModel):
+    columns: list[str]
+    rows: list[list[Any]]
+
+class SyncResponse(BaseModel):
+    token: str  # pass as since= on the next call
+    more: bool  # another batch is ready; call again right away
+    reset: bool  # drop the local copy before applying this batch
+    changes: dict[str, TableChanges]  # created or updated rows per table
+    deleted: dict[str, list[int]]  # deleted ids per table, applied before changes
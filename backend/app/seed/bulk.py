@@ -0,0 +1,166 @@
+"""
+Deterministic bulk seeding for benchmark datasets.
+
+Builds a household of roughly ``scale`` items in seconds: names are drawn with
+one ``random.choices`` call per column over Faker's preloaded word list, ids are
+assigned up front so foreign keys never need reading back, and rows go in
+through Core executemany in large chunks after the schema is dropped and
+recreated. The same ``scale`` and ``seed`` always produce the same rows.
+"""
+import random
+import re
+from datetime import datetime, timedelta
+
+from faker.providers.lorem.en_US import Provider as LoremProvider
+from sqlalchemy import Engine, inspect
+
+from app import generations, sync
+from app.database import Base
+from app.models import Container, Floor, Item, Room
+
+VOCABULARY = tuple(word.title() for word in LoremProvider.word_list)
+
+ITEMS_PER_CONTAINER = 16  # the Faker seed uses 2-30
+CONTAINERS_PER_ROOM = 65  # the Faker seed uses 30-100
+ROOMS_PER_FLOOR = 3
+LOOSE_ITEM_RATIO = 0.05  # items lying in a room outside any container
+
+CHUNK_SIZE = 50_000
+
+# the data is rebuilt from scratch on failure, so skip fsyncs, and give the
+# index builds memory and helper threads to sort with
+BULK_PRAGMAS = {"synchronous": "OFF", "temp_store": "MEMORY", "cache_size": -262144, "threads": 4}
+
+# fixed so the same seed gives the same timestamps on every run
+CREATED_FROM = datetime(2023, 1, 1)
+CREATED_SPAN_SECONDS = 2 * 365 * 24 * 3600
+
+_SCALE = re.compile(r"^(\d+(?:\.\d+)?)([kKmM]?)$")
+
+def parse_scale(value: str) -> int:
+    """Parse an item count such as ``5000``, ``100k`` or ``1M``"""
+    match = _SCALE.match(value.strip())
+    if not match:
+        raise ValueError(f"Invalid scale: {value!r} (expected e.g. 1000, 100k, 1M)")
+
+    number, suffix = match.groups()
+    multiplier = {"": 1, "k": 1_000, "m": 1_000_000}[suffix.lower()]
+    return int(float(number) * multiplier)
+
+def _created_at(rng: random.Random, count: int) -> list[str]:
+    """Random timestamps, pre-rendered in the DateTime storage format SQLAlchemy uses for SQLite"""
+    offsets = rng.choices(range(CREATED_SPAN_SECONDS), k=count)
+    return [(CREATED_FROM + timedelta(seconds=offset)).isoformat(" ", "microseconds") for offset in offsets]
+
+def _set_pragmas(connection, pragmas: dict) -> None:
+    """Set each ``PRAGMA name = value`` on this connection"""
+    for name, value in pragmas.items():
+        connection.exec_driver_sql(f"PRAGMA {name} = {value}")
+
+def _insert(connection, table, columns: tuple[str, ...], rows: list[tuple]) -> None:
+    """executemany plain tuples of ``columns``, skipping SQLAlchemy's per-row bind processing"""
+    statement = f"INSERT INTO {table.name} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    for start in range(0, len(rows), CHUNK_SIZE):
+        connection.exec_driver_sql(statement, rows[start:start + CHUNK_SIZE])
+
+def seed_bulk(engine: Engine, scale: int, seed: int = 0) -> dict[str, int]:
+    """
+    Drop and recreate the schema, then seed about ``scale`` items.
+
+    Returns:
+        dict: row counts per table
+    """
+    rng = random.Random(seed)
+
+    container_count = max(1, round(scale * (1 - LOOSE_ITEM_RATIO) / ITEMS_PER_CONTAINER))
+    room_count = max(1, -(-container_count // CONTAINERS_PER_ROOM))
+    floor_count = max(1, -(-room_count // ROOMS_PER_FLOOR))
+
+    floors = [
+        (i, f"Floor {i - 1}", i - 1, CREATED_FROM.isoformat(" ", "microseconds"), CREATED_FROM.isoformat(" ", "microseconds"))
+        for i in range(1, floor_count + 1)
+    ]
+
+    room_ids = range(1, room_count + 1)
+    rooms = [
+        (id, f"{name} Room", (id - 1) // ROOMS_PER_FLOOR + 1, created_at, created_at)
+        for id, name, created_at in zip(
+            room_ids, rng.choices(VOCABULARY, k=room_count), _created_at(rng, room_count)
+        )
+    ]
+
+    container_ids = range(1, container_count + 1)
+    container_rooms = rng.choices(room_ids, k=container_count)
+    containers = [
+        (id, f"{name} Bin", room_id, created_at, created_at)
+        for id, name, room_id, created_at in zip(
+            container_ids,
+            rng.choices(VOCABULARY, k=container_count),
+            container_rooms,
+            _created_at(rng, container_count),
+        )
+    ]
+
+    # each item picks a container (and so its room), or is loose in a random room
+    loose = round(scale * LOOSE_ITEM_RATIO)
+    item_containers = rng.choices(container_ids, k=scale - loose) + [None] * loose
+    loose_rooms = iter(rng.choices(room_ids, k=loose))
+    items = [
+        (
+            id,
+            name,
+            container_id,
+            container_rooms[container_id - 1] if container_id is not None else next(loose_rooms),
+            quantity,
+            created_at,
+            created_at,
+        )
+        for id, name, container_id, quantity, created_at in zip(
+            range(1, scale + 1),
+            rng.choices(VOCABULARY, k=scale),
+            item_containers,
+            rng.choices(range(1, 101), k=scale),
+            _created_at(rng, scale),
+        )
+    ]
+
+    tables = {
+        # never updated, so updated_at is the creation time (always before the sync clock, which starts now)
+        Floor.__table__: (("id", "name", "floor_number", "created_at", "updated_at"), floors),
+        Room.__table__: (("id", "name", "floor_id", "created_at", "updated_at"), rooms),
+        Container.__table__: (("id", "name", "room_id", "created_at", "updated_at"), containers),
+        Item.__table__: (("id", "name", "container_id", "room_id", "quantity", "created_at", "updated_at"), items),
+    }
+    indexes = [index for table in tables for index in table.indexes]
+
+    with engine.connect() as connection:
+        # tokens handed out before the reseed are up to this clock value
+        previous = sync.clock(connection)[0] if inspect(connection).has_table("sync_clock") else 0
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    with engine.connect() as connection:
+        # PRAGMAs stay set on the pooled connection, so note them to put back afterwards
+        pragmas = {name: connection.exec_driver_sql(f"PRAGMA {name}").scalar() for name in BULK_PRAGMAS}
+        _set_pragmas(connection, BULK_PRAGMAS)
+        connection.commit()
+        try:
+            with connection.begin():
+                # building each index once over sorted keys beats updating a dozen indexes per row
+                for index in indexes:
+                    index.drop(connection)
+                for table, (columns, rows) in tables.items():
+                    _insert(connection, table, columns, rows)
+                for index in indexes:
+                    index.create(connection)
+
+                # Core inserts skip the session listeners, so bump generations by hand
+                generations.bump(connection, Base.metadata.tables)
+                # nor are the replaced rows tombstoned: every existing sync token must reset
+                sync.restart(connection, previous)
+        finally:
+            # outside the transaction: SQLite refuses to change temp_store inside one
+            _set_pragmas(connection, pragmas)
+            connection.commit()
+
+    return {table.name: len(rows) for table, (_, rows) in tables.items()}
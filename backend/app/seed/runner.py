@@ -1,12 +1,19 @@
-from app.database import Base, SessionLocal, engine
+import argparse
+import time
+
+from app import generations  # bump table generations so running workers drop their caches
+from app import sync  # stamp the rows so sync clients pick them up
+from app.database import SessionLocal, engine
+from app.migrations import migrate
 from app.models import Floor, Room, Container, Item
+from app.seed.bulk import parse_scale, seed_bulk
 from app.seed.floors import seed_floors
 from app.seed.rooms import seed_rooms
 from app.seed.containers import seed_containers
 from app.seed.items import seed_items
 
-def main():
-    Base.metadata.create_all(bind=engine)
+def seed_sample():
+    migrate(engine)
 
     db = SessionLocal()
 
@@ -28,5 +35,24 @@ def main():
     finally:
         db.close()
 
+def main():
+    parser = argparse.ArgumentParser(description="Reset and seed the database")
+    parser.add_argument(
+        "--scale",
+        type=parse_scale,
+        help="bulk-seed about this many items (e.g. 1k, 100k, 1M) instead of the Faker sample",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="random seed for --scale (default: 0)")
+    args = parser.parse_args()
+
+    if args.scale is None:
+        seed_sample()
+        return
+
+    start = time.perf_counter()
+    counts = seed_bulk(engine, args.scale, args.seed)
+    elapsed = time.perf_counter() - start
+    print(", ".join(f"{count} {table}" for table, count in counts.items()) + f" seeded in {elapsed:.1f}s.")
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
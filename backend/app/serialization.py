@@ -0,0 +1,36 @@
+"""
+Fast JSON responses for list endpoints.
+
+FastAPI normally dumps a returned model to a dict, re-validates it against
+``response_model``, serializes it again and finally runs ``json.dumps`` (in a
+threadpool for sync routes). List endpoints build their payload once from
+row-tuple projections and encode it here in a single pydantic-core call; the
+``response_model`` on the route is kept for the OpenAPI docs.
+"""
+from typing import Any
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import to_json
+
+from . import timing
+
+def json_response(content: Any, response: Response | None = None, adapter: TypeAdapter | None = None) -> Response:
+    """
+    Encode ``content`` as a JSON response.
+
+    Args:
+        content: a pydantic model, or plain lists/dicts of JSON-compatible values
+        response: the route's injected ``Response``, whose headers (e.g. ETag) are copied
+        adapter: optional ``TypeAdapter`` used to encode ``content``
+    """
+    with timing.phase("serialize"):
+        if adapter is not None:
+            body = adapter.dump_json(content)
+        elif isinstance(content, BaseModel):
+            body = content.model_dump_json()
+        else:
+            body = to_json(content)
+
+    headers = dict(response.headers) if response is not None else None
+    return Response(content=body, media_type="application/json", headers=headers)
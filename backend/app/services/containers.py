@@ -1,25 +1,76 @@
 import os
+from datetime import datetime
+from enum import nonmember
+from typing import Callable
 
-import qrcode
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session, joinedload
 
-from ..database import DATA_DIR
-from ..models import Container, Item
+from .. import jobs, metrics, timing
+from ..cache import normalize_key
+from ..database import DATA_DIR, SessionLocal
+from ..fieldsets import Fieldset
+from ..models import Container, Item, Room
 from ..schemas.containers import (
     ContainerCreate,
     ContainerUpdate,
     ContainerResponse,
     ContainerDetailResponse,
     ContainerItemCreate,
+    ContainerOption,
     PaginatedContainerResponse,
 )
 from ..schemas.items import ItemResponse
+from ..schemas.sparse import PaginatedSparseResponse
+from . import items as items_service
+from . import options
+from .items import ItemSort
+from .pagination import (
+    Paginator,
+    SortOrder,
+    TotalMode,
+    after_keyset,
+    decode_cursor,
+    encode_cursor,
+    fetch_by_ids,
+)
 
-# QR codes directory
+# QR codes directory, created at startup (main.lifespan)
 QR_DIR = os.path.join(DATA_DIR, "qr_codes")
-os.makedirs(QR_DIR, exist_ok=True)
 
 PAGE_SIZE = 25
+ITEMS_PAGE_SIZE = 50
+QR_BATCH = 50  # QR paths committed (and progress reported) per batch while regenerating
+
+CONTAINER_FIELDS = ("id", "name", "room_id", "qr_code_path", "item_count")
+CONTAINER_INCLUDES = ("room",)
+CONTAINER_DETAIL_INCLUDES = ("room", "items")
+DEFAULT_FIELDSET = Fieldset(CONTAINER_FIELDS, frozenset(CONTAINER_INCLUDES))
+
+_COLUMNS = {
+    "id": Container.id,
+    "name": Container.name,
+    "room_id": Container.room_id,
+    "qr_code_path": Container.qr_code_path,
+}
+
+_paginator = Paginator("container", ["containers"])
+
+class ContainerSort(SortOrder):
+    """Container orders; ``room`` groups by room (by id), then by name"""
+    id = "id"
+    name = "name"
+    name_desc = "-name"
+    created_at = "created_at"
+    created_at_desc = "-created_at"
+    room = "room"
+
+    sort_columns = nonmember({
+        "id": (),
+        "name": (Container.name,),
+        "created_at": (Container.created_at,),
+        "room": (Container.room_id, Container.name),
+    })
 
 def create_container(db: Session, data: ContainerCreate) -> ContainerResponse:
     """Create a new container"""
@@ -29,29 +80,71 @@ def create_container(db: Session, data: ContainerCreate) -> ContainerResponse:
     db.commit()
     db.refresh(container)
 
-    qr_filename = f"container_{container.id}.png"
-    qr_path = os.path.join(QR_DIR, qr_filename)
-
-    qr_url = f"/containers/{container.id}"
-    qr = qrcode.make(qr_url)
-    qr.save(qr_path)
-
-    container.qr_code_path = f"/static/qr_codes/{qr_filename}"
+    container.qr_code_path = render_qr_code(container.id)
     db.commit()
     db.refresh(container)
 
     return ContainerResponse.model_validate(container)
 
+def render_qr_code(container_id: int) -> str:
+    """Write the QR code image for a container and return its ``/static`` path"""
+    qr_filename = f"container_{container_id}.png"
+    qr_path = os.path.join(QR_DIR, qr_filename)
+
+    qr_url = f"/containers/{container_id}"
+    with timing.phase("qr"), metrics.render_time.time("qr"):
+        # qrcode pulls in PIL, which startup shouldn't pay for
+        import qrcode
+
+        qr = qrcode.make(qr_url)
+        qr.save(qr_path)
+
+    return f"/static/qr_codes/{qr_filename}"
+
+def regenerate_qr_codes(db: Session, progress: Callable[[float, str | None], None] | None = None) -> dict:
+    """
+    Render the QR code of every container whose image is missing, e.g. after
+    restoring a backup (which lists the images but doesn't copy them).
+    """
+    rows = db.query(Container.id, Container.qr_code_path).order_by(Container.id).all()
+    missing = [
+        container_id for container_id, path in rows
+        if not path or not os.path.isfile(os.path.join(QR_DIR, os.path.basename(path)))
+    ]
+
+    for done, container_id in enumerate(missing, 1):
+        path = render_qr_code(container_id)
+        db.query(Container).filter(Container.id == container_id).update({Container.qr_code_path: path})
+        if done % QR_BATCH == 0 or done == len(missing):
+            db.commit()
+            if progress is not None:
+                progress(done / len(missing), f"rendered {done} of {len(missing)}")
+
+    return {"containers": len(rows), "rendered": len(missing)}
+
+@jobs.handler("regenerate_qr_codes", executor="process")
+def regenerate_qr_codes_job(payload: dict, progress: jobs.Progress) -> dict:
+    db = SessionLocal()
+    try:
+        return regenerate_qr_codes(db, progress)
+    finally:
+        db.close()
+
 def list_containers_paginated(
     db: Session,
     page: int = 1,
     page_size: int = PAGE_SIZE,
     name: str | None = None,
     rooms: list[int] | None = None,
-) -> PaginatedContainerResponse:
-    """List containers with pagination and optional filters"""
-    # Build base query with eager loading
-    query = db.query(Container).options(joinedload(Container.room))
+    total_mode: TotalMode = TotalMode.exact,
+    fieldset: Fieldset | None = None,
+    sort: ContainerSort = ContainerSort.id,
+) -> PaginatedContainerResponse | PaginatedSparseResponse:
+    """
+    List containers with pagination and optional filters, in ``sort`` order.
+    With a ``fieldset`` the rows only carry the requested fields and includes.
+    """
+    query = db.query(Container.id)
     
     # Apply filters
     if name:
@@ -60,41 +153,147 @@ def list_containers_paginated(
     if rooms:
         query = query.filter(Container.room_id.in_(rooms))
     
-    # Get total count after filters
-    total = query.count()
-    
-    # Apply pagination
-    offset = (page - 1) * page_size
-    containers = query.offset(offset).limit(page_size).all()
-
-    return PaginatedContainerResponse(
-        data=[ContainerResponse.model_validate(c) for c in containers],
-        total=total,
-        page=page,
-        pageSize=page_size,
-    )
+    filters_key = normalize_key(name=name or None, rooms=rooms or None)
+    query = query.order_by(*sort.order_by(Container.id))
+    ids, total, has_more = _paginator.paginate(query, filters_key, page, page_size, total_mode, order=sort.value)
+
+    rows = load_container_rows(db, ids, fieldset or DEFAULT_FIELDSET)
+
+    # validate the whole page in one call instead of model_validate per ORM entity
+    schema = PaginatedContainerResponse if fieldset is None else PaginatedSparseResponse
+    with timing.phase("serialize"):
+        return schema.model_validate({
+            "data": rows,
+            "total": total,
+            "page": page,
+            "pageSize": page_size,
+            "hasMore": has_more,
+        })
+
+def load_container_rows(db: Session, ids: tuple[int, ...], fieldset: Fieldset = DEFAULT_FIELDSET) -> list[dict]:
+    """
+    Project containers into response dicts, in the order of ``ids``.
+    The item count subquery and the room join only run when requested.
+    """
+    columns = [_COLUMNS[name].label(name) for name in fieldset.fields if name != "item_count"]
+    query = db.query(*columns)
+
+    if "item_count" in fieldset.fields:
+        item_count = (
+            select(func.count(Item.id))
+            .where(Item.container_id == Container.id)
+            .correlate(Container)
+            .scalar_subquery()
+        )
+        query = query.add_columns(item_count.label("item_count"))
+    if "room" in fieldset.include:
+        query = query.add_columns(Container.room_id.label("room__id"), Room.name.label("room__name"))
+        query = query.outerjoin(Room, Container.room_id == Room.id)
+
+    rows = fetch_by_ids(query, Container.id, ids)
+
+    payload = []
+    for row in rows:
+        values = row._mapping
+        data = {name: values[name] for name in fieldset.fields}
+        if "room" in fieldset.include:
+            data["room"] = (
+                {"id": values["room__id"], "name": values["room__name"]}
+                if values["room__id"] is not None else None
+            )
+        payload.append(data)
+    return payload
+
+def page_container_items(
+    db: Session,
+    container_id: int,
+    page: int = 1,
+    page_size: int = ITEMS_PAGE_SIZE,
+    cursor: str | None = None,
+    sort: ItemSort = ItemSort.id,
+) -> tuple[tuple[int, ...], bool, str | None]:
+    """
+    One page of item ids in a container, by offset ``page`` or by keyset ``cursor``.
+    A cursor takes precedence over ``page`` and must come from the same ``sort``.
 
-def get_container_detail(db: Session, container_id: int) -> ContainerDetailResponse | None:
-    """Get a container with all its details"""
-    container = (
-        db.query(Container)
-        .options(joinedload(Container.room))
-        .filter(Container.id == container_id)
-        .first()
+    Returns:
+        tuple: (item ids, has_more, next_cursor)
+
+    Raises:
+        ValueError: if ``cursor`` is malformed or was issued for another sort
+    """
+    columns = (*sort.columns(), Item.id)
+    query = (
+        db.query(*columns)
+        .filter(Item.container_id == container_id)
+        .order_by(*sort.order_by(Item.id))
     )
-    if not container:
+
+    if cursor is not None:
+        values = decode_cursor(cursor)
+        if len(values) != len(columns) + 1 or values[0] != sort.value:
+            raise ValueError("Invalid cursor")
+        last_values = []
+        for column, value in zip(columns, values[1:]):
+            # cursors come back from clients: anything but the scalars we encoded is forged
+            if value is not None and not isinstance(value, (str, int, float)):
+                raise ValueError("Invalid cursor")
+            if column is Item.created_at and value is not None:
+                if not isinstance(value, str):
+                    raise ValueError("Invalid cursor")
+                value = datetime.fromisoformat(value)
+            last_values.append(value)
+        query = query.filter(after_keyset(columns, last_values, sort.descending))
+    else:
+        query = query.offset((page - 1) * page_size)
+
+    rows = query.limit(page_size + 1).all()
+    rows, has_more = rows[:page_size], len(rows) > page_size
+
+    next_cursor = encode_cursor(sort.value, *rows[-1]) if has_more else None
+    return tuple(row.id for row in rows), has_more, next_cursor
+
+def get_container_detail(
+    db: Session,
+    container_id: int,
+    fieldset: Fieldset | None = None,
+    items_page: int = 1,
+    items_page_size: int = ITEMS_PAGE_SIZE,
+    items_cursor: str | None = None,
+    items_sort: ItemSort = ItemSort.id,
+) -> ContainerDetailResponse | dict | None:
+    """
+    Get a container with one page of its items, as a sparse dict when a ``fieldset`` is given.
+    The container and its items are projections, so a full container costs a fixed number of queries.
+
+    Raises:
+        ValueError: if ``items_cursor`` is invalid (see ``page_container_items``)
+    """
+    rows = load_container_rows(db, (container_id,), fieldset or DEFAULT_FIELDSET)
+    if not rows:
         return None
 
-    return ContainerDetailResponse.model_validate(container)
+    container = rows[0]
+    if fieldset is not None and "items" not in fieldset.include:
+        return container
+
+    item_ids, has_more, next_cursor = page_container_items(
+        db, container_id, items_page, items_page_size, items_cursor, items_sort
+    )
+    container["items"] = items_service.load_item_rows(db, item_ids)
+    container["items_has_more"] = has_more
+    container["items_next_cursor"] = next_cursor
+
+    if fieldset is not None:
+        return container
+
+    container["items_total"] = container["item_count"]
+    with timing.phase("serialize"):
+        return ContainerDetailResponse.model_validate(container)
 
 def update_container(db: Session, container_id: int, data: ContainerUpdate) -> ContainerDetailResponse | None:
     """Update a container"""
-    container = (
-        db.query(Container)
-        .options(joinedload(Container.room), joinedload(Container.items))
-        .filter(Container.id == container_id)
-        .first()
-    )
+    container = db.query(Container).filter(Container.id == container_id).first()
     if not container:
         return None
 
@@ -105,17 +304,8 @@ def update_container(db: Session, container_id: int, data: ContainerUpdate) -> C
         setattr(container, field, value)
 
     db.commit()
-    db.refresh(container)
-    
-    # Reload with relationships for response
-    container = (
-        db.query(Container)
-        .options(joinedload(Container.room), joinedload(Container.items))
-        .filter(Container.id == container_id)
-        .first()
-    )
 
-    return ContainerDetailResponse.model_validate(container)
+    return get_container_detail(db, container_id)
 
 def delete_container(db: Session, container_id: int) -> dict | None:
     """Delete a container"""
@@ -184,19 +374,20 @@ def list_all_containers(
     db: Session, 
     limit: int = 200, 
     room_ids: list[int] | None = None
-) -> tuple[list[Container], int, bool]:
+) -> tuple[list[ContainerOption], int, bool]:
     """
     List all containers up to a limit, optionally filtered by rooms.
+    Served from the in-memory dropdown snapshot (see services.options).
     
     Returns:
         tuple: (containers, total_count, has_more)
     """
-    query = db.query(Container)
-    
-    if room_ids:
-        query = query.filter(Container.room_id.in_(room_ids))
+    rows = options.containers(db, room_ids)
     
-    total = query.count()
-    containers = query.limit(limit).all()
+    total = len(rows)
+    containers = [
+        ContainerOption.model_construct(id=id, name=name, room_id=room_id)
+        for id, name, room_id in rows[:limit]
+    ]
     has_more = total > limit
     return containers, total, has_more
@@ -1,12 +1,17 @@
-from sqlalchemy import func
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from ..models import Container, Floor, Item, Room
 from ..schemas.floors import FloorCreate, FloorUpdate, FloorResponse, RoomResponse, PaginatedFloorResponse
 from ..schemas.rooms import RoomOption
+from ..cache import normalize_key
+from . import options
+from .pagination import Paginator, TotalMode, fetch_by_ids
 
 PAGE_SIZE = 25
 
+_paginator = Paginator("floor", ["floors"])
+
 def create_floor(db: Session, data: FloorCreate) -> FloorResponse:
     """Create a new floor"""
     floor = Floor(name=data.name, floor_number=data.floor_number)
@@ -24,40 +29,45 @@ def create_floor(db: Session, data: FloorCreate) -> FloorResponse:
         rooms=None,
     )
 
-def list_floors_paginated(db: Session, page: int = 1, page_size: int = PAGE_SIZE) -> PaginatedFloorResponse:
+def list_floors_paginated(
+    db: Session,
+    page: int = 1,
+    page_size: int = PAGE_SIZE,
+    total_mode: TotalMode = TotalMode.exact,
+) -> PaginatedFloorResponse:
     """List floors with pagination and room counts"""
-    total = db.query(Floor).count()
-    offset = (page - 1) * page_size
+    ids, total, has_more = _paginator.paginate(db.query(Floor.id), normalize_key(), page, page_size, total_mode)
 
-    rows = (
-        db.query(Floor, func.count(Room.id).label("room_count"))
+    # count rooms for the floors on this page only
+    # plain column rows rather than Floor entities, so nothing lands in the identity map
+    rows = fetch_by_ids(
+        db.query(Floor.id, Floor.name, Floor.floor_number, Floor.created_at, func.count(Room.id).label("room_count"))
         .outerjoin(Room, Floor.id == Room.floor_id)
-        .group_by(Floor.id)
-        .offset(offset)
-        .limit(page_size)
-        .all()
+        .group_by(Floor.id),
+        Floor.id,
+        ids,
     )
 
     return PaginatedFloorResponse(
         data=[
             FloorResponse(
-                id=f.id,
-                name=f.name,
-                floor_number=f.floor_number,
-                created_at=f.created_at,
+                id=id,
+                name=name,
+                floor_number=floor_number,
+                created_at=created_at,
                 room_count=room_count,
                 rooms=None,
             )
-            for f, room_count in rows
+            for id, name, floor_number, created_at, room_count in rows
         ],
         total=total,
         page=page,
         pageSize=page_size,
+        hasMore=has_more,
     )
 
 def get_rooms_for_floor(db: Session, floor_id: int) -> list[RoomOption]:
-    rooms = db.query(Room).filter(Room.floor_id == floor_id).all()
-    return [RoomOption.model_validate(r) for r in rooms]
+    return [RoomOption.model_construct(id=id, name=name) for id, name, _ in options.rooms(db, [floor_id])]
 
 def get_floor_detail(db: Session, floor_id: int) -> FloorResponse | None:
     """Get a floor by ID"""
@@ -66,16 +76,14 @@ def get_floor_detail(db: Session, floor_id: int) -> FloorResponse | None:
     if not floor:
         return None
 
+    # per-room counts as correlated subqueries, each a lookup in the room_id index, instead of
+    # count(distinct) over the items x containers join product
+    item_count = select(func.count(Item.id)).where(Item.room_id == Room.id).correlate(Room).scalar_subquery()
+    container_count = select(func.count(Container.id)).where(Container.room_id == Room.id).correlate(Room).scalar_subquery()
     rooms_with_counts = (
-        db.query(
-            Room,
-            func.count(func.distinct(Item.id)).label("item_count"),
-            func.count(func.distinct(Container.id)).label("container_count"),
-        )
-        .outerjoin(Item, Item.room_id == Room.id)
-        .outerjoin(Container, Container.room_id == Room.id)
+        db.query(Room, item_count.label("item_count"), container_count.label("container_count"))
         .filter(Room.floor_id == floor_id)
-        .group_by(Room.id)
+        .order_by(Room.id)
         .all()
     )
 
@@ -105,10 +113,19 @@ def delete_floor(db: Session, floor_id: int) -> None:
     if not floor:
         raise ValueError("Floor not found")
 
-    rooms = db.query(Room).filter(Room.floor_id == floor_id).all()
     # TODO: we'll need to figure out all rooms on the floor and delete them, and all items/containers assigned to these rooms
     # will need to be deleted as well. The frontend should prompt the user to move the items/containers to different rooms first.
 
+    # items in rooms elsewhere can still sit in a container on this floor (a container
+    # moved rooms keeps its items' room_id); take them out of it, as deleting the
+    # container on its own does, or the cascade below trips their foreign key
+    floor_rooms = select(Room.id).where(Room.floor_id == floor_id)
+    db.query(Item).filter(
+        Item.container_id.in_(select(Container.id).where(Container.room_id.in_(floor_rooms))),
+        Item.room_id.not_in(floor_rooms),
+    ).update({Item.container_id: None}, synchronize_session=False)
+
+    # rooms, containers and items go with it through ON DELETE CASCADE, without loading them (passive_deletes)
     db.delete(floor)
     db.commit()
 
@@ -117,6 +134,10 @@ def delete_floor(db: Session, floor_id: int) -> None:
 def get_floor(db: Session, floor_id: int) -> Floor | None:
     return db.query(Floor).filter(Floor.id == floor_id).first()
 
+def floor_exists(db: Session, floor_id: int) -> bool:
+    """Check a floor exists using the cached dropdown snapshot"""
+    return options.floor_exists(db, floor_id)
+
 
 def update_floor(db: Session, floor_id: int, data: FloorUpdate) -> FloorResponse | None:
     """Update a floor"""
@@ -1,10 +1,52 @@
+from enum import nonmember
+
 from sqlalchemy.orm import Session, joinedload
 
+from .. import timing
+from ..cache import normalize_key
+from ..fieldsets import Fieldset
 from ..models import Item, Room, Container
 from ..schemas.items import ItemCreate, ItemUpdate, ItemResponse, PaginatedItemResponse
+from ..schemas.sparse import PaginatedSparseResponse
+from . import options
+from .pagination import Paginator, SortOrder, TotalMode, fetch_by_ids
 
 PAGE_SIZE = 25
 
+ITEM_FIELDS = ("id", "name", "room_id", "container_id", "quantity", "created_at")
+ITEM_INCLUDES = ("room", "container")
+DEFAULT_FIELDSET = Fieldset(ITEM_FIELDS, frozenset(ITEM_INCLUDES))
+
+_COLUMNS = {
+    "id": Item.id,
+    "name": Item.name,
+    "room_id": Item.room_id,
+    "container_id": Item.container_id,
+    "quantity": Item.quantity,
+    "created_at": Item.created_at,
+}
+
+_paginator = Paginator("item", ["items"])
+
+class ItemSort(SortOrder):
+    """Item orders; ``room`` groups by room (by id), then by name"""
+    id = "id"
+    name = "name"
+    name_desc = "-name"
+    quantity = "quantity"
+    quantity_desc = "-quantity"
+    created_at = "created_at"
+    created_at_desc = "-created_at"
+    room = "room"
+
+    sort_columns = nonmember({
+        "id": (),
+        "name": (Item.name,),
+        "quantity": (Item.quantity,),
+        "created_at": (Item.created_at,),
+        "room": (Item.room_id, Item.name),
+    })
+
 def create_item(db: Session, data: ItemCreate) -> tuple[ItemResponse | None, str | None]:
     """
     Create a new item.
@@ -53,10 +95,14 @@ def get_items_paginated(
         page_size: int = PAGE_SIZE,
         name: str | None = None,
         rooms: list[int] | None = None,
-        containers: list[int] | None = None
-    ) -> tuple[PaginatedItemResponse | None, str | None]:
+        containers: list[int] | None = None,
+        total_mode: TotalMode = TotalMode.exact,
+        fieldset: Fieldset | None = None,
+        sort: ItemSort = ItemSort.id,
+    ) -> tuple[PaginatedItemResponse | PaginatedSparseResponse | None, str | None]:
     """
-    Get paginated items with optional filters.
+    Get paginated items with optional filters, in ``sort`` order.
+    With a ``fieldset`` the rows only carry the requested fields and includes.
     
     Returns:
         tuple: (PaginatedItemResponse, None) on success
@@ -64,18 +110,12 @@ def get_items_paginated(
     """
     # If both rooms and containers are provided, validate containers belong to those rooms
     if rooms and containers:
-        valid_containers = (
-            db.query(Container.id)
-            .filter(Container.id.in_(containers), Container.room_id.in_(rooms))
-            .all()
-        )
-        valid_container_ids = {c.id for c in valid_containers}
+        valid_container_ids = {c[0] for c in options.containers(db, rooms)}
         invalid_containers = set(containers) - valid_container_ids
         if invalid_containers:
             return None, "container_room_mismatch"
     
-    # Build base query
-    query = db.query(Item).options(joinedload(Item.room), joinedload(Item.container))
+    query = db.query(Item.id)
     
     # Apply filters conditionally
     if name:
@@ -84,26 +124,65 @@ def get_items_paginated(
     if containers:
         # Container filter takes precedence (more specific)
         query = query.filter(Item.container_id.in_(containers))
+        rooms = None
     elif rooms:
         # Only apply room filter if no container filter
         query = query.filter(Item.room_id.in_(rooms))
     
-    # Get total count AFTER filters are applied
-    total = query.count()
+    filters_key = normalize_key(name=name or None, containers=containers or None, rooms=rooms or None)
+    query = query.order_by(*sort.order_by(Item.id))
+    ids, total, has_more = _paginator.paginate(query, filters_key, page, page_size, total_mode, order=sort.value)
     
-    # Apply pagination
-    offset = (page - 1) * page_size
-    items = query.offset(offset).limit(page_size).all()
+    rows = load_item_rows(db, ids, fieldset or DEFAULT_FIELDSET)
+
+    # validate the whole page in one call instead of model_validate per ORM entity
+    schema = PaginatedItemResponse if fieldset is None else PaginatedSparseResponse
+    with timing.phase("serialize"):
+        return schema.model_validate({
+            "total": total,
+            "page": page,
+            "pageSize": page_size,
+            "hasMore": has_more,
+            "data": rows,
+        }), None
+
+def load_item_rows(db: Session, ids: tuple[int, ...], fieldset: Fieldset = DEFAULT_FIELDSET) -> list[dict]:
+    """
+    Project items into response dicts, in the order of ``ids``.
+    Only the requested columns are selected, and rooms/containers are joined only when included.
+    """
+    columns = [_COLUMNS[name].label(name) for name in fieldset.fields]
+    query = db.query(*columns)
     
-    return PaginatedItemResponse(
-        total=total,
-        page=page,
-        pageSize=page_size,
-        data=items,
-    ), None
+    if "room" in fieldset.include:
+        query = query.add_columns(Item.room_id.label("room__id"), Room.name.label("room__name"))
+        query = query.join(Room, Item.room_id == Room.id)
+    if "container" in fieldset.include:
+        query = query.add_columns(Item.container_id.label("container__id"), Container.name.label("container__name"))
+        query = query.outerjoin(Container, Item.container_id == Container.id)
+    
+    rows = fetch_by_ids(query, Item.id, ids)
+    
+    payload = []
+    for row in rows:
+        values = row._mapping
+        data = {name: values[name] for name in fieldset.fields}
+        if "room" in fieldset.include:
+            data["room"] = {"id": values["room__id"], "name": values["room__name"]}
+        if "container" in fieldset.include:
+            data["container"] = (
+                {"id": values["container__id"], "name": values["container__name"]}
+                if values["container__id"] is not None else None
+            )
+        payload.append(data)
+    return payload
+
+def get_item(db: Session, item_id: int, fieldset: Fieldset | None = None) -> ItemResponse | dict | None:
+    """Get a single item by ID, as a sparse dict when a ``fieldset`` is given"""
+    if fieldset is not None:
+        rows = load_item_rows(db, (item_id,), fieldset)
+        return rows[0] if rows else None
 
-def get_item(db: Session, item_id: int) -> ItemResponse | None:
-    """Get a single item by ID"""
     item = (
         db.query(Item)
         .options(joinedload(Item.room), joinedload(Item.container))
@@ -0,0 +1,73 @@
+"""
+Compact in-process snapshots of floors, rooms and containers for dropdowns.
+
+The dropdown endpoints are hit on every form open but the rows change rarely,
+so they are served from tuples cached per table generation and filtered in
+memory instead of running a count plus a full select on each request.
+"""
+from dataclasses import dataclass
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..cache import GenerationCache
+from ..models import Container, Floor, Room
+
+RoomRow = tuple[int, str | None, int | None]  # id, name, floor_id
+ContainerRow = tuple[int, str | None, int | None]  # id, name, room_id
+
+@dataclass(frozen=True, slots=True)
+class _Snapshot:
+    rows: tuple[tuple, ...]  # ordered by id
+    ids: frozenset[int]
+    by_parent: dict[int | None, tuple[tuple, ...]]  # parent id -> rows, ordered by id
+
+def _snapshot(rows: list[tuple]) -> _Snapshot:
+    by_parent: dict[int | None, list[tuple]] = {}
+    for row in rows:
+        by_parent.setdefault(row[2], []).append(row)
+
+    return _Snapshot(
+        rows=tuple(rows),
+        ids=frozenset(row[0] for row in rows),
+        by_parent={parent: tuple(group) for parent, group in by_parent.items()},
+    )
+
+def _load_floor_ids(db: Session) -> frozenset[int]:
+    return frozenset(db.scalars(select(Floor.id)))
+
+def _load_rooms(db: Session) -> _Snapshot:
+    rows = db.execute(select(Room.id, Room.name, Room.floor_id).order_by(Room.id)).tuples().all()
+    return _snapshot(rows)
+
+def _load_containers(db: Session) -> _Snapshot:
+    rows = db.execute(select(Container.id, Container.name, Container.room_id).order_by(Container.id)).tuples().all()
+    return _snapshot(rows)
+
+_floor_ids = GenerationCache("floor_ids", ["floors"], _load_floor_ids)
+_rooms = GenerationCache("room_options", ["rooms"], _load_rooms)
+_containers = GenerationCache("container_options", ["containers"], _load_containers)
+
+def _filter(snapshot: _Snapshot, parent_ids: list[int] | None) -> tuple[tuple, ...] | list[tuple]:
+    if not parent_ids:
+        return snapshot.rows
+    if len(parent_ids) == 1:
+        return snapshot.by_parent.get(parent_ids[0], ())
+
+    rows = [row for parent in set(parent_ids) for row in snapshot.by_parent.get(parent, ())]
+    rows.sort(key=lambda row: row[0])
+    return rows
+
+def floor_exists(db: Session, floor_id: int) -> bool:
+    return floor_id in _floor_ids.get(db)
+
+def room_exists(db: Session, room_id: int) -> bool:
+    return room_id in _rooms.get(db).ids
+
+def rooms(db: Session, floor_ids: list[int] | None = None) -> tuple[RoomRow, ...] | list[RoomRow]:
+    """Room rows ordered by id, optionally limited to ``floor_ids``"""
+    return _filter(_rooms.get(db), floor_ids)
+
+def containers(db: Session, room_ids: list[int] | None = None) -> tuple[ContainerRow, ...] | list[ContainerRow]:
+    """Container rows ordered by id, optionally limited to ``room_ids``"""
+    return _filter(_containers.get(db), room_ids)
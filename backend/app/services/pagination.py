@@ -0,0 +1,141 @@
+"""
+Shared pagination for the list services.
+
+Pages are computed as ids with a ``limit + 1`` fetch, so ``hasMore`` never
+needs a count. Totals are counted separately per filter set (not per page) and
+cached by table generation, and callers can opt out of exact totals:
+
+- ``exact``: the filtered count, served from cache until the tables change
+- ``estimate``: the last known count for the filters even if stale, falling
+  back to a lower bound from the current page
+- ``none``: no total at all, only ``hasMore``
+
+Listings take a ``sort=`` enum (a ``SortOrder``) whose orders are each backed
+by an index in ``app.models``, so a sorted page is an index scan that stops
+after ``limit + 1`` rows rather than a sort of the whole filtered set. Nested
+listings that must stay fast however deep the client scrolls (items in a
+container) use keyset cursors over the same orders instead of offsets.
+"""
+import base64
+import binascii
+import json
+from enum import Enum
+from typing import Hashable, Iterable
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+from ..cache import QueryCache
+
+class TotalMode(str, Enum):
+    exact = "exact"
+    estimate = "estimate"
+    none = "none"
+
+class SortOrder(str, Enum):
+    """
+    Base for ``sort=`` enums. A value is a sort key, ``-`` prefixed for
+    descending; subclasses map each sort key to its columns in
+    ``sort_columns`` (an ``enum.nonmember`` dict). The id is always the last
+    sort column, so every order is total.
+    """
+
+    sort_columns: dict[str, tuple]
+
+    @property
+    def descending(self) -> bool:
+        return self.value.startswith("-")
+
+    @property
+    def key(self) -> str:
+        return self.value.lstrip("-")
+
+    def columns(self) -> tuple:
+        """Sort columns, not including the id tie-breaker"""
+        return self.sort_columns[self.key]
+
+    def order_by(self, id_column) -> list:
+        columns = [*self.columns(), id_column]
+        return [c.desc() for c in columns] if self.descending else columns
+
+class Paginator:
+    """Page-of-ids and total caches for one listing over ``tables``"""
+
+    def __init__(self, name: str, tables: Iterable[str]):
+        tables = tuple(tables)
+        self.pages = QueryCache(f"{name}_pages", tables)
+        self.totals = QueryCache(f"{name}_totals", tables)
+
+    def paginate(
+        self,
+        id_query: Query,
+        filters_key: Hashable,
+        page: int,
+        page_size: int,
+        total_mode: TotalMode = TotalMode.exact,
+        order: Hashable = None,
+    ) -> tuple[tuple[int, ...], int | None, bool]:
+        """
+        Page through ``id_query`` (a filtered, ordered query selecting only ids).
+        ``order`` identifies the ordering in the page cache; totals are shared across orders.
+
+        Returns:
+            tuple: (page of ids, total or None, has_more)
+        """
+        db = id_query.session
+        offset = (page - 1) * page_size
+
+        def load_page() -> tuple[int, ...]:
+            return tuple(row[0] for row in id_query.offset(offset).limit(page_size + 1))
+
+        fetched = self.pages.get_or_load(db, (filters_key, order, page, page_size), load_page)
+        ids, has_more = fetched[:page_size], len(fetched) > page_size
+
+        if total_mode == TotalMode.none:
+            return ids, None, has_more
+
+        seen = offset + len(ids)
+        if total_mode == TotalMode.estimate:
+            if ids and not has_more:
+                # this is the last page, so the total is known exactly
+                return ids, seen, has_more
+
+            stale = self.totals.peek(filters_key)
+            if has_more:
+                return ids, max(stale or 0, seen + 1), has_more
+            if stale is not None:
+                return ids, min(stale, offset), has_more
+
+        return ids, self.totals.get_or_load(db, filters_key, id_query.count), has_more
+
+def fetch_by_ids(query: Query, id_column, ids: tuple[int, ...]) -> list:
+    """Load the entities of ``query`` whose ``id_column`` is in ``ids``, in the order of ``ids``"""
+    if not ids:
+        return []
+
+    rows = query.filter(id_column.in_(ids)).all()
+    by_id = {row.id: row for row in rows}
+    return [by_id[i] for i in ids if i in by_id]
+
+def encode_cursor(*values) -> str:
+    """Opaque keyset cursor for ``values`` (e.g. sort key, last sort value, last id)"""
+    payload = json.dumps(values, default=lambda v: v.isoformat(), separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> list:
+    """Decode a cursor from ``encode_cursor``; raises ValueError when it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+def after_keyset(columns, last_values, descending: bool = False):
+    """Filter clause for rows after ``last_values`` in the lexicographic order of ``columns``"""
+    if descending:
+        return tuple_(*columns) < tuple_(*last_values)
+    return tuple_(*columns) > tuple_(*last_values)
@@ -1,14 +1,35 @@
-from math import ceil
-from sqlalchemy import func
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session, joinedload
 
 from ..models import Room, Item, Container
 from ..schemas.rooms import RoomCreate, RoomUpdate, RoomResponse, RoomItemsResponse, RoomItemCreate, PaginatedRoomResponse
 from ..schemas.items import ItemResponse
 from ..schemas.containers import ContainerOption
+from ..schemas.rooms import RoomOption
+from .. import timing
+from ..cache import normalize_key
+from ..fieldsets import Fieldset
+from ..schemas.sparse import PaginatedSparseResponse
+from . import options
+from . import items as items_service
+from .items import ItemSort
+from .pagination import Paginator, TotalMode, fetch_by_ids
 
 PAGE_SIZE = 25
 
+ROOM_FIELDS = ("id", "name", "floor_id", "created_at", "container_count", "item_count")
+DEFAULT_FIELDSET = Fieldset(ROOM_FIELDS)
+
+_COLUMNS = {
+    "id": Room.id,
+    "name": Room.name,
+    "floor_id": Room.floor_id,
+    "created_at": Room.created_at,
+}
+
+_paginator = Paginator("room", ["rooms"])
+_items_paginator = Paginator("room_item", ["items"])
+
 def create_room(db: Session, data: RoomCreate) -> RoomResponse:
     room = Room(name=data.name, floor_id=data.floor_id)
 
@@ -23,71 +44,75 @@ def create_room(db: Session, data: RoomCreate) -> RoomResponse:
         created_at=room.created_at,
     )
 
-def get_rooms_paginated(db: Session, page: int = 1, page_size: int = PAGE_SIZE) -> PaginatedRoomResponse:
-    """List rooms with pagination"""
-    total = db.query(Room).count()
-    offset = (page - 1) * page_size
-    rooms = (
-        db.query(
-            Room,
-            func.count(func.distinct(Container.id)).label("container_count"),
-            func.count(func.distinct(Item.id)).label("item_count"),
-        )
-        .outerjoin(Container, Room.id == Container.room_id)
-        .outerjoin(Item, Room.id == Item.room_id)
-        .group_by(Room.id)
-        .offset(offset)
-        .limit(page_size)
-        .all()
-    )
+def get_rooms_paginated(
+    db: Session,
+    page: int = 1,
+    page_size: int = PAGE_SIZE,
+    total_mode: TotalMode = TotalMode.exact,
+    fieldset: Fieldset | None = None,
+) -> PaginatedRoomResponse | PaginatedSparseResponse:
+    """
+    List rooms with pagination.
+    With a ``fieldset`` the rows only carry the requested fields.
+    """
+    ids, total, has_more = _paginator.paginate(db.query(Room.id), normalize_key(), page, page_size, total_mode)
 
-    return PaginatedRoomResponse(
-        data=[
-            RoomResponse(
-                id=r.Room.id,
-                name=r.Room.name,
-                floor_id=r.Room.floor_id,
-                created_at=r.Room.created_at,
-                container_count=r.container_count,
-                item_count=r.item_count,
-            )
-            for r in rooms
-        ],
-        total=total,
-        page=page,
-        pageSize=page_size,
-    )
+    rows = load_room_rows(db, ids, fieldset or DEFAULT_FIELDSET)
+
+    schema = PaginatedRoomResponse if fieldset is None else PaginatedSparseResponse
+    with timing.phase("serialize"):
+        return schema.model_validate({
+            "data": rows,
+            "total": total,
+            "page": page,
+            "pageSize": page_size,
+            "hasMore": has_more,
+        })
 
-def get_room_detail(db: Session, room_id: int) -> RoomResponse | None:
-    """Get a room by ID with container and item counts"""
-    result = (
-        db.query(
-            Room,
-            func.count(func.distinct(Container.id)).label('container_count'),
-            func.count(func.distinct(Item.id)).label('item_count'),
+def load_room_rows(db: Session, ids: tuple[int, ...], fieldset: Fieldset = DEFAULT_FIELDSET) -> list[dict]:
+    """
+    Project rooms into response dicts, in the order of ``ids``.
+    Container and item counts are correlated subqueries that only run when requested.
+    """
+    query = db.query(*[_COLUMNS[name].label(name) for name in fieldset.fields if name in _COLUMNS])
+
+    if "container_count" in fieldset.fields:
+        container_count = (
+            select(func.count(Container.id))
+            .where(Container.room_id == Room.id)
+            .correlate(Room)
+            .scalar_subquery()
         )
-        .outerjoin(Container, Room.id == Container.room_id)
-        .outerjoin(Item, Room.id == Item.room_id)
-        .filter(Room.id == room_id)
-        .group_by(Room.id)
-        .first()
-    )
+        query = query.add_columns(container_count.label("container_count"))
+    if "item_count" in fieldset.fields:
+        item_count = (
+            select(func.count(Item.id))
+            .where(Item.room_id == Room.id)
+            .correlate(Room)
+            .scalar_subquery()
+        )
+        query = query.add_columns(item_count.label("item_count"))
+
+    rows = fetch_by_ids(query, Room.id, ids)
+    return [{name: row._mapping[name] for name in fieldset.fields} for row in rows]
 
-    if not result:
+def get_room_detail(db: Session, room_id: int, fieldset: Fieldset | None = None) -> RoomResponse | dict | None:
+    """Get a room by ID with container and item counts, as a sparse dict when a ``fieldset`` is given"""
+    rows = load_room_rows(db, (room_id,), fieldset or DEFAULT_FIELDSET)
+
+    if not rows:
         return None
 
-    return RoomResponse(
-        id=result.Room.id,
-        name=result.Room.name,
-        floor_id=result.Room.floor_id,
-        created_at=result.Room.created_at,
-        container_count=result.container_count,
-        item_count=result.item_count,
-    )
+    if fieldset is not None:
+        return rows[0]
+    with timing.phase("serialize"):
+        return RoomResponse.model_validate(rows[0])
 
 def get_containers_for_room(db: Session, room_id: int) -> list[ContainerOption]:
-    containers = db.query(Container).filter(Container.room_id == room_id).all()
-    return [ContainerOption.model_validate(c) for c in containers]
+    return [
+        ContainerOption.model_construct(id=id, name=name, room_id=container_room_id)
+        for id, name, container_room_id in options.containers(db, [room_id])
+    ]
 
 def create_item_in_room(db: Session, room_id: int, data: RoomItemCreate) -> ItemResponse | None:
     room = get_room(db, room_id)
@@ -129,48 +154,44 @@ def list_items_in_room(
     room_id: int,
     page: int = 1,
     page_size: int = 50,
-) -> RoomItemsResponse | None:
-    room = get_room(db, room_id)
-
-    if not room:
+    total_mode: TotalMode = TotalMode.exact,
+    fieldset: Fieldset | None = None,
+    sort: ItemSort = ItemSort.id,
+) -> RoomItemsResponse | PaginatedSparseResponse | None:
+    """List the items in a room in ``sort`` order, or None if the room doesn't exist"""
+    if not options.room_exists(db, room_id):
         return None
 
     page_size = min(page_size, 100)
-    skip = (page - 1) * page_size
 
-    total = db.query(Item).filter(Item.room_id == room_id).count()
-    total_pages = ceil(total / page_size) if total > 0 else 1
-
-    items = (
-        db.query(Item)
-        .options(joinedload(Item.room), joinedload(Item.container))
-        .filter(Item.room_id == room_id)
-        .offset(skip)
-        .limit(page_size)
-        .all()
+    ids, total, has_more = _items_paginator.paginate(
+        db.query(Item.id).filter(Item.room_id == room_id).order_by(*sort.order_by(Item.id)),
+        normalize_key(room_id=room_id),
+        page,
+        page_size,
+        total_mode,
+        order=sort.value,
     )
 
-    return RoomItemsResponse(
-        items=[
-            ItemResponse(
-                id=i.id,
-                name=i.name,
-                room_id=i.room_id,
-                container_id=i.container_id,
-                quantity=i.quantity,
-                created_at=i.created_at,
-            )
-            for i in items
-        ],
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=total_pages,
-    )
+    rows = items_service.load_item_rows(db, ids, fieldset or items_service.DEFAULT_FIELDSET)
+
+    schema = RoomItemsResponse if fieldset is None else PaginatedSparseResponse
+    with timing.phase("serialize"):
+        return schema.model_validate({
+            "data": rows,
+            "total": total,
+            "page": page,
+            "pageSize": page_size,
+            "hasMore": has_more,
+        })
 
 def get_room(db: Session, room_id: int) -> Room | None:
     return db.query(Room).filter(Room.id == room_id).first()
 
+def room_exists(db: Session, room_id: int) -> bool:
+    """Check a room exists using the cached dropdown snapshot"""
+    return options.room_exists(db, room_id)
+
 
 def search_rooms(db: Session, query: str) -> list[Room]:
     """Search rooms by name (case-insensitive)"""
@@ -182,15 +203,17 @@ def search_rooms(db: Session, query: str) -> list[Room]:
     )
 
 
-def list_all_rooms(db: Session, limit: int = 200) -> tuple[list[Room], int, bool]:
+def list_all_rooms(db: Session, limit: int = 200) -> tuple[list[RoomOption], int, bool]:
     """
     List all rooms up to a limit.
+    Served from the in-memory dropdown snapshot (see services.options).
     
     Returns:
         tuple: (rooms, total_count, has_more)
     """
-    total = db.query(Room).count()
-    rooms = db.query(Room).limit(limit).all()
+    rows = options.rooms(db)
+    total = len(rows)
+    rooms = [RoomOption.model_construct(id=id, name=name) for id, name, _ in rows[:limit]]
     has_more = total > limit
     return rooms, total, has_more
 
@@ -0,0 +1,97 @@
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+
+from .. import sync, timing
+from ..database import Base
+from ..models import SYNC_TABLES, Tombstone
+from .pagination import decode_cursor, encode_cursor
+
+BATCH_SIZE = 500
+
+# position of tombstones after the synced tables in (stamp, table, id) order
+_TOMBSTONES = len(SYNC_TABLES)
+
+def decode_token(token: str) -> tuple[int, int, int]:
+    """Decode a sync token; raises ValueError when it is malformed"""
+    values = decode_cursor(token)
+    if len(values) != 3 or not all(isinstance(value, int) for value in values):
+        raise ValueError("Invalid sync token")
+    return tuple(values)
+
+def _after(stamp_column, id_column, position: int, token: tuple[int, int, int] | None, upper: int):
+    """Rows of the table at ``position`` past ``token`` in (stamp, table, id) order, stamped no later than ``upper``"""
+    clauses = [stamp_column <= sync.to_datetime(upper)]
+    if token is not None:
+        stamp, table, row_id = token
+        since = sync.to_datetime(stamp)
+        if position > table:
+            clauses.append(stamp_column >= since)
+        elif position == table:
+            clauses.append(tuple_(stamp_column, id_column) > tuple_(since, row_id))
+        else:
+            clauses.append(stamp_column > since)
+    return clauses
+
+def changes_since(db: Session, token: str | None = None, batch_size: int = BATCH_SIZE) -> dict:
+    """
+    The next batch of up to ``batch_size`` created, updated and deleted rows
+    after ``token``, oldest first.
+
+    Without a token, or with one older than the pruned tombstones, the batch
+    starts from the beginning with ``reset`` set: the client should drop its
+    copy and rebuild it from the batches that follow. Deletions apply before
+    changes (ids can be reused).
+
+    Raises:
+        ValueError: when the token is malformed
+    """
+    position = decode_token(token) if token is not None else None
+    upper, horizon = sync.clock(db.connection())
+    reset = position is None or position[0] < horizon
+    if reset:
+        position = None
+
+    # up to batch_size candidates from every table, merged into one (stamp, table, id) order
+    candidates = []
+    for index, name in enumerate(SYNC_TABLES):
+        table = Base.metadata.tables[name]
+        rows = db.execute(
+            select(table)
+            .where(*_after(table.c.updated_at, table.c.id, index, position, upper))
+            .order_by(table.c.updated_at, table.c.id)
+            .limit(batch_size + 1)
+        ).all()
+        candidates += [((sync.to_stamp(row.updated_at), index, row.id), name, row) for row in rows]
+
+    tombstones = Tombstone.__table__
+    rows = db.execute(
+        select(tombstones)
+        .where(*_after(tombstones.c.deleted_at, tombstones.c.id, _TOMBSTONES, position, upper))
+        .order_by(tombstones.c.deleted_at, tombstones.c.id)
+        .limit(batch_size + 1)
+    ).all()
+    candidates += [((sync.to_stamp(row.deleted_at), _TOMBSTONES, row.id), None, row) for row in rows]
+
+    candidates.sort(key=lambda candidate: candidate[0])
+    batch, more = candidates[:batch_size], len(candidates) > batch_size
+
+    changes: dict[str, dict] = {}
+    deleted: dict[str, list[int]] = {}
+    with timing.phase("serialize"):
+        for _, name, row in batch:
+            if name is None:
+                deleted.setdefault(row.table_name, []).append(row.row_id)
+                continue
+            if name not in changes:
+                changes[name] = {"columns": list(row._fields), "rows": []}
+            changes[name]["rows"].append(list(row))
+
+    # past the whole clock when caught up, so the next sync starts after every committed write
+    last = batch[-1][0] if more else (upper, _TOMBSTONES + 1, 0)
+    return {
+        "token": encode_cursor(*last),
+        "more": more,
+        "reset": reset,
+        "changes": changes,
+        "deleted": deleted,
+    }
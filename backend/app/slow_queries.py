@@ -0,0 +1,156 @@
+"""
+Slow-query log with the query plan captured at the time.
+
+Every statement on the app's engine slower than ``SLOW_QUERY_MS`` (default 100, ``0`` disables) is
+appended to ``DATA_DIR/slow_queries.jsonl`` with its bound parameters and the
+``EXPLAIN QUERY PLAN`` rows SQLite reports for it, so full scans show up next
+to their cost. The file rotates at ``SLOW_QUERY_LOG_BYTES`` keeping
+``SLOW_QUERY_LOG_BACKUPS`` old files. ``aggregate()`` groups the entries by
+statement shape for ``GET /admin/slow-queries``.
+"""
+import json
+import logging
+import os
+import sqlite3
+import time
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .database import DATA_DIR, engine as default_engine
+from .statements import statement_shape
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", "100"))
+SLOW_QUERY_LOG_BYTES = int(os.environ.get("SLOW_QUERY_LOG_BYTES", str(5 * 1024 * 1024)))
+SLOW_QUERY_LOG_BACKUPS = int(os.environ.get("SLOW_QUERY_LOG_BACKUPS", "3"))
+
+class SlowQueryLog:
+    """Size-rotated JSONL file of slow statements"""
+
+    def __init__(self, path: str, max_bytes: int = SLOW_QUERY_LOG_BYTES, backups: int = SLOW_QUERY_LOG_BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._handler: RotatingFileHandler | None = None
+
+    def write(self, entry: dict) -> None:
+        if self._handler is None:
+            # opened on first use so importing the app never creates the file
+            self._handler = RotatingFileHandler(self.path, maxBytes=self.max_bytes, backupCount=self.backups, delay=True)
+            self._handler.setFormatter(logging.Formatter("%(message)s"))
+        record = logging.LogRecord(__name__, logging.WARNING, __file__, 0, json.dumps(entry, default=str), None, None)
+        self._handler.handle(record)
+
+    def files(self) -> list[str]:
+        """Existing log files, oldest first"""
+        candidates = [f"{self.path}.{n}" for n in range(self.backups, 0, -1)] + [self.path]
+        return [path for path in candidates if os.path.exists(path)]
+
+    def read(self) -> list[dict]:
+        entries = []
+        for path in self.files():
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        # a line cut short by a concurrent rotation in another worker
+                        continue
+        return entries
+
+    def close(self) -> None:
+        if self._handler is not None:
+            self._handler.close()
+            self._handler = None
+
+log = SlowQueryLog(os.path.join(DATA_DIR, "slow_queries.jsonl"))
+
+def explain(dbapi_connection, statement: str, parameters) -> list[str] | None:
+    """``EXPLAIN QUERY PLAN`` details for ``statement``, or None when SQLite can't explain it"""
+    cursor = dbapi_connection.cursor()
+    try:
+        rows = cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ()).fetchall()
+    except sqlite3.Error:
+        return None
+    finally:
+        cursor.close()
+    return [row[3] for row in rows]
+
+def _started(conn, cursor, statement, parameters, context, executemany):
+    if SLOW_QUERY_MS > 0:
+        conn.info["slow_query_started"] = time.perf_counter()
+
+def _finished(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop("slow_query_started", None)
+    if started is None:
+        return
+    duration_ms = (time.perf_counter() - started) * 1000
+    if duration_ms < SLOW_QUERY_MS:
+        return
+
+    if executemany:
+        parameters = parameters[0] if parameters else ()
+    try:
+        log.write({
+            "at": datetime.now(timezone.utc).isoformat(),
+            "duration_ms": round(duration_ms, 3),
+            "shape": statement_shape(statement),
+            "statement": statement,
+            "parameters": list(parameters) if isinstance(parameters, (list, tuple)) else parameters,
+            "executemany": executemany,
+            "plan": explain(conn.connection.dbapi_connection, statement, parameters),
+        })
+    except OSError:
+        logger.exception("Could not write the slow-query log")
+
+def _failed(exception_context):
+    if exception_context.connection is not None:
+        exception_context.connection.info.pop("slow_query_started", None)
+
+_LISTENERS = (
+    ("before_cursor_execute", _started),
+    ("after_cursor_execute", _finished),
+    ("handle_error", _failed),
+)
+
+def instrument(engine: Engine) -> None:
+    """Log slow statements run on ``engine``"""
+    for name, listener in _LISTENERS:
+        event.listen(engine, name, listener)
+
+def uninstrument(engine: Engine) -> None:
+    for name, listener in _LISTENERS:
+        if event.contains(engine, name, listener):
+            event.remove(engine, name, listener)
+
+# only the app's engine: test, seed, job and benchmark engines have no business in DATA_DIR's log
+instrument(default_engine)
+
+def aggregate(entries: list[dict], limit: int = 20) -> list[dict]:
+    """Slow statements grouped by shape, worst total time first, each with its slowest sample"""
+    groups: dict[str, dict] = {}
+    for entry in entries:
+        group = groups.get(entry["shape"])
+        if group is None:
+            group = groups[entry["shape"]] = {
+                "shape": entry["shape"], "count": 0, "total_ms": 0.0, "max_ms": 0.0, "last_at": None, "slowest": None,
+            }
+        group["count"] += 1
+        group["total_ms"] += entry["duration_ms"]
+        group["last_at"] = max(group["last_at"] or entry["at"], entry["at"])
+        if entry["duration_ms"] >= group["max_ms"]:
+            group["max_ms"] = entry["duration_ms"]
+            group["slowest"] = {key: entry.get(key) for key in ("at", "statement", "parameters", "plan")}
+
+    worst = sorted(groups.values(), key=lambda group: group["total_ms"], reverse=True)[:limit]
+    for group in worst:
+        group["total_ms"] = round(group["total_ms"], 3)
+        group["mean_ms"] = round(group["total_ms"] / group["count"], 3)
+        group["full_scan"] = any(
+            detail.startswith("SCAN") and "USING" not in detail for detail in group["slowest"]["plan"] or ()
+        )
+    return worst
@@ -0,0 +1,121 @@
+"""
+SQL statement recording and N+1 detection.
+
+A ``StatementRecorder`` collects the statements executed while it is active,
+keyed by statement shape (whitespace and expanded ``IN (?, ?, ...)`` lists
+normalized), and flags shapes repeated ``N_PLUS_ONE_THRESHOLD`` times or more
+as N+1 candidates. Recorders are either bound to the current request through a
+contextvar (``record_statements``) or attached to one engine (``listen``).
+
+With ``SQL_DEBUG=1`` the ``StatementCountMiddleware`` records every request and
+adds ``X-SQL-Statements`` (and ``X-SQL-N-Plus-One`` when a shape repeats) to
+the response.
+"""
+import logging
+import os
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+SQL_DEBUG = os.environ.get("SQL_DEBUG", "") == "1"
+
+N_PLUS_ONE_THRESHOLD = 5
+
+_WHITESPACE = re.compile(r"\s+")
+_PARAM_LIST = re.compile(r"\(\?(?:,\s*\?)+\)")
+
+_current: ContextVar["StatementRecorder | None"] = ContextVar("statement_recorder", default=None)
+
+def statement_shape(statement: str) -> str:
+    """Normalize ``statement`` so executions differing only in IN-list length share one shape"""
+    return _PARAM_LIST.sub("(?, ...)", _WHITESPACE.sub(" ", statement).strip())
+
+class StatementRecorder:
+    """Statements executed while recording, in order"""
+
+    def __init__(self):
+        self.statements: list[str] = []
+
+    def record(self, statement: str) -> None:
+        self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def shapes(self) -> Counter:
+        return Counter(statement_shape(s) for s in self.statements)
+
+    def n_plus_one(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> dict[str, int]:
+        """Statement shapes executed at least ``threshold`` times, with their counts"""
+        return {shape: n for shape, n in self.shapes().items() if n >= threshold}
+
+    def report(self) -> str:
+        lines = [f"{self.count} statement(s):"]
+        lines += [f"  {n}x {shape}" for shape, n in self.shapes().most_common()]
+        return "\n".join(lines)
+
+    @contextmanager
+    def listen(self, engine: Engine) -> Iterator["StatementRecorder"]:
+        """Record every statement ``engine`` executes, from any thread, while in the block"""
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            self.record(statement)
+
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield self
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+@contextmanager
+def record_statements() -> Iterator[StatementRecorder]:
+    """
+    Record the statements of the current context (a request, including its
+    threadpool calls, which run in a copy of the context) into a new recorder.
+    """
+    recorder = StatementRecorder()
+    token = _current.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _current.reset(token)
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _record_current(conn, cursor, statement, parameters, context, executemany):
+    recorder = _current.get()
+    if recorder is not None:
+        recorder.record(statement)
+
+class StatementCountMiddleware:
+    """ASGI middleware adding per-request statement counts to responses (dev mode)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with record_statements() as recorder:
+            async def send_with_counts(message):
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-sql-statements", str(recorder.count).encode()))
+
+                    repeated = recorder.n_plus_one()
+                    if repeated:
+                        headers.append((b"x-sql-n-plus-one", str(max(repeated.values())).encode()))
+                        for shape, n in repeated.items():
+                            logger.warning("Possible N+1 in %s %s: %dx %s", scope["method"], scope["path"], n, shape)
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_with_counts)
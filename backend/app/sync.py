@@ -0,0 +1,125 @@
+"""
+Change stamps for delta sync (``GET /sync``).
+
+Every write transaction that creates or updates a floor, room, container or
+item takes a stamp from the ``sync_clock`` row and writes it to the rows'
+``updated_at``; deletes go through triggers that advance the same clock and
+record a ``tombstones`` row, cascaded deletes included. Advancing the clock is
+a write, so it happens under SQLite's single write lock: a transaction that
+commits later always carries a larger stamp, and every stamp up to the
+committed clock value belongs to a finished transaction. That is what makes
+the sync token, a position in ``(stamp, table, id)`` order no greater than the
+clock, safe to resume from.
+
+Stamps are microseconds since the epoch, the wall clock unless that would not
+move the clock forward, so ``updated_at`` stays readable as a time.
+"""
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, text, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from .models import SYNC_TABLES, SyncClock, Tombstone, utcnow
+
+SYNC_TOMBSTONE_DAYS = float(os.environ.get("SYNC_TOMBSTONE_DAYS", "90"))
+
+_STAMP_KEY = "sync_stamp"
+
+_EPOCH = datetime(1970, 1, 1)
+
+_TICK = text(
+    "INSERT INTO sync_clock (id, value, horizon) VALUES (1, :now, 0) "
+    "ON CONFLICT (id) DO UPDATE SET value = max(value + 1, excluded.value) "
+    "RETURNING value"
+)
+
+def to_datetime(stamp: int) -> datetime:
+    """Naive UTC datetime of a clock value, as DateTime columns store it"""
+    return _EPOCH + timedelta(microseconds=stamp)
+
+def to_stamp(value: datetime) -> int:
+    return (value.replace(tzinfo=None) - _EPOCH) // timedelta(microseconds=1)
+
+def tick(connection: Connection) -> int:
+    """Advance the clock on ``connection``'s transaction (taking the write lock) and return the new value"""
+    return connection.execute(_TICK, {"now": to_stamp(utcnow())}).scalar_one()
+
+def clock(connection: Connection) -> tuple[int, int]:
+    """Committed clock value and tombstone horizon"""
+    row = connection.execute(text("SELECT value, horizon FROM sync_clock WHERE id = 1")).first()
+    return (row[0], row[1]) if row is not None else (0, 0)
+
+def restart(connection: Connection, after: int = 0) -> int:
+    """
+    Move the clock past ``after`` and the horizon up to the clock, so every
+    token handed out so far gets a full reset; for writes that bypass the
+    stamps and triggers, such as a bulk reseed.
+
+    Returns:
+        int: the new clock value
+    """
+    return connection.execute(
+        text(
+            "UPDATE sync_clock SET value = max(value, :after + 1), horizon = max(value, :after + 1) "
+            "WHERE id = 1 RETURNING value"
+        ),
+        {"after": after},
+    ).scalar_one()
+
+def _stamp(session: Session) -> datetime:
+    # one stamp per transaction: the lock taken by the first tick is held until commit
+    stamp = session.info.get(_STAMP_KEY)
+    if stamp is None:
+        stamp = session.info[_STAMP_KEY] = to_datetime(tick(session.connection()))
+    return stamp
+
+def _synced(obj) -> bool:
+    table = getattr(obj, "__table__", None)
+    return table is not None and table.name in SYNC_TABLES
+
+@event.listens_for(Session, "before_flush")
+def _stamp_flushed_rows(session: Session, flush_context, instances) -> None:
+    written = [obj for obj in session.new if _synced(obj)]
+    written += [obj for obj in session.dirty if _synced(obj) and session.is_modified(obj, include_collections=False)]
+    if not written and not any(_synced(obj) for obj in session.deleted):
+        return
+    # ticked for deletes too: their cascades can update rows that were never dirty,
+    # and those take the clock value through the models' CLOCK_STAMP onupdate
+    stamp = _stamp(session)
+    for obj in written:
+        obj.updated_at = stamp
+
+@event.listens_for(Session, "do_orm_execute")
+def _stamp_bulk_updates(orm_execute_state) -> None:
+    # query.update() skips the flush; query.delete() is covered by the triggers
+    if not orm_execute_state.is_update:
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or mapper.local_table.name not in SYNC_TABLES:
+        return
+    orm_execute_state.statement = orm_execute_state.statement.values(updated_at=_stamp(orm_execute_state.session))
+
+def _forget_stamp(session: Session, *args) -> None:
+    session.info.pop(_STAMP_KEY, None)
+
+event.listen(Session, "after_commit", _forget_stamp)
+event.listen(Session, "after_rollback", _forget_stamp)
+
+def prune_tombstones(connection: Connection, days: float = SYNC_TOMBSTONE_DAYS) -> int:
+    """
+    Delete tombstones older than ``days`` and move the horizon up to them;
+    clients whose token is older get a full reset from ``GET /sync``.
+
+    Returns:
+        int: tombstones deleted
+    """
+    horizon = to_stamp(utcnow()) - int(days * 86400 * 1_000_000)
+    deleted = connection.execute(
+        Tombstone.__table__.delete().where(Tombstone.deleted_at < to_datetime(horizon))
+    ).rowcount
+    connection.execute(
+        update(SyncClock).where(SyncClock.id == 1, SyncClock.horizon < horizon).values(horizon=horizon)
+    )
+    return deleted
@@ -0,0 +1,137 @@
+"""
+Per-request time breakdown reported in a ``Server-Timing`` header.
+
+With ``SERVER_TIMING=1`` the ``ServerTimingMiddleware`` gives each request a
+``RequestTimer`` (bound through a contextvar, like ``app.statements``) and code
+marks phases with ``timing.phase(name)``:
+
+- ``db``: executing SQL, from the engine's cursor events
+- ``orm``: the route body while it holds a session (``database.get_db``), which
+  is mostly query building and ORM hydration once the inner phases are removed
+- ``serialize``: pydantic validation of response payloads and JSON encoding
+- ``qr``: rendering QR code images
+
+Phases nest and time is exclusive: a ``db`` phase inside ``orm`` is not counted
+twice. Whatever falls outside every phase (routing, middleware, FastAPI's own
+validation) is reported as ``app``, and ``total`` is the whole request up to
+the response headers. When timing is off, ``phase()`` returns a shared no-op
+context manager after a single contextvar lookup.
+"""
+import os
+import time
+from contextlib import nullcontext
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+SERVER_TIMING = os.environ.get("SERVER_TIMING", "") == "1"
+
+_current: ContextVar["RequestTimer | None"] = ContextVar("request_timer", default=None)
+
+_NO_PHASE = nullcontext()
+
+class RequestTimer:
+    """Exclusive time per phase for one request"""
+
+    __slots__ = ("durations", "_stack", "_started")
+
+    def __init__(self):
+        self.durations: dict[str, float] = {}
+        self._stack: list[list] = []  # [phase name, time it last became the innermost phase]
+        self._started = time.perf_counter()
+
+    def enter(self, name: str) -> None:
+        now = time.perf_counter()
+        if self._stack:
+            self._pause(now)
+        self._stack.append([name, now])
+
+    def exit(self) -> None:
+        now = time.perf_counter()
+        self._pause(now)
+        self._stack.pop()
+        if self._stack:
+            self._stack[-1][1] = now
+
+    def _pause(self, now: float) -> None:
+        name, since = self._stack[-1]
+        self.durations[name] = self.durations.get(name, 0.0) + now - since
+
+    def header(self) -> str:
+        """``Server-Timing`` value in milliseconds, counting any still-open phase up to now"""
+        now = time.perf_counter()
+        durations = dict(self.durations)
+        if self._stack:
+            name, since = self._stack[-1]
+            durations[name] = durations.get(name, 0.0) + now - since
+
+        total = now - self._started
+        durations["app"] = max(0.0, total - sum(durations.values()))
+        durations["total"] = total
+        return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in durations.items())
+
+class _Phase:
+    __slots__ = ("_timer", "_name")
+
+    def __init__(self, timer: RequestTimer, name: str):
+        self._timer = timer
+        self._name = name
+
+    def __enter__(self):
+        self._timer.enter(self._name)
+
+    def __exit__(self, *exc_info):
+        self._timer.exit()
+
+def phase(name: str):
+    """Context manager attributing the enclosed time to ``name`` for the current request"""
+    timer = _current.get()
+    if timer is None:
+        return _NO_PHASE
+    return _Phase(timer, name)
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _db_started(conn, cursor, statement, parameters, context, executemany):
+    timer = _current.get()
+    if timer is not None:
+        timer.enter("db")
+        conn.info["request_timer"] = timer
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _db_finished(conn, cursor, statement, parameters, context, executemany):
+    timer = conn.info.pop("request_timer", None)
+    if timer is not None:
+        timer.exit()
+
+@event.listens_for(Engine, "handle_error")
+def _db_failed(exception_context):
+    conn = exception_context.connection
+    timer = conn.info.pop("request_timer", None) if conn is not None else None
+    if timer is not None:
+        timer.exit()
+
+class ServerTimingMiddleware:
+    """ASGI middleware timing each HTTP request and adding a ``Server-Timing`` header"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timer = RequestTimer()
+        token = _current.set(timer)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = [*message.get("headers", []), (b"server-timing", timer.header().encode())]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
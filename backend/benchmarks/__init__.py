@@ -0,0 +1 @@
+# Benchmarks for the Storage Assistant API
@@ -0,0 +1,282 @@
+"""
+Latency of every API route over seeded datasets at several scales.
+
+Each dataset is built with the bulk seeder (``app.seed.bulk``) in a temporary
+DATA_DIR, then every case is requested through the in-process ``TestClient``
+``--repeat`` times. Per case the first (cold cache) sample, p50, p95 and mean
+are written to JSON; with ``--baseline`` the p50s are compared against a
+previous run and the exit status is 1 if any case got slower than
+``--threshold`` times its baseline.
+
+Usage (from backend/):
+    python -m benchmarks.endpoints --sizes small,medium --output bench.json
+    python -m benchmarks.endpoints --sizes small --baseline bench.json --threshold 1.25
+    python -m benchmarks.endpoints --sizes large=500k --cases items_ --cold
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable
+
+# always a fresh directory, even when DATA_DIR is set (as in the dev container): seeding drops every table
+os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="storage-bench-")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from app import cache
+from app.database import SessionLocal, engine
+from app.main import app
+from app.models import Container, Floor, Item
+from app.seed.bulk import VOCABULARY, parse_scale, seed_bulk
+
+SIZES = {"small": 1_000, "medium": 20_000, "large": 200_000}
+
+@dataclass
+class Context:
+    """Ids picked from the seeded dataset that the case paths are formatted with"""
+    floor: int
+    room: int
+    container: int  # the fullest container, as on a busy QR scan
+    other_container: int  # another container in the same room, for moves
+    item: int
+    word: str
+    counter: itertools.count = field(default_factory=itertools.count)
+
+    def unique(self, prefix: str) -> str:
+        return f"{prefix} {next(self.counter)}"
+
+@dataclass
+class Case:
+    name: str
+    method: str
+    path: str  # formatted with the Context fields and whatever ``setup`` returns
+    params: dict | None = None
+    body: Callable[[Context, dict], dict] | None = None  # given the context and what ``setup`` returned
+    setup: Callable[[TestClient, Context], dict] | None = None  # untimed, runs before each request
+
+def _new_item(client: TestClient, ctx: Context) -> dict:
+    item = client.post("/items/", json={"name": ctx.unique("Bench"), "room_id": ctx.room}).json()
+    return {"new_item": item["id"]}
+
+def _new_container(client: TestClient, ctx: Context) -> dict:
+    container = client.post("/containers/", json={"name": ctx.unique("Bench Bin"), "room_id": ctx.room}).json()
+    return {"new_container": container["id"]}
+
+def _new_floor(client: TestClient, ctx: Context) -> dict:
+    return {"new_floor": client.post("/floors/", json={"name": ctx.unique("Bench Floor")}).json()["id"]}
+
+def _move_target(client: TestClient, ctx: Context) -> dict:
+    # alternate between the two containers so every request really moves the item
+    return {"target": (ctx.container, ctx.other_container)[next(ctx.counter) % 2]}
+
+CASES = [
+    Case("root", "GET", "/"),
+    Case("health", "GET", "/health"),
+    Case("admin_cache", "GET", "/admin/cache"),
+    # items
+    Case("items_list", "GET", "/items/"),
+    Case("items_list_deep_page", "GET", "/items/", {"page": 40}),
+    Case("items_list_total_none", "GET", "/items/", {"total": "none"}),
+    Case("items_list_name", "GET", "/items/", {"name": "{word}"}),
+    Case("items_list_rooms", "GET", "/items/", {"rooms": "{room}"}),
+    Case("items_list_containers", "GET", "/items/", {"containers": "{container}"}),
+    Case("items_list_rooms_containers", "GET", "/items/", {"rooms": "{room}", "containers": "{container}"}),
+    Case("items_list_name_rooms", "GET", "/items/", {"name": "{word}", "rooms": "{room}"}),
+    Case("items_list_sort_name", "GET", "/items/", {"sort": "name"}),
+    Case("items_list_sort_quantity_rooms", "GET", "/items/", {"sort": "-quantity", "rooms": "{room}"}),
+    Case("items_list_sparse", "GET", "/items/", {"fields": "id,name,quantity"}),
+    Case("items_detail", "GET", "/items/{item}"),
+    Case("items_create", "POST", "/items/", body=lambda ctx, extra: {"name": ctx.unique("Bench"), "room_id": ctx.room}),
+    Case("items_update_move", "PUT", "/items/{item}",
+         body=lambda ctx, extra: {"container_id": extra["target"]}, setup=_move_target),
+    Case("items_update_quantity", "PUT", "/items/{item}", body=lambda ctx, extra: {"quantity": 5}),
+    Case("items_delete", "DELETE", "/items/{new_item}", setup=_new_item),
+    # containers
+    Case("containers_list", "GET", "/containers/"),
+    Case("containers_list_name", "GET", "/containers/", {"name": "{word}"}),
+    Case("containers_list_rooms", "GET", "/containers/", {"rooms": "{room}"}),
+    Case("containers_list_name_rooms", "GET", "/containers/", {"name": "{word}", "rooms": "{room}"}),
+    Case("containers_list_sort_room", "GET", "/containers/", {"sort": "room"}),
+    Case("containers_all", "GET", "/containers/all"),
+    Case("containers_all_rooms", "GET", "/containers/all", {"rooms": "{room}"}),
+    Case("containers_search", "GET", "/containers/search", {"q": "{word}"}),
+    Case("containers_detail", "GET", "/containers/{container}"),
+    Case("containers_detail_sorted", "GET", "/containers/{container}", {"items_sort": "-quantity"}),
+    Case("containers_create_with_qr", "POST", "/containers/",
+         body=lambda ctx, extra: {"name": ctx.unique("Bench Bin"), "room_id": ctx.room}),
+    Case("containers_update", "PUT", "/containers/{container}", body=lambda ctx, extra: {"name": ctx.unique("Bench Bin")}),
+    Case("containers_delete", "DELETE", "/containers/{new_container}", setup=_new_container),
+    Case("containers_add_item_upsert_existing", "POST", "/containers/{container}/items",
+         body=lambda ctx, extra: {"name": "Bench Existing", "quantity": 1}),
+    Case("containers_add_item_new", "POST", "/containers/{container}/items",
+         body=lambda ctx, extra: {"name": ctx.unique("Bench"), "quantity": 1}),
+    # rooms
+    Case("rooms_list", "GET", "/rooms/"),
+    Case("rooms_all", "GET", "/rooms/all"),
+    Case("rooms_search", "GET", "/rooms/search", {"q": "{word}"}),
+    Case("rooms_detail", "GET", "/rooms/{room}"),
+    Case("rooms_containers", "GET", "/rooms/{room}/containers"),
+    Case("rooms_items", "GET", "/rooms/{room}/items"),
+    Case("rooms_items_sort_name", "GET", "/rooms/{room}/items", {"sort": "name"}),
+    Case("rooms_create", "POST", "/rooms/", body=lambda ctx, extra: {"name": ctx.unique("Bench Room"), "floor_id": ctx.floor}),
+    Case("rooms_update", "PUT", "/rooms/{room}", body=lambda ctx, extra: {"name": ctx.unique("Bench Room")}),
+    Case("rooms_add_item_upsert_existing", "POST", "/rooms/{room}/items",
+         body=lambda ctx, extra: {"name": "Bench Existing", "quantity": 1}),
+    Case("rooms_add_item_new", "POST", "/rooms/{room}/items", body=lambda ctx, extra: {"name": ctx.unique("Bench"), "quantity": 1}),
+    # floors
+    Case("floors_list", "GET", "/floors/"),
+    Case("floors_detail", "GET", "/floors/{floor}"),
+    Case("floors_rooms", "GET", "/floors/{floor}/rooms"),
+    Case("floors_create", "POST", "/floors/", body=lambda ctx, extra: {"name": ctx.unique("Bench Floor")}),
+    Case("floors_update", "PUT", "/floors/{floor}", body=lambda ctx, extra: {"name": ctx.unique("Bench Floor")}),
+    Case("floors_delete", "DELETE", "/floors/{new_floor}", setup=_new_floor),
+]
+
+def build_context() -> Context:
+    db = SessionLocal()
+    try:
+        container_id, room_id = db.execute(
+            select(Item.container_id, Item.room_id)
+            .where(Item.container_id.is_not(None))
+            .group_by(Item.container_id, Item.room_id)
+            .order_by(func.count().desc())
+            .limit(1)
+        ).one()
+        other = db.scalar(
+            select(Container.id).where(Container.room_id == room_id, Container.id != container_id).limit(1)
+        )
+        item_id = db.scalar(select(Item.id).where(Item.container_id == container_id).limit(1))
+        floor_id = db.scalar(select(Floor.id).order_by(Floor.id).limit(1))
+        word = db.scalar(select(Item.name).where(Item.id == item_id))
+    finally:
+        db.close()
+
+    return Context(
+        floor=floor_id,
+        room=room_id,
+        container=container_id,
+        other_container=other or container_id,
+        item=item_id,
+        word=word or VOCABULARY[0],
+    )
+
+def _format(value, fields: dict):
+    return value.format(**fields) if isinstance(value, str) else value
+
+def run_case(client: TestClient, case: Case, ctx: Context, repeat: int, cold: bool) -> dict:
+    samples, errors = [], 0
+    for _ in range(repeat):
+        extra = case.setup(client, ctx) if case.setup else {}
+        fields = {**vars(ctx), **extra}
+        path = _format(case.path, fields)
+        params = {key: _format(value, fields) for key, value in (case.params or {}).items()}
+        body = case.body(ctx, extra) if case.body else None
+        if cold:
+            cache.clear_all()
+
+        start = time.perf_counter()
+        response = client.request(case.method, path, params=params, json=body)
+        samples.append((time.perf_counter() - start) * 1000)
+        errors += response.status_code >= 400
+
+    ordered = sorted(samples)
+    return {
+        "first_ms": round(samples[0], 3),
+        "p50_ms": round(statistics.median(ordered), 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "errors": errors,
+    }
+
+def run_size(name: str, scale: int, cases: list[Case], repeat: int, seed: int, cold: bool) -> dict:
+    start = time.perf_counter()
+    counts = seed_bulk(engine, scale, seed)
+    seed_seconds = time.perf_counter() - start
+    cache.clear_all()
+
+    ctx = build_context()
+    results = {}
+    with TestClient(app) as client:
+        for case in cases:
+            results[case.name] = run_case(client, case, ctx, repeat, cold)
+            print(f"{name:<8}{case.name:<40}{results[case.name]['p50_ms']:>10.2f} ms p50", file=sys.stderr)
+
+    return {"scale": scale, "rows": counts, "seed_seconds": round(seed_seconds, 2), "cases": results}
+
+def compare(results: dict, baseline: dict, threshold: float, min_delta_ms: float) -> list[str]:
+    """Describe every case whose p50 regressed beyond ``threshold`` (and ``min_delta_ms``) vs ``baseline``"""
+    regressions = []
+    for size, run in results["sizes"].items():
+        previous = baseline.get("sizes", {}).get(size, {}).get("cases", {})
+        for case, stats in run["cases"].items():
+            if case not in previous:
+                continue
+            before, after = previous[case]["p50_ms"], stats["p50_ms"]
+            if after > before * threshold and after - before > min_delta_ms:
+                regressions.append(f"{size}/{case}: p50 {before:.2f} -> {after:.2f} ms ({after / before:.2f}x)")
+    return regressions
+
+def parse_sizes(value: str) -> dict[str, int]:
+    sizes = {}
+    for part in value.split(","):
+        name, _, scale = part.strip().partition("=")
+        if not scale and name not in SIZES:
+            raise argparse.ArgumentTypeError(f"Unknown size {name!r}; use one of {', '.join(SIZES)} or name=scale")
+        sizes[name] = parse_scale(scale) if scale else SIZES[name]
+    return sizes
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=parse_sizes, default=parse_sizes("small,medium,large"),
+                        help="comma-separated small|medium|large or name=scale (e.g. huge=1M)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cases", default="", help="only run cases whose name starts with this prefix")
+    parser.add_argument("--cold", action="store_true", help="clear the in-process caches before every request")
+    parser.add_argument("--output", default="bench-endpoints.json")
+    parser.add_argument("--baseline", help="previous --output to compare p50 latencies against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="allowed p50 ratio vs the baseline")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="ignore regressions smaller than this")
+    args = parser.parse_args()
+
+    cases = [case for case in CASES if case.name.startswith(args.cases)]
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "cold": args.cold,
+        },
+        "sizes": {
+            name: run_size(name, scale, cases, args.repeat, args.seed, args.cold)
+            for name, scale in args.sizes.items()
+        },
+    }
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"wrote {args.output}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold, args.min_delta_ms)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""
+Concurrent mixed read/write load against a real uvicorn server on a SQLite file.
+
+Starts ``uvicorn app.main:app`` (optionally with several workers) on a seeded
+database, then drives a weighted mix of operations from ``--concurrency``
+async httpx clients for ``--duration`` seconds:
+
+- ``browse``: item, container and room-item list pages with random filters
+- ``detail``: container detail, as opened by a QR scan
+- ``add``: add an item to a container (insert or quantity upsert)
+- ``move``: move an item to another container in the same room
+- ``create``: create a container, rendering its QR code
+
+It reports throughput and, per route, p50/p95/p99 latency, errors and the rate
+of ``database is locked`` responses (503s from the app's lock handler), as a
+table and optionally as JSON. Storage settings are passed to the server
+environment with ``--profile`` or ``--env`` so runs can be compared.
+
+Usage (from backend/):
+    python -m benchmarks.load --scale 20k --duration 30 --concurrency 16
+    python -m benchmarks.load --workers 4 --profile rollback --mix browse=20,add=40,move=40
+    python -m benchmarks.load --data-dir /tmp/household --env SQLITE_JOURNAL_MODE=wal --output load.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+import httpx
+
+from app.seed.bulk import VOCABULARY
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# named sets of server environment variables
+PROFILES = {
+    "wal": {"SQLITE_JOURNAL_MODE": "wal"},
+    "rollback": {"SQLITE_JOURNAL_MODE": "delete"},
+}
+
+DEFAULT_MIX = "browse=45,detail=30,add=12,move=8,create=5"
+
+@dataclass
+class Household:
+    """Ids read from the database so operations target rows that exist"""
+    rooms: list[int]
+    containers_by_room: dict[int, list[int]]
+    items: list[tuple[int, int]]  # (item id, room id)
+
+    @classmethod
+    def load(cls, path: str) -> "Household":
+        conn = sqlite3.connect(path)
+        try:
+            containers_by_room = defaultdict(list)
+            for container_id, room_id in conn.execute("SELECT id, room_id FROM containers WHERE room_id IS NOT NULL"):
+                containers_by_room[room_id].append(container_id)
+            items = conn.execute(
+                "SELECT id, room_id FROM items WHERE container_id IS NOT NULL ORDER BY random() LIMIT 5000"
+            ).fetchall()
+        finally:
+            conn.close()
+        return cls(sorted(containers_by_room), dict(containers_by_room), items)
+
+    def random_container(self, rng: random.Random) -> int:
+        return rng.choice(self.containers_by_room[rng.choice(self.rooms)])
+
+@dataclass
+class Stats:
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    locked: int = 0
+
+async def browse(client: httpx.AsyncClient, rng: random.Random, house: Household) -> tuple[str, httpx.Response]:
+    choice = rng.randrange(3)
+    if choice == 0:
+        params = {"page": rng.randint(1, 5)}
+        if rng.random() < 0.5:
+            params["rooms"] = rng.choice(house.rooms)
+        return "GET /items/", await client.get("/items/", params=params)
+    if choice == 1:
+        params = {"rooms": rng.choice(house.rooms)} if rng.random() < 0.5 else {}
+        return "GET /containers/", await client.get("/containers/", params=params)
+    return "GET /rooms/{id}/items", await client.get(f"/rooms/{rng.choice(house.rooms)}/items")
+
+async def detail(client: httpx.AsyncClient, rng: random.Random, house: Household) -> tuple[str, httpx.Response]:
+    return "GET /containers/{id}", await client.get(f"/containers/{house.random_container(rng)}")
+
+async def add(client: httpx.AsyncClient, rng: random.Random, house: Household) -> tuple[str, httpx.Response]:
+    body = {"name": rng.choice(VOCABULARY), "quantity": rng.randint(1, 5)}
+    return "POST /containers/{id}/items", await client.post(f"/containers/{house.random_container(rng)}/items", json=body)
+
+async def move(client: httpx.AsyncClient, rng: random.Random, house: Household) -> tuple[str, httpx.Response]:
+    item_id, room_id = rng.choice(house.items)
+    body = {"container_id": rng.choice(house.containers_by_room[room_id])}
+    return "PUT /items/{id}", await client.put(f"/items/{item_id}", json=body)
+
+async def create(client: httpx.AsyncClient, rng: random.Random, house: Household) -> tuple[str, httpx.Response]:
+    body = {"name": f"{rng.choice(VOCABULARY)} Bin", "room_id": rng.choice(house.rooms)}
+    return "POST /containers/", await client.post("/containers/", json=body)
+
+OPERATIONS = {"browse": browse, "detail": detail, "add": add, "move": move, "create": create}
+
+def parse_mix(value: str) -> dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"Unknown operation {name!r}; use {', '.join(OPERATIONS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+def parse_env(values: list[str]) -> dict[str, str]:
+    env = {}
+    for value in values:
+        key, sep, setting = value.partition("=")
+        if not sep:
+            raise SystemExit(f"--env expects KEY=VALUE, got {value!r}")
+        env[key] = setting
+    return env
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_server(data_dir: str, workers: int, env: dict[str, str]) -> tuple[subprocess.Popen, str]:
+    port = _free_port()
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning", "--no-access-log",
+        ],
+        cwd=BACKEND_DIR,
+        env={**os.environ, **env, "DATA_DIR": data_dir},
+    )
+    base_url = f"http://127.0.0.1:{port}"
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"uvicorn exited with status {process.returncode}")
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return process, base_url
+        except httpx.TransportError:
+            pass
+        time.sleep(0.1)
+
+    process.terminate()
+    raise SystemExit("uvicorn did not become healthy within 30s")
+
+async def run_load(
+    base_url: str,
+    house: Household,
+    mix: dict[str, float],
+    concurrency: int,
+    duration: float,
+    seed: int,
+) -> tuple[dict[str, Stats], float]:
+    stats: dict[str, Stats] = defaultdict(Stats)
+    names, weights = list(mix), list(mix.values())
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        start = time.perf_counter()
+        deadline = start + duration
+
+        async def user(index: int):
+            rng = random.Random(seed * 1_000 + index)
+            while time.perf_counter() < deadline:
+                operation = OPERATIONS[rng.choices(names, weights)[0]]
+                began = time.perf_counter()
+                try:
+                    route, response = await operation(client, rng, house)
+                except httpx.TransportError:
+                    stats["transport"].errors += 1
+                    continue
+
+                route_stats = stats[route]
+                route_stats.latencies.append((time.perf_counter() - began) * 1000)
+                if response.status_code >= 400:
+                    route_stats.errors += 1
+                    if response.status_code == 503 and "database is locked" in response.text:
+                        route_stats.locked += 1
+
+        await asyncio.gather(*(user(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return stats, elapsed
+
+def _percentile(ordered: list[float], pct: int) -> float:
+    if len(ordered) < 2:
+        return ordered[0] if ordered else 0.0
+    return statistics.quantiles(ordered, n=100, method="inclusive")[pct - 1]
+
+def summarize(stats: dict[str, Stats], elapsed: float) -> dict:
+    routes = {}
+    for route, route_stats in sorted(stats.items()):
+        ordered = sorted(route_stats.latencies)
+        count = len(ordered)
+        routes[route] = {
+            "requests": count,
+            "rps": round(count / elapsed, 1),
+            "p50_ms": round(_percentile(ordered, 50), 2),
+            "p95_ms": round(_percentile(ordered, 95), 2),
+            "p99_ms": round(_percentile(ordered, 99), 2),
+            "errors": route_stats.errors,
+            "locked": route_stats.locked,
+            "locked_rate": round(route_stats.locked / count, 4) if count else 0.0,
+        }
+
+    total = sum(route["requests"] for route in routes.values())
+    locked = sum(route["locked"] for route in routes.values())
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 1),
+        "errors": sum(route["errors"] for route in routes.values()),
+        "locked_rate": round(locked / total, 4) if total else 0.0,
+        "routes": routes,
+    }
+
+def print_report(summary: dict) -> None:
+    print(f"{summary['requests']} requests in {summary['elapsed_s']}s: "
+          f"{summary['throughput_rps']} req/s, {summary['errors']} errors, "
+          f"{summary['locked_rate']:.2%} database is locked")
+    print(f"{'route':<30}{'req':>8}{'req/s':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'err':>6}{'locked':>8}")
+    for route, r in summary["routes"].items():
+        print(f"{route:<30}{r['requests']:>8}{r['rps']:>8}{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}"
+              f"{r['p99_ms']:>9.1f}{r['errors']:>6}{r['locked_rate']:>8.2%}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", help="existing DATA_DIR with storage.db (default: seed a temporary one)")
+    parser.add_argument("--scale", default="20k", help="items to seed when no --data-dir is given")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the dataset and the operation mix")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--concurrency", type=int, default=16, help="simultaneous clients")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of load")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"operation weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--profile", choices=PROFILES, default="wal", help="named server storage settings")
+    parser.add_argument("--env", action="append", default=[], help="extra server env KEY=VALUE (repeatable)")
+    parser.add_argument("--output", help="write the summary as JSON to this path")
+    args = parser.parse_args()
+
+    env = {**PROFILES[args.profile], **parse_env(args.env)}
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix="storage-load-")
+    if not args.data_dir:
+        subprocess.run(
+            [sys.executable, "-m", "app.seed.runner", "--scale", args.scale, "--seed", str(args.seed)],
+            cwd=BACKEND_DIR,
+            env={**os.environ, **env, "DATA_DIR": data_dir},
+            check=True,
+        )
+
+    house = Household.load(os.path.join(data_dir, "storage.db"))
+    process, base_url = start_server(data_dir, args.workers, env)
+    try:
+        stats, elapsed = asyncio.run(
+            run_load(base_url, house, args.mix, args.concurrency, args.duration, args.seed)
+        )
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+    summary = summarize(stats, elapsed)
+    summary["config"] = {
+        "workers": args.workers,
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "mix": args.mix,
+        "profile": args.profile,
+        "env": env,
+        "data_dir": data_dir,
+    }
+    print_report(summary)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Peak RSS of the heavy endpoints on a large seeded dataset.
+
+Seeds ``--scale`` items (default 100k) once, then measures each case in a fresh
+interpreter so peaks don't carry over: the child starts the app, records its
+RSS once warm, requests the case ``--repeat`` times through the in-process
+``TestClient`` and reports its peak RSS (``ru_maxrss``) and the growth over the
+warm baseline. Profiles compare the default limits with ``LOW_MEMORY=1`` (see
+``app.memory``); with ``--budget-mb`` the exit status is 1 if any peak is over.
+
+Usage (from backend/):
+    python -m benchmarks.memory
+    python -m benchmarks.memory --profiles low --budget-mb 120 --output memory.json
+    python -m benchmarks.memory --data-dir /tmp/household --cases items_list,containers_detail
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROFILES = {
+    "default": {},
+    "low": {"LOW_MEMORY": "1"},
+}
+
+# list and detail routes that touch the most rows at 100k items (names from benchmarks.endpoints)
+HEAVY_CASES = (
+    "items_list",
+    "items_list_deep_page",
+    "items_list_name",
+    "items_list_sort_name",
+    "containers_list",
+    "containers_all",
+    "containers_detail",
+    "rooms_list",
+    "rooms_items",
+    "floors_list",
+    "floors_detail",
+)
+
+def current_rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+def run_child(case_name: str, repeat: int) -> dict:
+    """Measure one case in this (fresh) process"""
+    from fastapi.testclient import TestClient
+
+    from benchmarks.endpoints import CASES, build_context, run_case
+    from app.main import app
+
+    case = next(case for case in CASES if case.name == case_name)
+    ctx = build_context()
+    with TestClient(app) as client:
+        client.get("/health")
+        baseline = current_rss_mb()
+        before_peak = peak_rss_mb()
+        timings = run_case(client, case, ctx, repeat, cold=False)
+        after = current_rss_mb()
+
+    return {
+        "baseline_mb": round(baseline, 1),
+        "peak_mb": round(peak_rss_mb(), 1),
+        "growth_mb": round(max(0.0, peak_rss_mb() - max(baseline, before_peak)), 1),
+        "retained_mb": round(after - baseline, 1),
+        "p50_ms": timings["p50_ms"],
+        "errors": timings["errors"],
+    }
+
+def measure(data_dir: str, case_name: str, repeat: int, env: dict[str, str]) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.memory", "--child", case_name, "--repeat", str(repeat)],
+        cwd=BACKEND_DIR,
+        env={**os.environ, **env, "DATA_DIR": data_dir},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", help="existing DATA_DIR with storage.db (default: seed a temporary one)")
+    parser.add_argument("--scale", default="100k", help="items to seed when no --data-dir is given")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=20, help="requests per case")
+    parser.add_argument("--cases", default=",".join(HEAVY_CASES), help="comma-separated case names")
+    parser.add_argument("--profiles", default="default,low", help=f"comma-separated: {', '.join(PROFILES)}")
+    parser.add_argument("--budget-mb", type=float, help="fail when a case's peak RSS exceeds this")
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child, args.repeat)))
+        return
+
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix="storage-memory-")
+    if not args.data_dir:
+        subprocess.run(
+            [sys.executable, "-m", "app.seed.runner", "--scale", args.scale, "--seed", str(args.seed)],
+            cwd=BACKEND_DIR,
+            env={**os.environ, "DATA_DIR": data_dir},
+            check=True,
+        )
+
+    results, over = {}, []
+    print(f"{'profile':<10}{'case':<28}{'baseline':>10}{'peak':>9}{'growth':>9}{'p50 ms':>9}")
+    for profile in args.profiles.split(","):
+        results[profile] = {}
+        for case in args.cases.split(","):
+            stats = measure(data_dir, case, args.repeat, PROFILES[profile])
+            results[profile][case] = stats
+            print(f"{profile:<10}{case:<28}{stats['baseline_mb']:>10.1f}{stats['peak_mb']:>9.1f}"
+                  f"{stats['growth_mb']:>9.1f}{stats['p50_ms']:>9.1f}")
+            if args.budget_mb is not None and stats["peak_mb"] > args.budget_mb:
+                over.append(f"{profile}/{case}: peak {stats['peak_mb']:.1f} MB > {args.budget_mb:.0f} MB")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"data_dir": data_dir, "repeat": args.repeat, "profiles": results}, f, indent=2)
+
+    for line in over:
+        print(f"OVER BUDGET {line}")
+    sys.exit(1 if over else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Compare the legacy ORM + per-row model_validate serialization path with the
+row-tuple projection + single pydantic-core encode path.
+
+Usage (from backend/):
+    python -m benchmarks.serialization --rows 500 --repeat 50
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+# always a fresh directory, even when DATA_DIR is set: nothing here should touch a real storage.db
+os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="storage-bench-")
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import joinedload, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import Container, Floor, Item, Room
+from app.schemas.containers import (
+    ContainerOption,
+    ContainerOptionsResponse,
+    ContainerResponse,
+    PaginatedContainerResponse,
+)
+from app.schemas.items import ItemResponse, PaginatedItemResponse
+from app.serialization import json_response
+from app.services import containers as containers_service
+from app.services import items as items_service
+
+def _fastapi_encode(response_model, content) -> bytes:
+    """What FastAPI does with a returned model: dump, re-validate, serialize, json.dumps"""
+    adapter = TypeAdapter(response_model)
+    value = adapter.validate_python(content.model_dump())
+    return json.dumps(adapter.dump_python(value, mode="json"), ensure_ascii=False, separators=(",", ":")).encode()
+
+def _seed(session_factory, rows: int) -> None:
+    db = session_factory()
+    floor = Floor(name="Ground", floor_number=0)
+    room = Room(name="Garage", floor=floor)
+    containers = [Container(name=f"Bin {i}", room=room, qr_code_path=f"/static/qr_codes/{i}.png") for i in range(rows)]
+    items = [Item(name=f"Item {i}", room=room, container=containers[i % rows], quantity=i) for i in range(rows * 4)]
+    db.add_all([floor, room, *containers, *items])
+    db.commit()
+    db.close()
+
+# legacy paths, as the services and routers behaved before the projection path
+
+def legacy_containers_all(db, limit):
+    query = db.query(Container)
+    total = query.count()
+    containers = query.limit(limit).all()
+    result = ContainerOptionsResponse(
+        data=[ContainerOption.model_validate(c) for c in containers],
+        total=total,
+        hasMore=total > limit,
+    )
+    return _fastapi_encode(ContainerOptionsResponse, result)
+
+def legacy_containers_page(db, page_size):
+    query = db.query(Container).options(joinedload(Container.room))
+    total = query.count()
+    containers = query.limit(page_size).all()
+    result = PaginatedContainerResponse(
+        data=[ContainerResponse.model_validate(c) for c in containers],
+        total=total,
+        page=1,
+        pageSize=page_size,
+    )
+    return _fastapi_encode(PaginatedContainerResponse, result)
+
+def legacy_items_page(db, page_size):
+    query = db.query(Item).options(joinedload(Item.room), joinedload(Item.container))
+    total = query.count()
+    items = query.limit(page_size).all()
+    result = PaginatedItemResponse(
+        data=[ItemResponse.model_validate(i) for i in items],
+        total=total,
+        page=1,
+        pageSize=page_size,
+    )
+    return _fastapi_encode(PaginatedItemResponse, result)
+
+# fast paths, uncached so both sides run their queries every time
+
+def fast_containers_all(db, limit):
+    rows = db.query(Container.id, Container.name, Container.room_id).order_by(Container.id).all()
+    data = [ContainerOption.model_construct(id=r.id, name=r.name, room_id=r.room_id) for r in rows[:limit]]
+    result = ContainerOptionsResponse.model_construct(data=data, total=len(rows), hasMore=len(rows) > limit)
+    return json_response(result).body
+
+def fast_containers_page(db, page_size):
+    ids = tuple(r.id for r in db.query(Container.id).limit(page_size))
+    result = PaginatedContainerResponse.model_validate({
+        "data": containers_service.load_container_rows(db, ids),
+        "total": db.query(Container.id).count(),
+        "page": 1,
+        "pageSize": page_size,
+    })
+    return json_response(result).body
+
+def fast_items_page(db, page_size):
+    ids = tuple(r.id for r in db.query(Item.id).limit(page_size))
+    result = PaginatedItemResponse.model_validate({
+        "data": items_service.load_item_rows(db, ids),
+        "total": db.query(Item.id).count(),
+        "page": 1,
+        "pageSize": page_size,
+    })
+    return json_response(result).body
+
+CASES = {
+    "containers_all": (legacy_containers_all, fast_containers_all),
+    "containers_page": (legacy_containers_page, fast_containers_page),
+    "items_page": (legacy_items_page, fast_items_page),
+}
+
+def _time(fn, session_factory, size, repeat) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        db = session_factory()
+        start = time.perf_counter()
+        fn(db, size)
+        samples.append((time.perf_counter() - start) * 1000)
+        db.close()
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500, help="containers to seed and list (items are 4x)")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    event.listen(engine, "connect", lambda conn, _: conn.execute("PRAGMA foreign_keys = ON"))
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+    _seed(session_factory, args.rows)
+
+    print(f"{'case':<18}{'legacy ms':>12}{'fast ms':>12}{'speedup':>10}")
+    for name, (legacy, fast) in CASES.items():
+        size = args.rows if name == "containers_all" else min(args.rows, 100)
+        legacy_ms = statistics.median(_time(legacy, session_factory, size, args.repeat))
+        fast_ms = statistics.median(_time(fast, session_factory, size, args.repeat))
+        print(f"{name:<18}{legacy_ms:>12.2f}{fast_ms:>12.2f}{legacy_ms / fast_ms:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Import time of the app, as a proxy for add-on start and restart time.
+
+Runs ``python -X importtime -c "import app.main"`` in fresh interpreters (the
+fastest of ``--repeat`` runs counts) with DATA_DIR pointing at a directory that
+doesn't exist, so any filesystem work at import shows up as well. Reports the
+total, the self time of the app's own modules and the heaviest imports, and
+exits 1 when the app's own time is over ``--budget-ms`` or a module that
+should load on first use (``LAZY_MODULES``) was imported.
+
+Usage (from backend/):
+    python -m benchmarks.startup
+    python -m benchmarks.startup --repeat 5 --top 25 --budget-ms 250
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from dataclasses import dataclass
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# self time of app.* modules; the framework itself (fastapi, pydantic, sqlalchemy) is outside our control
+APP_BUDGET_MS = 250
+
+# imported on first use, never at startup
+LAZY_MODULES = ("qrcode", "PIL", "dotenv", "faker", "httpx")
+
+@dataclass
+class ImportEntry:
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+@dataclass
+class StartupProfile:
+    entries: list[ImportEntry]
+    data_dir_created: bool
+
+    @property
+    def total_ms(self) -> float:
+        return sum(e.cumulative_us for e in self.entries if e.depth == 0) / 1000
+
+    @property
+    def app_ms(self) -> float:
+        return sum(e.self_us for e in self.entries if e.name == "app" or e.name.startswith("app.")) / 1000
+
+    def imported(self, package: str) -> bool:
+        return any(e.name == package or e.name.startswith(f"{package}.") for e in self.entries)
+
+    def heaviest(self, count: int) -> list[ImportEntry]:
+        return sorted(self.entries, key=lambda e: e.self_us, reverse=True)[:count]
+
+def parse_importtime(stderr: str) -> list[ImportEntry]:
+    """Entries from ``-X importtime`` output: ``import time: self | cumulative | <indent>name``"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append(ImportEntry(name.strip(), int(self_us), int(cumulative_us), depth))
+    return entries
+
+def measure(module: str = "app.main") -> StartupProfile:
+    """Import ``module`` in a fresh interpreter and profile it"""
+    data_dir = os.path.join(tempfile.mkdtemp(prefix="storage-startup-"), "data")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "DATA_DIR": data_dir},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return StartupProfile(parse_importtime(result.stderr), os.path.exists(data_dir))
+
+def fastest(repeat: int, module: str = "app.main") -> StartupProfile:
+    return min((measure(module) for _ in range(repeat)), key=lambda profile: profile.total_ms)
+
+def problems(profile: StartupProfile, budget_ms: float = APP_BUDGET_MS) -> list[str]:
+    found = [f"{package} is imported at startup" for package in LAZY_MODULES if profile.imported(package)]
+    if profile.app_ms > budget_ms:
+        found.append(f"app modules take {profile.app_ms:.1f}ms to import (budget {budget_ms:.0f}ms)")
+    if profile.data_dir_created:
+        found.append("importing the app created DATA_DIR")
+    return found
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="interpreter runs; the fastest counts")
+    parser.add_argument("--top", type=int, default=15, help="heaviest modules to list")
+    parser.add_argument("--budget-ms", type=float, default=APP_BUDGET_MS, help="budget for the app's own modules")
+    args = parser.parse_args()
+
+    profile = fastest(args.repeat)
+    print(f"import app.main: {profile.total_ms:.1f}ms total, {profile.app_ms:.1f}ms in app modules")
+    print(f"{'self ms':>9}{'cumulative ms':>15}  module")
+    for entry in profile.heaviest(args.top):
+        print(f"{entry.self_us / 1000:>9.1f}{entry.cumulative_us / 1000:>15.1f}  {entry.name}")
+
+    found = problems(profile, args.budget_ms)
+    for problem in found:
+        print(f"FAIL: {problem}")
+    sys.exit(1 if found else 0)
+
+if __name__ == "__main__":
+    main()
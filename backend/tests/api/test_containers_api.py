@@ -1,4 +1,5 @@
 from app.models import Container
+from app.services.pagination import encode_cursor
 from tests.helpers import create_containers, assert_pagination_api_response
 
 def test_get_containers_paginated_api_returns_first_page(client, db_session, room):
@@ -110,4 +111,58 @@ def test_get_container_detail_api_includes_room(client, db_session, room):
     payload = resp.json()
     assert payload["room"] is not None
     assert payload["room"]["id"] == room.id
-    assert payload["room"]["name"] == room.name
\ No newline at end of file
+    assert payload["room"]["name"] == room.name
+
+def test_get_container_detail_api_pages_items(client, db_session, room):
+    """items_page_size and items_cursor page through a container's items"""
+    from tests.helpers import create_items
+
+    container = Container(name="Pantry Bin", room_id=room.id)
+    db_session.add(container)
+    db_session.commit()
+    create_items(db_session, container.id, room.id, count=5)
+
+    first = client.get(f"/containers/{container.id}", params={"items_page_size": 3, "items_sort": "-name"}).json()
+    assert [i["name"] for i in first["items"]] == ["Item 4", "Item 3", "Item 2"]
+    assert first["items_total"] == 5
+    assert first["items_has_more"] is True
+
+    second = client.get(
+        f"/containers/{container.id}",
+        params={"items_page_size": 3, "items_sort": "-name", "items_cursor": first["items_next_cursor"]},
+    ).json()
+    assert [i["name"] for i in second["items"]] == ["Item 1", "Item 0"]
+    assert second["items_has_more"] is False
+    assert second["items_next_cursor"] is None
+
+
+def test_get_container_detail_api_invalid_cursor(client, db_session, room):
+    """A malformed items_cursor is a 400, not a 500"""
+    container = Container(name="Pantry Bin", room_id=room.id)
+    db_session.add(container)
+    db_session.commit()
+
+    resp = client.get(f"/containers/{container.id}", params={"items_cursor": "%%%"})
+    assert resp.status_code == 400
+
+def test_get_container_detail_api_forged_cursor_values(client, db_session, room):
+    """A well-formed cursor carrying values of the wrong type is a 400 as well"""
+    container = Container(name="Pantry Bin", room_id=room.id)
+    db_session.add(container)
+    db_session.commit()
+
+    for sort, value in (("created_at", 123), ("created_at", "yesterday"), ("name", ["a"])):
+        params = {"items_sort": sort, "items_cursor": encode_cursor(sort, value, 5)}
+        resp = client.get(f"/containers/{container.id}", params=params)
+        assert resp.status_code == 400, (sort, value)
+
+
+def test_list_containers_api_sort(client, db_session, room):
+    """GET /containers?sort=-name lists containers in reverse name order"""
+    db_session.add_all([Container(name=name, room_id=room.id) for name in ("Bin B", "Bin C", "Bin A")])
+    db_session.commit()
+
+    resp = client.get("/containers/?sort=-name")
+
+    assert resp.status_code == 200
+    assert [c["name"] for c in resp.json()["data"]] == ["Bin C", "Bin B", "Bin A"]
@@ -0,0 +1,18 @@
+import sqlite3
+
+from sqlalchemy.exc import OperationalError
+
+from app.services import items as items_service
+
+def test_database_locked_is_a_retryable_503(client, monkeypatch):
+    """A SQLite lock timeout surfaces as 503 with Retry-After instead of a 500"""
+    def locked(*args, **kwargs):
+        raise OperationalError("UPDATE items ...", {}, sqlite3.OperationalError("database is locked"))
+
+    monkeypatch.setattr(items_service, "update_item", locked)
+
+    resp = client.put("/items/1", json={"quantity": 2})
+
+    assert resp.status_code == 503
+    assert resp.json()["detail"] == "database is locked"
+    assert resp.headers["retry-after"] == "1"
@@ -0,0 +1,58 @@
+from app.models import Floor
+from tests.helpers import create_containers, create_rooms
+
+def test_get_returns_weak_etag(client, db_session, floor):
+    create_rooms(db_session, floor.id, 3)
+
+    resp = client.get("/rooms/all")
+    assert resp.status_code == 200
+    assert resp.headers["etag"].startswith('W/"')
+    assert resp.headers["cache-control"] == "no-cache"
+
+def test_matching_if_none_match_returns_304(client, db_session, floor):
+    create_rooms(db_session, floor.id, 3)
+    etag = client.get("/rooms/all").headers["etag"]
+
+    resp = client.get("/rooms/all", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.content == b""
+    assert resp.headers["etag"] == etag
+
+def test_write_changes_etag(client, db_session, floor):
+    etag = client.get("/rooms/all").headers["etag"]
+
+    client.post("/rooms/", json={"name": "Garage", "floor_id": floor.id})
+
+    resp = client.get("/rooms/all", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["etag"] != etag
+    assert resp.json()["total"] == 1
+
+def test_etag_depends_on_query_params(client, db_session, room):
+    create_containers(db_session, room.id, 30)
+
+    first = client.get("/containers/?page=1").headers["etag"]
+    second = client.get("/containers/?page=2").headers["etag"]
+    assert first != second
+
+    resp = client.get("/containers/?page=2", headers={"If-None-Match": first})
+    assert resp.status_code == 200
+
+def test_unrelated_write_keeps_etag(client, db_session, room):
+    create_containers(db_session, room.id, 3)
+    etag = client.get("/containers/all").headers["etag"]
+
+    db_session.add(Floor(name="Attic", floor_number=3))
+    db_session.commit()
+
+    resp = client.get("/containers/all", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+
+def test_if_none_match_list_and_wildcard(client, db_session, room):
+    etag = client.get(f"/rooms/{room.id}").headers["etag"]
+
+    resp = client.get(f"/rooms/{room.id}", headers={"If-None-Match": f'W/"stale", {etag}'})
+    assert resp.status_code == 304
+
+    resp = client.get(f"/rooms/{room.id}", headers={"If-None-Match": "*"})
+    assert resp.status_code == 304
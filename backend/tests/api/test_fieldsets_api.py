@@ -0,0 +1,62 @@
+from tests.helpers import create_containers, create_items
+
+def test_items_api_sparse_fields(client, db_session, room, container):
+    create_items(db_session, container.id, room.id, count=3)
+
+    resp = client.get("/items/?fields=name,quantity")
+    assert resp.status_code == 200
+
+    payload = resp.json()
+    assert payload["total"] == 3
+    assert set(payload["data"][0]) == {"id", "name", "quantity"}
+
+def test_items_api_include_without_fields_keeps_scalars(client, db_session, room, container):
+    create_items(db_session, container.id, room.id, count=1)
+
+    item = client.get("/items/?include=room").json()["data"][0]
+
+    assert item["room"] == {"id": room.id, "name": room.name}
+    assert "container" not in item
+    assert item["container_id"] == container.id
+
+def test_item_detail_api_sparse_fields(client, db_session, room, container):
+    items = create_items(db_session, container.id, room.id, count=1)
+
+    resp = client.get(f"/items/{items[0].id}?fields=name&include=container")
+
+    assert resp.json() == {"id": items[0].id, "name": "Item 0", "container": {"id": container.id, "name": container.name}}
+
+def test_containers_api_card_fields(client, db_session, room):
+    containers = create_containers(db_session, room.id, 2)
+    create_items(db_session, containers[0].id, room.id, count=4)
+
+    payload = client.get("/containers/?fields=id,name,item_count").json()
+
+    assert payload["data"][0] == {"id": containers[0].id, "name": "Container 0", "item_count": 4}
+
+def test_container_detail_api_without_items(client, db_session, room, container):
+    create_items(db_session, container.id, room.id, count=2)
+
+    payload = client.get(f"/containers/{container.id}?include=room").json()
+    assert "items" not in payload
+    assert payload["room"]["id"] == room.id
+
+    payload = client.get(f"/containers/{container.id}?fields=name&include=items").json()
+    assert len(payload["items"]) == 2
+
+def test_rooms_api_sparse_counts(client, db_session, room, container):
+    create_items(db_session, container.id, room.id, count=2)
+
+    payload = client.get("/rooms/?fields=name,item_count").json()
+    assert payload["data"] == [{"id": room.id, "name": room.name, "item_count": 2}]
+
+    payload = client.get(f"/rooms/{room.id}?fields=container_count").json()
+    assert payload == {"id": room.id, "container_count": 1}
+
+def test_unknown_field_returns_400(client):
+    resp = client.get("/items/?fields=name,secret")
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == "Unknown field(s): secret"
+
+    resp = client.get("/rooms/?include=containers")
+    assert resp.status_code == 400
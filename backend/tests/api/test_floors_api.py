@@ -72,3 +72,21 @@ def test_get_floor_rooms_api_floor_not_found(client):
     resp = client.get("/floors/99999/rooms")
     assert resp.status_code == 404
     assert resp.json()["detail"] == "Floor not found"
+
+
+def test_delete_floor_api(client, db_session):
+    """DELETE /floors/{id} deletes the floor"""
+    floor = Floor(name="Attic", floor_number=3)
+    db_session.add(floor)
+    db_session.commit()
+
+    resp = client.delete(f"/floors/{floor.id}")
+    assert resp.status_code == 200
+    assert client.get(f"/floors/{floor.id}").status_code == 404
+
+
+def test_delete_floor_api_floor_not_found(client):
+    """DELETE /floors/{id} returns 404 for non-existent floor"""
+    resp = client.delete("/floors/99999")
+    assert resp.status_code == 404
+    assert resp.json()["detail"] == "Floor not found"
@@ -165,6 +165,12 @@ def test_get_items_paginated_api_no_items(client):
     resp = client.get("/items/?page=1")
     assert_pagination_api_response(resp, 200, 0, 1, 0)
 
+def test_get_items_api_documents_its_paginated_response(client):
+    """GET /items declares the paginated item schema in the OpenAPI document"""
+    operation = client.get("/openapi.json").json()["paths"]["/items/"]["get"]
+    schema = operation["responses"]["200"]["content"]["application/json"]["schema"]
+    assert schema == {"$ref": "#/components/schemas/PaginatedItemResponse"}
+
 
 # Filter API tests ----------------------------------------------------------------
 
@@ -273,4 +279,38 @@ def test_filter_items_api_container_room_mismatch_returns_400(client, db_session
     resp = client.get(f"/items/?rooms={room1.id}&containers={container_in_room2.id}")
     
     assert resp.status_code == 400
-    assert resp.json()["detail"] == "One or more containers do not belong to the specified rooms"
\ No newline at end of file
+    assert resp.json()["detail"] == "One or more containers do not belong to the specified rooms"
+
+def test_get_items_api_total_none(client, db_session, room):
+    """GET /items?total=none omits the total and reports hasMore"""
+    create_items(db_session, None, room.id, quantity=1, count=30)
+
+    resp = client.get("/items/?total=none")
+
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["total"] is None
+    assert data["hasMore"] is True
+    assert len(data["data"]) == 25
+
+def test_get_items_api_sort(client, db_session, room):
+    """GET /items?sort= orders the page, with the id breaking ties"""
+    from app.models import Item
+
+    db_session.add_all([
+        Item(name="Tape", room_id=room.id, quantity=2),
+        Item(name="Batteries", room_id=room.id, quantity=8),
+        Item(name="Candles", room_id=room.id, quantity=2),
+    ])
+    db_session.commit()
+
+    by_name = client.get("/items/?sort=name").json()["data"]
+    by_quantity = client.get(f"/items/?sort=-quantity&rooms={room.id}").json()["data"]
+
+    assert [i["name"] for i in by_name] == ["Batteries", "Candles", "Tape"]
+    assert [i["name"] for i in by_quantity] == ["Batteries", "Candles", "Tape"]
+
+def test_get_items_api_unknown_sort(client):
+    resp = client.get("/items/?sort=price")
+
+    assert resp.status_code == 422
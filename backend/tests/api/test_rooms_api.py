@@ -83,3 +83,31 @@ def test_get_room_containers_api_room_not_found(client):
     resp = client.get("/rooms/99999/containers")
     assert resp.status_code == 404
     assert resp.json()["detail"] == "Room not found"
+
+# Room items API tests ------------------------------------------------------------
+
+def test_list_room_items_api_paginates(client, db_session, room, container):
+    """GET /rooms/{id}/items returns a page of the room's items"""
+    create_items(db_session, container.id, room.id, quantity=1, count=30)
+
+    resp = client.get(f"/rooms/{room.id}/items?page_size=20")
+    assert resp.status_code == 200
+
+    payload = resp.json()
+    assert payload["total"] == 30
+    assert payload["pageSize"] == 20
+    assert payload["hasMore"] is True
+    assert len(payload["data"]) == 20
+    assert payload["data"][0]["room"]["id"] == room.id
+
+def test_list_room_items_api_missing_room(client):
+    resp = client.get("/rooms/999/items")
+    assert resp.status_code == 404
+
+def test_list_room_items_api_sort(client, db_session, room, container):
+    """GET /rooms/{id}/items?sort=-name pages through the room's items by name, descending"""
+    create_items(db_session, container.id, room.id, quantity=1, count=12)
+
+    resp = client.get(f"/rooms/{room.id}/items?sort=-name&page_size=3")
+    assert resp.status_code == 200
+    assert [i["name"] for i in resp.json()["data"]] == ["Item 9", "Item 8", "Item 7"]
@@ -0,0 +1,53 @@
+"""
+Statement budgets per endpoint: a page or detail costs a fixed number of
+queries however many rows it shows, and never repeats a query per row.
+"""
+import pytest
+
+from app.models import Item
+from tests.helpers import create_containers, create_items
+
+@pytest.fixture
+def household(db_session, room):
+    containers = create_containers(db_session, room.id, 30)
+    for container in containers[:3]:
+        create_items(db_session, container.id, room.id, count=30)
+    return containers
+
+@pytest.mark.parametrize("path, budget", [
+    ("/items/", 4),
+    ("/items/?rooms={room}&sort=name", 4),
+    ("/items/{item}", 2),
+    ("/containers/", 4),
+    ("/containers/{container}", 4),
+    ("/containers/all", 2),
+    ("/rooms/", 4),
+    ("/rooms/{room}", 2),
+    ("/rooms/{room}/items", 5),
+    ("/rooms/{room}/containers", 3),
+    ("/floors/", 4),
+    ("/floors/{floor}", 3),
+])
+def test_read_budgets(client, db_session, room, household, sql_budget, path, budget):
+    item = db_session.query(Item.id).first().id
+    path = path.format(room=room.id, floor=room.floor_id, container=household[0].id, item=item)
+
+    with sql_budget(budget):
+        resp = client.get(path)
+    assert resp.status_code == 200
+
+# writes include one sync clock tick per transaction (app.sync)
+def test_add_item_to_container_budget(client, household, sql_budget):
+    container_id = household[0].id
+
+    with sql_budget(6):
+        resp = client.post(f"/containers/{container_id}/items", json={"name": "Item 1", "quantity": 1})
+    assert resp.status_code == 200
+
+def test_move_item_budget(client, db_session, household, sql_budget):
+    item = db_session.query(Item.id).first().id
+    target = household[1].id
+
+    with sql_budget(6):
+        resp = client.put(f"/items/{item}", json={"container_id": target})
+    assert resp.status_code == 200
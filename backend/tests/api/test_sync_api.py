@@ -0,0 +1,39 @@
+from tests.helpers import create_containers
+
+def test_sync_api_full_then_incremental(client, db_session, room):
+    containers = create_containers(db_session, room.id, 3)
+
+    resp = client.get("/sync?limit=2")
+    assert resp.status_code == 200
+    first = resp.json()
+    assert first["reset"] is True
+    assert first["more"] is True
+    assert first["deleted"] == {}
+    assert sum(len(table["rows"]) for table in first["changes"].values()) == 2
+
+    token = first["token"]
+    while True:
+        batch = client.get("/sync", params={"since": token}).json()
+        token = batch["token"]
+        if not batch["more"]:
+            break
+
+    db_session.delete(containers[0])
+    db_session.commit()
+
+    resp = client.get("/sync", params={"since": token})
+    assert resp.status_code == 200
+    assert resp.json() == {
+        "token": resp.json()["token"],
+        "more": False,
+        "reset": False,
+        "changes": {},
+        "deleted": {"containers": [containers[0].id]},
+    }
+
+def test_sync_api_rejects_invalid_token(client):
+    resp = client.get("/sync", params={"since": "not-a-token"})
+    assert resp.status_code == 400
+
+def test_sync_api_validates_limit(client):
+    assert client.get("/sync?limit=0").status_code == 422
@@ -1,4 +1,5 @@
-import pytest, os, sys
+import pytest, atexit, os, shutil, sys, tempfile
+from contextlib import contextmanager
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
@@ -7,9 +8,19 @@ from sqlalchemy.pool import StaticPool
 # Ensure backend package is on path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+# the app's lifespan (run by every TestClient) migrates DATA_DIR/storage.db and
+# writes QR codes there: keep it in a throwaway directory, with no job workers
+# or backup schedule running behind the tests
+os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="storage-tests-")
+os.environ["JOB_WORKERS"] = "0"
+os.environ["BACKUP_INTERVAL_HOURS"] = "0"
+atexit.register(shutil.rmtree, os.environ["DATA_DIR"], ignore_errors=True)
+
+from app import cache
 from app.database import Base, get_db
 from app.models import Floor, Room, Container
 from app.main import app
+from app.statements import N_PLUS_ONE_THRESHOLD, StatementRecorder
 
 # shared in-memory SQLite test engine with FK support
 engine = create_engine(
@@ -30,6 +41,7 @@ TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engin
 def db_session():
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
+    cache.clear_all()
     session = TestingSessionLocal()
     try:
         yield session
@@ -51,6 +63,30 @@ def client(db_session):
     app.dependency_overrides.clear()
 
 
+@pytest.fixture(scope="function")
+def sql_budget(db_session):
+    """
+    Assert a block runs at most ``max_statements`` SQL statements and repeats no
+    statement shape ``n_plus_one_threshold`` times:
+
+        with sql_budget(4):
+            client.get("/items/")
+    """
+    @contextmanager
+    def budget(max_statements: int, n_plus_one_threshold: int = N_PLUS_ONE_THRESHOLD):
+        # expire everything the test loaded, so the block pays for its own loads as a real request would
+        db_session.rollback()
+
+        with StatementRecorder().listen(db_session.get_bind()) as recorder:
+            yield recorder
+
+        assert recorder.count <= max_statements, recorder.report()
+        repeated = recorder.n_plus_one(n_plus_one_threshold)
+        assert not repeated, f"possible N+1: {repeated}\n{recorder.report()}"
+
+    return budget
+
+
 # Floor fixture ----------------------------------------------------------------
 @pytest.fixture(scope="function")
 def floor(db_session):
@@ -2,10 +2,16 @@ import os
 import shutil
 import tempfile
 
-from app.models import Container
+import pytest
+from sqlalchemy import event
+
+from app.fieldsets import Fieldset
+from app.models import Container, Item
 from app.schemas.containers import ContainerCreate, ContainerItemCreate
 from app.services import containers as containers_service
-from tests.helpers import create_containers, assert_pagination_service_response
+from app.services.items import ItemSort
+from app.services.pagination import encode_cursor
+from tests.helpers import create_containers, create_items, assert_pagination_service_response
 
 def test_create_container_sets_qr_path(db_session, room):
     tmpdir = tempfile.mkdtemp()
@@ -25,6 +31,22 @@ def test_create_container_sets_qr_path(db_session, room):
         containers_service.QR_DIR = original_dir
         shutil.rmtree(tmpdir, ignore_errors=True)
 
+def test_regenerate_qr_codes_renders_only_missing_images(db_session, room, tmp_path, monkeypatch):
+    monkeypatch.setattr(containers_service, "QR_DIR", str(tmp_path))
+    containers_service.create_container(db_session, ContainerCreate(name="Kept", room_id=room.id))
+    lost = create_containers(db_session, room.id, 2)  # point at bin.png, which isn't there
+    reported = []
+
+    result = containers_service.regenerate_qr_codes(db_session, lambda fraction, message: reported.append(fraction))
+
+    assert result == {"containers": 3, "rendered": 2}
+    assert reported[-1] == 1.0
+    for container in lost:
+        db_session.refresh(container)
+        assert container.qr_code_path == f"/static/qr_codes/container_{container.id}.png"
+        assert os.path.exists(tmp_path / f"container_{container.id}.png")
+    assert containers_service.regenerate_qr_codes(db_session)["rendered"] == 0
+
 def test_create_item_in_container_increments_existing(db_session, room):
     containers = create_containers(db_session, room.id, 1)
     
@@ -277,3 +299,107 @@ def test_list_all_containers_empty(db_session):
     assert len(containers) == 0
     assert total == 0
     assert has_more is False
+
+
+# Sparse fieldset tests -----------------------------------------------------------
+
+def test_sparse_container_page_skips_joins(db_session, room):
+    """A card list asking for id, name and item_count doesn't join rooms"""
+    create_containers(db_session, room.id, 3)
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        result = containers_service.list_containers_paginated(
+            db_session, fieldset=Fieldset(("id", "name", "item_count"))
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert result.data[0] == {"id": result.data[0]["id"], "name": "Container 0", "item_count": 0}
+    assert not any("JOIN" in s for s in statements)
+
+
+# Container detail item pages -----------------------------------------------------
+
+def test_get_container_detail_pages_items(db_session, room):
+    """get_container_detail returns one page of items with the total and a cursor"""
+    container = create_containers(db_session, room.id, 1)[0]
+    create_items(db_session, container.id, room.id, count=5)
+
+    result = containers_service.get_container_detail(db_session, container.id, items_page_size=2)
+
+    assert [i.name for i in result.items] == ["Item 0", "Item 1"]
+    assert result.items_total == 5
+    assert result.items_has_more is True
+    assert result.items_next_cursor is not None
+
+    second = containers_service.get_container_detail(db_session, container.id, items_page=2, items_page_size=2)
+    assert [i.name for i in second.items] == ["Item 2", "Item 3"]
+
+
+def test_get_container_detail_cursor_walks_sorted_items(db_session, room):
+    """Following items_next_cursor visits every item once in the requested order"""
+    container = create_containers(db_session, room.id, 1)[0]
+    db_session.add_all([
+        Item(name=f"Item {i}", container_id=container.id, room_id=room.id, quantity=i % 3)
+        for i in range(7)
+    ])
+    db_session.commit()
+
+    seen, cursor = [], None
+    while True:
+        result = containers_service.get_container_detail(
+            db_session, container.id, items_page_size=3, items_cursor=cursor, items_sort=ItemSort.quantity_desc
+        )
+        seen.extend((i.quantity, i.id) for i in result.items)
+        cursor = result.items_next_cursor
+        if cursor is None:
+            break
+
+    assert len(seen) == 7
+    assert seen == sorted(seen, key=lambda qi: (-qi[0], -qi[1]))
+
+
+def test_get_container_detail_rejects_cursor_from_other_sort(db_session, room):
+    """A cursor issued for one sort can't be replayed against another"""
+    container = create_containers(db_session, room.id, 1)[0]
+    create_items(db_session, container.id, room.id, count=3)
+    cursor = containers_service.get_container_detail(db_session, container.id, items_page_size=1).items_next_cursor
+
+    with pytest.raises(ValueError):
+        containers_service.get_container_detail(db_session, container.id, items_cursor=cursor, items_sort=ItemSort.name)
+    with pytest.raises(ValueError):
+        containers_service.get_container_detail(db_session, container.id, items_cursor="not-a-cursor")
+    # well-formed, but with a timestamp that isn't a string
+    forged = encode_cursor("created_at", 123, 5)
+    with pytest.raises(ValueError):
+        containers_service.get_container_detail(db_session, container.id, items_cursor=forged, items_sort=ItemSort.created_at)
+
+
+def test_get_container_detail_statement_count_is_fixed(db_session, room):
+    """A full container costs the same number of queries as a nearly empty one (no per-item lazy loads)"""
+    containers = create_containers(db_session, room.id, 2)
+    create_items(db_session, containers[0].id, room.id, count=1)
+    create_items(db_session, containers[1].id, room.id, count=40)
+
+    def count_statements(container_id):
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            containers_service.get_container_detail(db_session, container_id)
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        return len(statements)
+
+    db_session.expire_all()
+    assert count_statements(containers[1].id) == count_statements(containers[0].id)
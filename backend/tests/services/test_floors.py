@@ -1,4 +1,4 @@
-from app.models import Room
+from app.models import Container, Item, Room
 from app.services import floors as floors_service
 from tests.helpers import create_floors, create_rooms, create_containers, create_items, assert_pagination_service_response
 
@@ -83,4 +83,42 @@ def test_get_rooms_for_floor_only_returns_rooms_for_specified_floor(db_session):
     
     result = floors_service.get_rooms_for_floor(db_session, floors[0].id)
     
-    assert len(result) == 3
\ No newline at end of file
+    assert len(result) == 3
+
+
+def test_delete_floor_cascades_in_the_database_without_loading_children(db_session, sql_budget):
+    floors = create_floors(db_session, 1)
+    rooms = create_rooms(db_session, floors[0].id, 2)
+    containers = create_containers(db_session, rooms[0].id, 3)
+    create_items(db_session, containers[0].id, rooms[0].id, count=20)
+    floor_id = floors[0].id
+
+    # the floor lookup, one UPDATE detaching items elsewhere (with its sync clock tick), the DELETE, generation bumps
+    with sql_budget(6) as recorder:
+        floors_service.delete_floor(db_session, floor_id)
+
+    loads = [statement for statement in recorder.statements if statement.startswith("SELECT")]
+    assert not any("FROM items" in statement or "FROM containers" in statement for statement in loads)
+    assert db_session.query(Room).count() == 0
+    assert db_session.query(Item).count() == 0
+    assert db_session.query(Container).count() == 0
+
+def test_delete_floor_keeps_items_elsewhere_in_a_container_moved_onto_it(db_session):
+    floors = create_floors(db_session, 2)
+    kept_room = create_rooms(db_session, floors[0].id, 1)[0]
+    gone_room = create_rooms(db_session, floors[1].id, 1)[0]
+    container = create_containers(db_session, kept_room.id, 1)[0]
+    items = create_items(db_session, container.id, kept_room.id, count=3)
+
+    # moving a container doesn't move its items' room
+    container.room_id = gone_room.id
+    db_session.commit()
+
+    floors_service.delete_floor(db_session, floors[1].id)
+
+    assert db_session.query(Container).count() == 0
+    assert db_session.query(Item).count() == 3
+    for item in items:
+        db_session.refresh(item)
+        assert item.container_id is None
+        assert item.room_id == kept_room.id
@@ -1,6 +1,7 @@
 from app.models import Item
 from app.schemas.items import ItemCreate, ItemUpdate
 from app.services import items as items_service
+from app.services.pagination import TotalMode
 from tests.helpers import create_items, assert_pagination_service_response
 
 # Create item tests ---------------------------------------------------------------
@@ -372,4 +373,49 @@ def test_filter_no_matches_returns_empty(db_session, room):
     
     assert error is None
     assert result.total == 0
-    assert len(result.data) == 0
\ No newline at end of file
+    assert len(result.data) == 0
+
+# Total mode tests ----------------------------------------------------------------
+
+def test_paginated_items_report_has_more(db_session, room):
+    create_items(db_session, None, room.id, quantity=1, count=30)
+
+    result, _ = items_service.get_items_paginated(db_session, page=1, page_size=25)
+    assert result.hasMore is True
+
+    result, _ = items_service.get_items_paginated(db_session, page=2, page_size=25)
+    assert result.hasMore is False
+
+
+def test_total_none_skips_count(db_session, room):
+    create_items(db_session, None, room.id, quantity=1, count=30)
+
+    result, _ = items_service.get_items_paginated(db_session, page=1, total_mode=TotalMode.none)
+
+    assert result.total is None
+    assert result.hasMore is True
+    assert len(result.data) == 25
+
+
+def test_total_estimate_uses_last_known_count(db_session, room):
+    create_items(db_session, None, room.id, quantity=1, count=60)
+    items_service.get_items_paginated(db_session, page=1)
+
+    # a write makes the cached count stale, but estimates may still use it
+    create_items(db_session, None, room.id, quantity=1, count=1)
+    result, _ = items_service.get_items_paginated(db_session, page=1, total_mode=TotalMode.estimate)
+    assert result.total == 60
+
+    result, _ = items_service.get_items_paginated(db_session, page=1)
+    assert result.total == 61
+
+
+def test_total_estimate_without_cache_is_lower_bound(db_session, room):
+    create_items(db_session, None, room.id, quantity=1, count=60)
+
+    result, _ = items_service.get_items_paginated(db_session, page=1, total_mode=TotalMode.estimate)
+    assert result.total == 26
+
+    # on the last page the total is exact
+    result, _ = items_service.get_items_paginated(db_session, page=3, total_mode=TotalMode.estimate)
+    assert result.total == 60
@@ -0,0 +1,70 @@
+from sqlalchemy import event
+
+from app.models import Container, Room
+from app.services import options
+from tests.helpers import create_containers, create_rooms
+
+class StatementLog:
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements: list[str] = []
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self.statements
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+def test_cached_options_skip_sql(db_session, room):
+    create_containers(db_session, room.id, 5)
+    assert len(options.containers(db_session)) == 5
+    assert options.room_exists(db_session, room.id)
+
+    with StatementLog(db_session.get_bind()) as statements:
+        assert len(options.containers(db_session)) == 5
+        assert options.room_exists(db_session, room.id)
+
+    assert statements == []
+
+def test_options_invalidated_by_commit(db_session, room):
+    create_containers(db_session, room.id, 2)
+    assert len(options.containers(db_session, [room.id])) == 2
+
+    db_session.add(Container(name="New", room_id=room.id))
+    db_session.commit()
+
+    assert len(options.containers(db_session, [room.id])) == 3
+
+def test_options_reflect_renames(db_session, room):
+    assert options.rooms(db_session)[0][1] == "Test room"
+
+    room.name = "Garage"
+    db_session.commit()
+
+    assert options.rooms(db_session)[0][1] == "Garage"
+
+def test_options_filter_multiple_parents_in_id_order(db_session, floor):
+    rooms = create_rooms(db_session, floor.id, 2)
+    db_session.add_all([
+        Container(name="A", room_id=rooms[1].id),
+        Container(name="B", room_id=rooms[0].id),
+        Container(name="C", room_id=rooms[1].id),
+    ])
+    db_session.commit()
+
+    rows = options.containers(db_session, [rooms[1].id, rooms[0].id])
+    assert [name for _, name, _ in rows] == ["A", "B", "C"]
+    assert options.containers(db_session, [9999]) == ()
+
+def test_floor_and_room_exists(db_session, floor):
+    assert options.floor_exists(db_session, floor.id)
+    assert not options.floor_exists(db_session, floor.id + 1)
+
+    db_session.add(Room(name="Late", floor_id=floor.id))
+    db_session.commit()
+    late = db_session.query(Room).filter_by(name="Late").one()
+    assert options.room_exists(db_session, late.id)
@@ -0,0 +1,179 @@
+import threading
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import sync
+from app.database import Base
+from app.models import Container, Floor, Item, Room
+from app.services import sync as sync_service
+from tests.helpers import create_containers, create_items
+
+def _sync_all(db, token=None, batch_size=500) -> tuple[dict, dict, str]:
+    """Follow batches until caught up; returns (rows by table and id, deleted ids by table, last token)"""
+    rows: dict[str, dict] = {}
+    deleted: dict[str, set] = {}
+    while True:
+        batch = sync_service.changes_since(db, token, batch_size)
+        for table, ids in batch["deleted"].items():
+            deleted.setdefault(table, set()).update(ids)
+            for row_id in ids:
+                rows.get(table, {}).pop(row_id, None)
+        for table, changes in batch["changes"].items():
+            for row in changes["rows"]:
+                record = dict(zip(changes["columns"], row))
+                rows.setdefault(table, {})[record["id"]] = record
+                deleted.get(table, set()).discard(record["id"])
+        token = batch["token"]
+        if not batch["more"]:
+            return rows, deleted, token
+
+def test_created_at_is_set_per_row(db_session, room):
+    first = Item(name="First", room_id=room.id)
+    db_session.add(first)
+    db_session.commit()
+    second = Item(name="Second", room_id=room.id)
+    db_session.add(second)
+    db_session.commit()
+
+    assert second.created_at > first.created_at
+
+def test_each_write_transaction_gets_a_later_stamp(db_session, room):
+    item = Item(name="Drill", room_id=room.id)
+    db_session.add(item)
+    db_session.commit()
+    created = item.updated_at
+
+    item.quantity = 3
+    db_session.commit()
+
+    assert item.updated_at > created > room.updated_at
+    assert sync.to_stamp(item.updated_at) <= sync.clock(db_session.connection())[0]
+
+def test_bulk_updates_are_stamped(db_session, room):
+    containers = create_containers(db_session, room.id, 3)
+    before = max(c.updated_at for c in containers)
+
+    db_session.query(Container).filter(Container.room_id == room.id).update({Container.name: "Renamed"})
+    db_session.commit()
+
+    assert all(c.updated_at > before for c in db_session.query(Container))
+
+def test_full_sync_resets_and_pages_through_everything(db_session, room):
+    containers = create_containers(db_session, room.id, 5)
+    create_items(db_session, containers[0].id, room.id, count=12)
+
+    first = sync_service.changes_since(db_session, batch_size=7)
+    rows, _, _ = _sync_all(db_session, batch_size=7)
+
+    assert first["reset"] is True
+    assert first["more"] is True
+    assert sum(len(table["rows"]) for table in first["changes"].values()) == 7
+    assert {table: len(ids) for table, ids in rows.items()} == {"floors": 1, "rooms": 1, "containers": 5, "items": 12}
+    assert set(rows["items"][1]) >= {"id", "name", "quantity", "room_id", "container_id", "updated_at"}
+
+def test_incremental_sync_returns_only_changes_and_deletes(db_session, room):
+    containers = create_containers(db_session, room.id, 3)
+    items = create_items(db_session, containers[0].id, room.id, count=4)
+    _, _, token = _sync_all(db_session)
+
+    items[0].quantity = 9
+    db_session.delete(items[1])
+    db_session.delete(containers[2])
+    db_session.commit()
+
+    batch = sync_service.changes_since(db_session, token)
+
+    assert batch["reset"] is False
+    assert batch["more"] is False
+    assert batch["changes"]["items"]["rows"] == [
+        [getattr(items[0], column) for column in batch["changes"]["items"]["columns"]]
+    ]
+    assert batch["deleted"] == {"items": [items[1].id], "containers": [containers[2].id]}
+    assert sync_service.changes_since(db_session, batch["token"])["changes"] == {}
+
+def test_cascaded_deletes_leave_tombstones(db_session, floor, room):
+    containers = create_containers(db_session, room.id, 2)
+    items = create_items(db_session, containers[0].id, room.id, count=3)
+    expected = {
+        "floors": {floor.id},
+        "rooms": {room.id},
+        "containers": {c.id for c in containers},
+        "items": {i.id for i in items},
+    }
+    _, _, token = _sync_all(db_session)
+
+    db_session.delete(floor)
+    db_session.commit()
+
+    _, deleted, _ = _sync_all(db_session, token)
+    assert deleted == expected
+
+def test_deleting_a_container_stamps_the_items_it_held(db_session, room):
+    container = create_containers(db_session, room.id, 1)[0]
+    container_id = container.id
+    item_ids = {i.id for i in create_items(db_session, container_id, room.id, count=3)}
+    _, _, token = _sync_all(db_session)
+    before = sync.clock(db_session.connection())[0]
+
+    # the flush nulls the items' container_id without them having been dirty
+    db_session.delete(container)
+    db_session.commit()
+
+    rows, deleted, _ = _sync_all(db_session, token)
+    assert deleted == {"containers": {container_id}}
+    assert {row["id"]: row["container_id"] for row in rows["items"].values()} == dict.fromkeys(item_ids)
+    stamps = {sync.to_stamp(item.updated_at) for item in db_session.query(Item)}
+    assert len(stamps) == 1
+    assert before < stamps.pop() <= sync.clock(db_session.connection())[0]
+
+def test_tokens_older_than_pruned_tombstones_reset(db_session, room):
+    _, _, token = _sync_all(db_session)
+    db_session.delete(room)
+    db_session.commit()
+
+    sync.prune_tombstones(db_session.connection(), days=-1)
+    db_session.commit()
+
+    batch = sync_service.changes_since(db_session, token)
+    assert batch["reset"] is True
+    assert batch["deleted"] == {}
+
+def test_concurrent_writers_are_never_skipped(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/sync.db", connect_args={"check_same_thread": False, "timeout": 30})
+    with engine.connect() as connection:
+        connection.exec_driver_sql("PRAGMA journal_mode = wal")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    with Session() as db:
+        db.add(Floor(id=1, name="Ground"))
+        db.add(Room(id=1, name="Garage", floor_id=1))
+        db.commit()
+
+    def writer(offset):
+        with Session() as db:
+            for n in range(40):
+                db.add(Item(name=f"Item {offset + n}", room_id=1))
+                db.commit()
+
+    writers = [threading.Thread(target=writer, args=(offset,)) for offset in (0, 1000, 2000)]
+    for thread in writers:
+        thread.start()
+
+    seen: set[int] = set()
+    token = None
+    with Session() as reader:
+        while any(thread.is_alive() for thread in writers):
+            rows, _, token = _sync_all(reader, token, batch_size=5)
+            seen |= set(rows.get("items", {}))
+            reader.rollback()
+        for thread in writers:
+            thread.join()
+        rows, _, _ = _sync_all(reader, token)
+        seen |= set(rows.get("items", {}))
+        total = reader.query(Item).count()
+    engine.dispose()
+
+    assert total == 120
+    assert len(seen) == 120
@@ -0,0 +1,172 @@
+import gzip
+import os
+import sqlite3
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine
+
+from app import backups
+from app.seed.bulk import seed_bulk
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / "storage.db")
+    engine = create_engine(f"sqlite:///{path}")
+    seed_bulk(engine, 2000, seed=5)
+    engine.dispose()
+    with sqlite3.connect(path) as conn:
+        conn.execute("PRAGMA journal_mode = wal")
+    return path
+
+@pytest.fixture
+def backup_dir(tmp_path):
+    return str(tmp_path / "backups")
+
+def _count(path: str, table: str) -> int:
+    with sqlite3.connect(path) as conn:
+        return conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+
+def test_backup_writes_a_compressed_snapshot_and_manifest(database, backup_dir):
+    manifest = backups.create_backup(backup_dir, database, pages=16, sleep=0)
+
+    assert manifest["counts"]["items"] == 2000
+    assert manifest["counts"]["containers"] == _count(database, "containers")
+    assert manifest["steps"] > 1
+    assert len(manifest["files"]["qr_codes"]) == manifest["counts"]["containers"]
+    assert manifest["compressed_bytes"] < manifest["database_bytes"]
+    with gzip.open(os.path.join(backup_dir, manifest["file"])) as f:
+        assert f.read(16) == b"SQLite format 3\0"
+    assert not [name for name in os.listdir(backup_dir) if name.endswith(".partial")]
+    assert backups.list_backups(backup_dir) == [manifest]
+
+def test_manifests_are_never_listed_half_written(database, backup_dir, monkeypatch):
+    listed = []
+    dump = backups.json.dump
+
+    def dump_and_list(*args, **kwargs):
+        dump(*args, **kwargs)
+        # as a poll of GET /admin/backups might, before the file is closed
+        listed.append(backups.list_backups(backup_dir))
+
+    monkeypatch.setattr(backups.json, "dump", dump_and_list)
+    manifest = backups.create_backup(backup_dir, database, sleep=0)
+
+    assert listed == [[]]
+    assert backups.list_backups(backup_dir) == [manifest]
+
+def test_backup_is_a_consistent_snapshot_while_writes_continue(database, backup_dir):
+    stop = threading.Event()
+    writes = []
+
+    def writer():
+        conn = sqlite3.connect(database, timeout=5)
+        while not stop.is_set():
+            conn.execute("INSERT INTO items (name, room_id, quantity) VALUES ('Late', 1, 1)")
+            conn.commit()
+            writes.append(1)
+            time.sleep(0.001)
+        conn.close()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        manifest = backups.create_backup(backup_dir, database, pages=4, sleep=0.002)
+    finally:
+        stop.set()
+        thread.join()
+
+    # writers were never blocked, and the copy holds exactly the rows of one moment
+    assert writes
+    result = backups.verify_backup(manifest["name"], backup_dir)
+    assert result["ok"], result
+    assert 2000 <= result["counts"]["items"] < 2000 + len(writes) + 1
+
+def test_verify_detects_a_corrupt_archive(database, backup_dir):
+    manifest = backups.create_backup(backup_dir, database, sleep=0)
+    archive = os.path.join(backup_dir, manifest["file"])
+    with gzip.open(archive) as f:
+        data = bytearray(f.read())
+    data[len(data) // 2:len(data) // 2 + 4096] = b"\xff" * 4096
+    with gzip.open(archive, "wb") as f:
+        f.write(bytes(data))
+
+    result = backups.verify_backup(manifest["name"], backup_dir)
+
+    assert not result["ok"]
+
+def test_old_backups_are_rotated(database, backup_dir):
+    names = [backups.create_backup(backup_dir, database, sleep=0, keep=2)["name"] for _ in range(3)]
+
+    assert [m["name"] for m in backups.list_backups(backup_dir)] == names[:0:-1]
+    assert len([n for n in os.listdir(backup_dir) if n.endswith(".db.gz")]) == 2
+
+def test_only_one_backup_runs_at_a_time(database, backup_dir, monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    copy = backups._copy_online
+
+    def slow_copy(*args):
+        started.set()
+        release.wait(5)
+        return copy(*args)
+
+    monkeypatch.setattr(backups, "_copy_online", slow_copy)
+    thread = threading.Thread(target=backups.create_backup, args=(backup_dir, database))
+    thread.start()
+    started.wait(5)
+    try:
+        with pytest.raises(backups.BackupInProgress):
+            backups.create_backup(backup_dir, database)
+    finally:
+        release.set()
+        thread.join()
+
+def test_restore_rejects_unknown_names(backup_dir, tmp_path):
+    with pytest.raises(FileNotFoundError):
+        backups.restore_backup("../storage", str(tmp_path / "out.db"), backup_dir)
+
+def test_backup_endpoints(client, database, backup_dir, monkeypatch):
+    monkeypatch.setattr(backups, "BACKUP_DIR", backup_dir)
+    monkeypatch.setattr(backups, "_database_path", lambda: database)
+
+    assert client.post("/admin/backups").status_code == 202
+    deadline = time.monotonic() + 10
+    while not backups.list_backups(backup_dir) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    while backups.backup_running():
+        time.sleep(0.05)
+
+    listing = client.get("/admin/backups").json()
+    assert listing["running"] is False
+    name = listing["backups"][0]["name"]
+
+    verified = client.post(f"/admin/backups/{name}/verify")
+    assert verified.status_code == 200
+    assert verified.json()["ok"] is True
+    assert client.post("/admin/backups/storage-20000101-000000-000/verify").status_code == 404
+
+def test_failed_backup_is_reported(client, database, backup_dir, monkeypatch):
+    def full_disk(*args):
+        raise OSError(28, "No space left on device")
+
+    create = backups._create_backup
+    monkeypatch.setattr(backups, "BACKUP_DIR", backup_dir)
+    monkeypatch.setattr(backups, "_database_path", lambda: database)
+    monkeypatch.setattr(backups, "_create_backup", full_disk)
+    monkeypatch.setattr(backups, "last_error", None)
+
+    assert client.post("/admin/backups").status_code == 202
+    deadline = time.monotonic() + 10
+    while (backups.last_error is None or backups.backup_running()) and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    listing = client.get("/admin/backups").json()
+    assert listing["running"] is False
+    assert listing["backups"] == []
+    assert "No space left on device" in listing["last_error"]["error"]
+
+    # the next successful backup clears it
+    monkeypatch.setattr(backups, "_create_backup", create)
+    backups.create_backup(backup_dir, database)
+    assert backups.last_error is None
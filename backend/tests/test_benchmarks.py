@@ -0,0 +1,32 @@
+from benchmarks.endpoints import compare, parse_sizes
+from benchmarks.load import Stats, summarize
+from benchmarks.memory import current_rss_mb, peak_rss_mb
+
+def _run(**p50s):
+    return {"sizes": {"small": {"cases": {name: {"p50_ms": value} for name, value in p50s.items()}}}}
+
+def test_compare_flags_only_regressions_beyond_threshold_and_delta():
+    baseline = _run(fast=1.0, slow=10.0, steady=10.0)
+    results = _run(fast=1.8, slow=20.0, steady=11.0, new_case=50.0)
+
+    regressions = compare(results, baseline, threshold=1.25, min_delta_ms=1.0)
+
+    # fast is 1.8x but under the absolute floor, steady is under the ratio, new_case has no baseline
+    assert len(regressions) == 1
+    assert regressions[0].startswith("small/slow:")
+
+def test_parse_sizes():
+    assert parse_sizes("small,large=500k") == {"small": 1_000, "large": 500_000}
+
+def test_load_summary_reports_locked_rate():
+    stats = {"PUT /items/{id}": Stats(latencies=[10.0, 20.0, 30.0, 40.0], errors=1, locked=1)}
+
+    summary = summarize(stats, elapsed=2.0)
+
+    assert summary["requests"] == 4
+    assert summary["throughput_rps"] == 2.0
+    assert summary["routes"]["PUT /items/{id}"]["locked_rate"] == 0.25
+    assert summary["routes"]["PUT /items/{id}"]["p50_ms"] == 25.0
+
+def test_memory_probes_read_this_process():
+    assert 0 < current_rss_mb() <= peak_rss_mb() + 1
@@ -0,0 +1,102 @@
+from app import memory
+from app.cache import GenerationCache, QueryCache, normalize_key
+from app.models import Item
+from app.services import containers as containers_service
+from app.services import items as items_service
+from tests.helpers import create_containers, create_items
+
+def test_normalize_key_ignores_list_order_and_duplicates():
+    assert normalize_key(rooms=[4, 3, 3], name="tape") == normalize_key(name="tape", rooms=[3, 4])
+    assert normalize_key(rooms=[3]) != normalize_key(rooms=[4])
+
+def test_query_cache_hits_until_generation_changes(db_session, room, container):
+    cache = QueryCache("test_items", ["items"])
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return len(calls)
+
+    assert cache.get_or_load(db_session, "k", loader) == 1
+    assert cache.get_or_load(db_session, "k", loader) == 1
+    assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1, "maxsize": 256}
+
+    create_items(db_session, container.id, room.id, count=1)
+    assert cache.get_or_load(db_session, "k", loader) == 2
+
+def test_query_cache_evicts_least_recently_used(db_session):
+    cache = QueryCache("test_lru", ["items"], maxsize=2)
+    cache.get_or_load(db_session, "a", lambda: "a")
+    cache.get_or_load(db_session, "b", lambda: "b")
+    cache.get_or_load(db_session, "a", lambda: "stale")
+    cache.get_or_load(db_session, "c", lambda: "c")
+
+    assert cache.get_or_load(db_session, "a", lambda: "reloaded") == "a"
+    assert cache.get_or_load(db_session, "b", lambda: "reloaded") == "reloaded"
+
+def test_query_cache_expires_after_ttl(db_session):
+    cache = QueryCache("test_ttl", ["items"], ttl=0)
+    cache.get_or_load(db_session, "k", lambda: "first")
+
+    assert cache.get_or_load(db_session, "k", lambda: "second") == "second"
+
+def test_item_pages_cached_and_invalidated(db_session, room, container):
+    create_items(db_session, container.id, room.id, count=30)
+    stats = items_service._paginator.pages.stats
+
+    first, _ = items_service.get_items_paginated(db_session, page=1, rooms=[room.id])
+    hits = stats()["hits"]
+    again, _ = items_service.get_items_paginated(db_session, page=1, rooms=[room.id, room.id])
+    assert stats()["hits"] == hits + 1
+    assert [i.id for i in again.data] == [i.id for i in first.data]
+
+    db_session.delete(db_session.get(Item, first.data[0].id))
+    db_session.commit()
+
+    result, _ = items_service.get_items_paginated(db_session, page=1, rooms=[room.id])
+    assert result.total == 29
+    assert first.data[0].id not in [i.id for i in result.data]
+
+def test_container_pages_reflect_renamed_room(db_session, room):
+    create_containers(db_session, room.id, 3)
+    containers_service.list_containers_paginated(db_session)
+
+    room.name = "Renamed"
+    db_session.commit()
+
+    result = containers_service.list_containers_paginated(db_session)
+    assert {c.room.name for c in result.data} == {"Renamed"}
+
+def test_admin_cache_stats_api(client, db_session, room):
+    create_containers(db_session, room.id, 3)
+    client.get("/containers/?page=1")
+    client.get("/containers/?page=1")
+
+    resp = client.get("/admin/cache")
+    assert resp.status_code == 200
+    assert resp.json()["container_pages"]["hits"] >= 1
+
+def test_cache_sizes_come_from_the_environment(db_session, monkeypatch):
+    monkeypatch.setenv("CACHE_MAXSIZE", "8")
+    monkeypatch.setenv("CACHE_MAXSIZE_TEST_SMALL", "1")
+
+    assert QueryCache("test_default", ["items"]).maxsize == 8
+    small = QueryCache("test_small", ["items"])
+    small.get_or_load(db_session, "a", lambda: "a")
+    small.get_or_load(db_session, "b", lambda: "b")
+    assert small.stats()["entries"] == 1
+
+def test_low_memory_mode_shrinks_cache_defaults(monkeypatch):
+    monkeypatch.setattr(memory, "LOW_MEMORY", True)
+
+    assert QueryCache("test_low_memory", ["items"]).maxsize == 32
+    assert memory.setting("DB_POOL_SIZE", 5, 2) == 2
+
+def test_generation_cache_with_maxsize_zero_always_loads(db_session, monkeypatch):
+    monkeypatch.setenv("CACHE_MAXSIZE_TEST_DISABLED", "0")
+    calls = []
+    cache = GenerationCache("test_disabled", ["rooms"], lambda db: calls.append(1) or len(calls))
+
+    assert cache.get(db_session) == 1
+    assert cache.get(db_session) == 2
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,134 @@
+import asyncio
+import json
+
+from sqlalchemy.orm import load_only
+
+from app import events, maintenance
+from app.events import Subscriber, broadcaster
+from app.models import Floor, Item, Room
+
+def _collect(write, timeout=1.0) -> list[dict]:
+    """Run ``write`` on a worker thread, as FastAPI runs sync routes, and return the events a client receives"""
+    async def main():
+        subscriber = broadcaster.subscribe()
+        try:
+            await asyncio.to_thread(write)
+            return await subscriber.get(timeout)
+        finally:
+            broadcaster.unsubscribe(subscriber)
+
+    return asyncio.run(main())
+
+def test_committed_writes_are_published(db_session, room):
+    def write():
+        item = Item(name="Drill", quantity=1, room_id=room.id)
+        db_session.add(item)
+        db_session.commit()
+        item.quantity = 2
+        db_session.commit()
+
+    changes = _collect(write)
+
+    assert [(c["entity"], c["op"]) for c in changes] == [("item", "created")]
+    # the update coalesced into the create the client hadn't received yet
+    assert changes[0]["data"]["quantity"] == 2
+    assert changes[0]["data"]["name"] == "Drill"
+
+def test_an_update_to_one_column_keeps_the_rest_of_the_created_row(db_session, room):
+    def write():
+        item = Item(name="Drill", quantity=1, room_id=room.id)
+        db_session.add(item)
+        db_session.commit()
+        db_session.expunge(item)
+        item = db_session.query(Item).options(load_only(Item.quantity)).one()
+        item.quantity = 2
+        db_session.commit()
+
+    [change] = _collect(write)
+
+    assert change["op"] == "created"
+    assert change["data"]["quantity"] == 2
+    assert change["data"]["name"] == "Drill"
+    assert change["data"]["room_id"] == room.id
+
+def test_rolled_back_writes_are_not_published(db_session, room):
+    def write():
+        db_session.add(Item(name="Ghost", quantity=1, room_id=room.id))
+        db_session.flush()
+        db_session.rollback()
+
+    assert _collect(write, timeout=0.1) == []
+
+def test_deletes_list_their_cascades(db_session, floor):
+    def write():
+        db_session.delete(floor)
+        db_session.commit()
+
+    [change] = _collect(write)
+
+    assert change["entity"] == "floor"
+    assert change["op"] == "deleted"
+    assert change["id"] == floor.id
+    assert change["cascade"] == ["containers", "items", "rooms"]
+    assert "data" not in change
+
+def test_bulk_updates_publish_one_table_event(db_session, floor):
+    def write():
+        db_session.query(Room).filter(Room.floor_id == floor.id).update({Room.name: "Renamed"})
+        db_session.commit()
+
+    [change] = _collect(write)
+
+    assert (change["entity"], change["op"], change["id"]) == ("room", "bulk_updated", None)
+
+def test_slow_clients_get_coalesced_events_then_a_resync():
+    subscriber = Subscriber(maxsize=2)
+    subscriber.put({"entity": "item", "op": "updated", "id": 1, "data": {"quantity": 1}})
+    subscriber.put({"entity": "item", "op": "updated", "id": 1, "data": {"quantity": 5}})
+    subscriber.put({"entity": "item", "op": "created", "id": 2, "data": {}})
+    subscriber.put({"entity": "item", "op": "deleted", "id": 2})
+
+    changes = asyncio.run(subscriber.get(0))
+    assert changes == [{"entity": "item", "op": "updated", "id": 1, "data": {"quantity": 5}}]
+
+    subscriber.put({"entity": "item", "op": "updated", "id": 1, "data": {"name": "Drill"}})
+    subscriber.put({"entity": "item", "op": "updated", "id": 1, "data": {"quantity": 2}})
+    assert asyncio.run(subscriber.get(0))[0]["data"] == {"name": "Drill", "quantity": 2}
+
+    for n in range(3):
+        subscriber.put({"entity": "item", "op": "updated", "id": n, "data": {}})
+    [resync] = asyncio.run(subscriber.get(0))
+    assert resync["op"] == "resync"
+    assert asyncio.run(subscriber.get(0)) == []
+
+def test_stream_formats_server_sent_events(db_session, room):
+    async def main():
+        checks = iter([False, False, True])
+
+        async def is_disconnected():
+            return next(checks)
+
+        lines = []
+        stream = events.stream(is_disconnected, keepalive=0.05)
+        lines.append(await stream.__anext__())
+        broadcaster.publish([{"entity": "room", "op": "updated", "id": room.id, "data": {"name": "Den"}, "seq": 41}])
+        lines.append(await stream.__anext__())
+        lines.append(await stream.__anext__())
+        async for line in stream:
+            lines.append(line)
+        return lines
+
+    retry, message, keepalive = asyncio.run(main())
+
+    assert retry == "retry: 3000\n\n"
+    header, data = message.strip().split("\n")
+    assert header == "id: 41"
+    assert json.loads(data.removeprefix("data: "))["data"] == {"name": "Den"}
+    assert keepalive == ": keepalive\n\n"
+    assert broadcaster.subscribers == set()
+
+def test_event_streams_do_not_count_as_activity():
+    async def app(scope, receive, send):
+        assert maintenance.activity.in_flight == 0
+
+    asyncio.run(maintenance.ActivityMiddleware(app)({"type": "http", "path": "/events"}, None, None))
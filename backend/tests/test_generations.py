@@ -0,0 +1,77 @@
+from sqlalchemy.orm import Session
+
+from app import generations
+from app.models import Container, Floor, Item, Room
+from tests.helpers import create_containers, create_items
+
+def test_insert_bumps_table_generation(db_session, room):
+    before = generations.current(db_session, ["containers"])
+
+    create_containers(db_session, room.id, 2)
+
+    assert generations.current(db_session, ["containers"]) > before
+
+def test_read_does_not_bump_generation(db_session, room):
+    before = generations.current(db_session, ["rooms", "containers", "items"])
+
+    db_session.query(Room).all()
+    db_session.commit()
+
+    assert generations.current(db_session, ["rooms", "containers", "items"]) == before
+
+def test_update_bumps_only_written_table(db_session, room):
+    before_rooms, before_items = generations.current(db_session, ["rooms", "items"])
+
+    room.name = "Renamed"
+    db_session.commit()
+
+    after_rooms, after_items = generations.current(db_session, ["rooms", "items"])
+    assert after_rooms == before_rooms + 1
+    assert after_items == before_items
+
+def test_rollback_discards_bump(db_session, room):
+    before = generations.current(db_session, ["rooms"])
+
+    room.name = "Renamed"
+    db_session.flush()
+    db_session.rollback()
+
+    assert generations.current(db_session, ["rooms"]) == before
+
+def test_delete_bumps_cascaded_tables(db_session, room, container):
+    create_items(db_session, container.id, room.id, count=2)
+    before = generations.current(db_session, ["floors", "rooms", "containers", "items"])
+
+    db_session.delete(db_session.get(Floor, room.floor_id))
+    db_session.commit()
+
+    after = generations.current(db_session, ["floors", "rooms", "containers", "items"])
+    assert all(a > b for a, b in zip(after, before))
+
+def test_bulk_delete_bumps_generation(db_session, room, container):
+    create_items(db_session, container.id, room.id, count=2)
+    before = generations.current(db_session, ["items"])
+
+    db_session.query(Item).delete()
+    db_session.commit()
+
+    assert generations.current(db_session, ["items"]) > before
+
+def test_other_session_sees_committed_generation(db_session, room):
+    """A second session stands in for another uvicorn worker"""
+    other = Session(bind=db_session.get_bind())
+    try:
+        before = generations.current(other, ["containers"])
+        db_session.add(Container(name="Crate", room_id=room.id))
+        db_session.commit()
+
+        # memoized until the session's transaction ends
+        assert generations.current(other, ["containers"]) == before
+        other.commit()
+        assert generations.current(other, ["containers"]) > before
+    finally:
+        other.close()
+
+def test_with_dependents_follows_cascade_chain():
+    assert generations.with_dependents(["floors"]) >= {"floors", "rooms", "containers", "items"}
+    assert generations.with_dependents(["items"]) == {"items"}
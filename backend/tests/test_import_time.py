@@ -0,0 +1,20 @@
+from benchmarks.startup import APP_BUDGET_MS, fastest, parse_importtime, problems
+
+def test_parse_importtime():
+    entries = parse_importtime(
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |     _io\n"
+        "import time:      2000 |       2500 |   app.models\n"
+        "import time:       300 |       3000 | app\n"
+    )
+
+    assert [(e.name, e.self_us, e.cumulative_us, e.depth) for e in entries] == [
+        ("_io", 120, 120, 2),
+        ("app.models", 2000, 2500, 1),
+        ("app", 300, 3000, 0),
+    ]
+
+def test_app_import_stays_within_budget():
+    profile = fastest(repeat=2)
+
+    assert problems(profile, APP_BUDGET_MS) == [], [f"{e.name}: {e.self_us}us" for e in profile.heaviest(10)]
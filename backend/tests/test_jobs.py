@@ -0,0 +1,169 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, update
+
+from app import jobs
+from app.models import Job
+from app.jobs import JobQueue
+
+failures = {"remaining": 0}
+
+@jobs.handler("test_echo")
+def echo(payload, progress):
+    progress(0.5, "halfway")
+    return {"echo": payload}
+
+@jobs.handler("test_flaky", max_attempts=2)
+def flaky(payload, progress):
+    if failures["remaining"]:
+        failures["remaining"] -= 1
+        raise RuntimeError("flaky")
+    return {"ok": True}
+
+@jobs.handler("test_square", executor="process")
+def square(payload, progress):
+    # runs in a spawned process, which writes its progress straight to the jobs table
+    progress(0.25, "started")
+    return {"square": payload["n"] ** 2}
+
+@pytest.fixture
+def queue(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/storage.db")
+    Job.__table__.create(engine)
+    queue = JobQueue(engine, workers=2, processes=1, poll=0.05)
+    yield queue
+    queue.stop()
+    engine.dispose()
+
+def _wait_for(queue, job_id, status, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job["status"] == status:
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} is {job['status']}, not {status}")
+
+def test_claimed_job_runs_and_records_its_result(queue):
+    job_id = queue.enqueue("test_echo", {"box": 7})
+
+    job = queue.claim()
+    assert job["id"] == job_id
+    assert job["status"] == "running"
+    assert job["attempts"] == 1
+    assert queue.claim() is None
+
+    queue.run(job)
+
+    done = queue.get(job_id)
+    assert done["status"] == "succeeded"
+    assert done["result"] == {"echo": {"box": 7}}
+    assert done["progress"] == 1.0
+    assert done["message"] == "halfway"
+    assert done["finished_at"] is not None
+
+def test_failed_job_is_retried_after_a_backoff(queue, monkeypatch):
+    failures["remaining"] = 1
+    job_id = queue.enqueue("test_flaky")
+
+    queue.run(queue.claim())
+
+    job = queue.get(job_id)
+    assert job["status"] == "queued"
+    assert "RuntimeError: flaky" in job["error"]
+    assert job["run_after"] > datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(seconds=jobs.BACKOFF_SECONDS - 1)
+    assert queue.claim() is None  # not due yet
+
+    with queue.engine.begin() as connection:
+        connection.execute(update(Job).values(run_after=datetime(2000, 1, 1)))
+    queue.run(queue.claim())
+
+    job = queue.get(job_id)
+    assert job["status"] == "succeeded"
+    assert job["attempts"] == 2
+
+def test_job_fails_once_out_of_attempts(queue):
+    failures["remaining"] = 5
+    job_id = queue.enqueue("test_flaky")
+    for _ in range(2):
+        with queue.engine.begin() as connection:
+            connection.execute(update(Job).values(run_after=datetime(2000, 1, 1)))
+        queue.run(queue.claim())
+
+    job = queue.get(job_id)
+    assert job["status"] == "failed"
+    assert job["attempts"] == 2
+    assert queue.claim() is None
+
+def test_backoff_doubles_up_to_a_cap():
+    assert [jobs.backoff(n) for n in (1, 2, 3)] == [jobs.BACKOFF_SECONDS, jobs.BACKOFF_SECONDS * 2, jobs.BACKOFF_SECONDS * 4]
+    assert jobs.backoff(50) == jobs.BACKOFF_MAX_SECONDS
+
+def test_unknown_kinds_are_rejected(queue):
+    with pytest.raises(ValueError):
+        queue.enqueue("no_such_job")
+
+def test_jobs_left_running_by_a_restart_are_requeued(queue):
+    retried = queue.enqueue("test_echo")
+    spent = queue.enqueue("test_echo", max_attempts=1)
+    queue.claim()
+    queue.claim()
+
+    assert queue.requeue_interrupted() == 1
+
+    assert queue.get(retried)["status"] == "queued"
+    assert queue.get(spent)["status"] == "failed"
+
+def test_workers_run_thread_and_process_jobs(queue):
+    queue.start()
+    echo_id = queue.enqueue("test_echo", {"n": 1})
+    square_id = queue.enqueue("test_square", {"n": 12})
+
+    assert _wait_for(queue, echo_id, "succeeded")["result"] == {"echo": {"n": 1}}
+    square = _wait_for(queue, square_id, "succeeded")
+    assert square["result"] == {"square": 144}
+    assert square["message"] == "started"
+
+def test_one_process_runs_workers_per_database(queue):
+    other = JobQueue(queue.engine, poll=0.05)
+    queue.start()
+    job_id = queue.enqueue("test_echo")
+    _wait_for(queue, job_id, "succeeded")
+    try:
+        other.start()
+        time.sleep(0.2)
+        assert other._lock_file is None
+    finally:
+        other.stop()
+
+def test_job_endpoint(client, queue, monkeypatch):
+    monkeypatch.setattr(jobs, "queue", queue)
+    job_id = queue.enqueue("test_echo", {"box": 3})
+
+    resp = client.get(f"/jobs/{job_id}")
+
+    assert resp.status_code == 200
+    assert resp.json()["status"] == "queued"
+    assert resp.json()["payload"] == {"box": 3}
+    assert client.get("/jobs/999").status_code == 404
+
+def test_qr_regeneration_is_queued(client, queue, monkeypatch):
+    monkeypatch.setattr(jobs, "queue", queue)
+
+    resp = client.post("/admin/qr-codes")
+
+    assert resp.status_code == 202
+    assert resp.json()["kind"] == "regenerate_qr_codes"
+    assert queue.get(resp.json()["id"])["status"] == "queued"
+
+def test_queue_without_workers_only_enqueues(queue, tmp_path):
+    idle = JobQueue(queue.engine, workers=0, poll=0.05)
+    idle.start()
+    job_id = idle.enqueue("test_echo", {"box": 1})
+    time.sleep(0.2)
+
+    assert idle.get(job_id)["status"] == "queued"
+    assert not (tmp_path / "storage.db.jobs-lock").exists()
+    idle.stop()
@@ -0,0 +1,101 @@
+import time
+
+import pytest
+from sqlalchemy import create_engine
+
+from app import maintenance
+from app.seed.bulk import seed_bulk
+
+TASKS = {task.name: task for task in maintenance.TASKS}
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/storage.db")
+    with engine.connect() as connection:
+        # what migration 0003 sets up, applied to the empty file before seeding creates tables
+        connection.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+        connection.exec_driver_sql("PRAGMA journal_mode = wal")
+    seed_bulk(engine, 3000, seed=9)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture(autouse=True)
+def fresh_status(monkeypatch):
+    monkeypatch.setattr(maintenance, "status", {})
+    monkeypatch.setattr(maintenance, "_last_started", {})
+    monkeypatch.setattr(maintenance, "activity", maintenance.Activity())
+    monkeypatch.setattr(maintenance, "VACUUM_PAUSE", 0)
+
+def _pragma(engine, name):
+    with engine.connect() as connection:
+        return connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+def test_optimize_analyzes_then_keeps_statistics_current(engine):
+    first = maintenance.run_task(TASKS["optimize"], engine)
+    second = maintenance.run_task(TASKS["optimize"], engine)
+
+    assert first["result"] == {"statement": "ANALYZE"}
+    assert second["result"] == {"statement": "PRAGMA optimize"}
+    with engine.connect() as connection:
+        analyzed = {row[0] for row in connection.exec_driver_sql("SELECT tbl FROM sqlite_stat1")}
+    assert {"items", "containers", "rooms"} <= analyzed
+    assert maintenance.status["optimize"]["runs"] == 2
+
+def test_vacuum_returns_freed_pages_in_batches(engine):
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DELETE FROM items")
+    maintenance.run_task(TASKS["checkpoint"], engine)
+    free = _pragma(engine, "freelist_count")
+    assert free > 20
+
+    result = maintenance.vacuum(engine, lambda: True, pages=10)
+
+    assert result["freed_pages"] == free
+    assert result["batches"] >= free // 10
+    assert _pragma(engine, "freelist_count") == 0
+
+def test_vacuum_stops_when_requests_come_back(engine):
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DELETE FROM items")
+    calls = iter([True, True, False])
+
+    result = maintenance.vacuum(engine, lambda: next(calls), pages=5)
+
+    assert result["batches"] == 2
+    assert result["free_pages"] > 0
+
+def test_checkpoint_is_passive(engine):
+    with engine.begin() as connection:
+        connection.exec_driver_sql("UPDATE items SET quantity = quantity + 1")
+
+    result = maintenance.run_task(TASKS["checkpoint"], engine)["result"]
+
+    assert result["busy"] is False
+    assert result["checkpointed_frames"] == result["wal_frames"] > 0
+
+def test_run_due_only_runs_tasks_whose_interval_passed(engine):
+    assert maintenance.run_due(engine, lambda: True) == ["checkpoint", "vacuum", "optimize", "tombstones"]
+    assert maintenance.run_due(engine, lambda: True) == []
+    assert maintenance.run_due(engine, lambda: False) == []
+
+def test_requests_reset_the_idle_clock(client, monkeypatch):
+    monkeypatch.setattr(maintenance, "MAINTENANCE_IDLE_SECONDS", 0.05)
+    time.sleep(0.06)
+    assert maintenance.is_idle()
+
+    client.get("/health")
+
+    assert not maintenance.is_idle()
+    assert maintenance.activity.in_flight == 0
+
+def test_status_endpoint_reports_last_runs(client, engine):
+    maintenance.run_task(TASKS["checkpoint"], engine)
+
+    body = client.get("/admin/maintenance").json()
+
+    tasks = {task["name"]: task for task in body["tasks"]}
+    assert tasks["checkpoint"]["runs"] == 1
+    assert tasks["checkpoint"]["duration_ms"] >= 0
+    assert tasks["checkpoint"]["next_due_in_seconds"] > 0
+    assert tasks["optimize"]["runs"] == 0
+    assert body["idle"] is False
@@ -0,0 +1,104 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+from sqlalchemy import create_engine, text
+from app import metrics
+from app.metrics import Histogram
+from app.services import containers as containers_service
+from tests.helpers import create_containers
+
+def _samples(text: str) -> dict[str, float]:
+    return {
+        line.rsplit(" ", 1)[0]: float(line.rsplit(" ", 1)[1])
+        for line in text.splitlines()
+        if line and not line.startswith("#")
+    }
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("test_seconds", "Test", ("op",), buckets=(0.1, 1.0))
+    metrics._registry.remove(histogram)
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value, "read")
+
+    samples = _samples("\n".join(histogram.render()))
+
+    assert samples['test_seconds_bucket{op="read",le="0.1"}'] == 1
+    assert samples['test_seconds_bucket{op="read",le="1.0"}'] == 3
+    assert samples['test_seconds_bucket{op="read",le="+Inf"}'] == 4
+    assert samples['test_seconds_count{op="read"}'] == 4
+    assert samples['test_seconds_sum{op="read"}'] == 6.05
+
+def test_label_values_are_escaped():
+    histogram = Histogram("test_seconds", "Test", ("statement",), buckets=(1.0,))
+    metrics._registry.remove(histogram)
+    histogram.observe(0.5, 'SELECT "name"\nFROM items')
+
+    assert 'statement="SELECT \\"name\\"\\nFROM items"' in "\n".join(histogram.render())
+
+@pytest.fixture
+def sql_metrics(db_session):
+    """Observe statements on the test engine, which stands in for the app's"""
+    metrics.instrument(db_session.get_bind())
+    yield
+    metrics.uninstrument(db_session.get_bind())
+
+def test_metrics_endpoint_reports_routes_sql_and_caches(client, db_session, room, sql_metrics):
+    containers = create_containers(db_session, room.id, 2)
+    metrics.clear()
+
+    client.get(f"/containers/{containers[0].id}")
+    client.get(f"/containers/{containers[1].id}")
+    client.get("/containers/999999")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    samples = _samples(response.text)
+
+    # both detail requests share the route template rather than one series per id
+    assert samples['storage_http_request_duration_seconds_count{method="GET",route="/containers/{container_id}",status="200"}'] == 2
+    assert samples['storage_http_request_duration_seconds_count{method="GET",route="/containers/{container_id}",status="404"}'] == 1
+    assert any(
+        name.startswith('storage_sql_statement_duration_seconds_count{statement="SELECT containers.id')
+        for name in samples
+    )
+    assert any(name.startswith("storage_cache_hits_total{cache=") for name in samples)
+
+def test_qr_render_time_is_observed(client, room):
+    tmpdir = tempfile.mkdtemp()
+    original_dir = containers_service.QR_DIR
+    metrics.clear()
+    try:
+        containers_service.QR_DIR = tmpdir
+        client.post("/containers/", json={"name": "Bin", "room_id": room.id})
+    finally:
+        containers_service.QR_DIR = original_dir
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    samples = _samples("\n".join(metrics.render_time.render()))
+    assert samples['storage_image_render_seconds_count{kind="qr"}'] == 1
+
+def test_render_reports_sqlite_file_sizes():
+    tmpdir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmpdir, "storage.db")
+        with open(path, "wb") as f:
+            f.write(b"\0" * 4096)
+
+        samples = _samples(metrics.render(path))
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    assert samples['storage_sqlite_file_bytes{file="db"}'] == 4096
+    assert samples['storage_sqlite_file_bytes{file="wal"}'] == 0
+
+def test_sql_on_other_engines_is_not_observed(tmp_path):
+    other = create_engine(f"sqlite:///{tmp_path}/other.db")
+    metrics.clear()
+    with other.connect() as conn:
+        conn.execute(text("SELECT 42"))
+    other.dispose()
+
+    assert 'statement="SELECT 42"' not in metrics.render(str(tmp_path / "other.db"))
@@ -0,0 +1,215 @@
+import dataclasses
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+from sqlalchemy import create_engine, event, inspect
+
+from app import migrations
+from app.database import Base
+from app.migrations import Migration, backfill, migrate, migrate_for_startup, pending
+from benchmarks.startup import BACKEND_DIR
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/storage.db")
+    yield engine
+    engine.dispose()
+
+def _versions(engine) -> list[int]:
+    with engine.connect() as conn:
+        return [row[0] for row in conn.exec_driver_sql("SELECT version FROM schema_version ORDER BY version")]
+
+def _indexes(engine, table: str) -> set[str]:
+    return {index["name"] for index in inspect(engine).get_indexes(table)}
+
+def test_migrations_are_numbered_in_order():
+    versions = [migration.version for migration in migrations.discover()]
+
+    assert versions == sorted(set(versions))
+    assert versions[0] == 1
+    assert all(migration.description for migration in migrations.discover())
+
+def test_fresh_database_gets_the_model_schema(engine):
+    applied = migrate(engine)
+
+    assert [m.version for m in applied] == [m.version for m in migrations.discover()]
+    assert _versions(engine) == [m.version for m in applied]
+    assert set(Base.metadata.tables) <= set(inspect(engine).get_table_names())
+    assert pending(engine) == []
+    assert migrate(engine) == []
+
+def test_legacy_database_gains_the_missing_indexes(engine):
+    # a database from before the FK and sort indexes existed
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for table in ("rooms", "containers", "items"):
+            for name in _indexes(engine, table):
+                if name not in ("ix_rooms_id", "ix_rooms_name", "ix_containers_id", "ix_containers_name", "ix_items_id", "ix_items_name"):
+                    conn.exec_driver_sql(f"DROP INDEX {name}")
+        conn.exec_driver_sql("DROP TABLE table_generations")
+
+    migrate(engine)
+
+    for table in ("rooms", "containers", "items"):
+        assert {index.name for index in Base.metadata.tables[table].indexes} <= _indexes(engine, table)
+    assert "table_generations" in inspect(engine).get_table_names()
+
+def test_startup_defers_background_migrations(engine, monkeypatch):
+    started = threading.Event()
+    release = threading.Event()
+    order = []
+
+    def slow_index(engine):
+        started.set()
+        release.wait(5)
+        order.append("index")
+
+    fake = [
+        Migration(1, "initial", "", lambda engine: order.append("initial")),
+        Migration(2, "index", "", slow_index, background=True),
+    ]
+    monkeypatch.setattr(migrations, "discover", lambda: fake)
+
+    thread = migrate_for_startup(engine)
+
+    # startup returned with the blocking migration applied while the index is still building
+    assert order == ["initial"]
+    assert started.wait(5)
+    assert _versions(engine) == [1]
+
+    release.set()
+    thread.join(5)
+    assert order == ["initial", "index"]
+    assert _versions(engine) == [1, 2]
+
+def test_background_migration_before_a_blocking_one_is_still_deferred(engine, monkeypatch):
+    order = []
+    fake = [
+        Migration(1, "index", "", lambda engine: order.append("index"), background=True),
+        Migration(2, "column", "", lambda engine: order.append("column")),
+    ]
+    monkeypatch.setattr(migrations, "discover", lambda: fake)
+
+    thread = migrate_for_startup(engine)
+    thread.join(5)
+
+    assert order == ["column", "index"]
+    assert _versions(engine) == [1, 2]
+
+def test_startup_upgrade_of_an_existing_database_defers_the_real_background_migrations(engine, monkeypatch):
+    # a database from before any migration after 0001
+    real = migrations.discover()
+    migrate(engine, real[:1])
+    ran_in = {}
+
+    def recording(migration):
+        def upgrade(engine):
+            ran_in[migration.version] = threading.current_thread().name
+            migration.upgrade(engine)
+        return dataclasses.replace(migration, upgrade=upgrade)
+
+    monkeypatch.setattr(migrations, "discover", lambda: [recording(migration) for migration in real])
+
+    thread = migrate_for_startup(engine)
+    thread.join(30)
+
+    main = threading.current_thread().name
+    assert {version for version, name in ran_in.items() if name == main} == {m.version for m in real[1:] if not m.background}
+    assert {version for version, name in ran_in.items() if name != main} == {m.version for m in real if m.background}
+    assert {m.version for m in real if m.background} == {2, 3}
+    assert _versions(engine) == [m.version for m in real]
+
+def test_concurrent_workers_apply_each_migration_once(engine, monkeypatch):
+    runs = []
+    fake = [Migration(1, "once", "", lambda engine: runs.append(1))]
+    monkeypatch.setattr(migrations, "discover", lambda: fake)
+
+    workers = [threading.Thread(target=migrate, args=(engine,)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert runs == [1]
+    assert _versions(engine) == [1]
+
+def test_backfill_updates_in_chunks(engine):
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE things (id INTEGER PRIMARY KEY, size INTEGER, label TEXT)")
+        conn.exec_driver_sql("INSERT INTO things (size) VALUES " + ", ".join(f"({n})" for n in range(1, 26)))
+
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count(conn, cursor, statement, *args):
+        if statement.startswith("UPDATE"):
+            statements.append(statement)
+
+    updated = backfill(engine, "things", "label = 'big'", where="size > 10", chunk_size=10, pause=0)
+
+    assert updated == 15
+    assert len(statements) == 3
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("SELECT count(*) FROM things WHERE label = 'big'").scalar() == 15
+
+def test_fresh_database_is_created_with_incremental_vacuum(engine):
+    # 0001 sets the mode before any model table exists, so 0003 has nothing to rebuild
+    migrate(engine, migrations.discover()[:1])
+
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA auto_vacuum").scalar() == 2
+
+def test_existing_database_switches_to_incremental_vacuum(engine):
+    Base.metadata.create_all(engine)
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA auto_vacuum").scalar() == 0
+
+    migrate(engine)
+
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA auto_vacuum").scalar() == 2
+
+def test_existing_rows_get_sync_stamps_and_tombstone_triggers(engine):
+    # a database from before delta sync
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("INSERT INTO floors (id, name, created_at) VALUES (1, 'Ground', '2024-05-01 10:00:00.000000')")
+        conn.exec_driver_sql("INSERT INTO rooms (id, name, floor_id, created_at) VALUES (1, 'Garage', 1, NULL)")
+        for table in ("floors", "rooms", "containers", "items"):
+            conn.exec_driver_sql(f"DROP TRIGGER tombstone_{table}")
+            conn.exec_driver_sql(f"DROP INDEX ix_{table}_updated_at")
+            conn.exec_driver_sql(f"ALTER TABLE {table} DROP COLUMN updated_at")
+        conn.exec_driver_sql("DROP TABLE tombstones")
+        conn.exec_driver_sql("DROP TABLE sync_clock")
+
+    migrate(engine)
+
+    with engine.begin() as conn:
+        stamps = conn.exec_driver_sql("SELECT updated_at FROM floors UNION ALL SELECT updated_at FROM rooms").scalars().all()
+        assert stamps == ["2024-05-01 10:00:00.000000", "1970-01-01 00:00:00.000000"]
+        assert conn.exec_driver_sql("SELECT value FROM sync_clock").scalar() > 0
+
+        conn.exec_driver_sql("DELETE FROM rooms")
+        conn.exec_driver_sql("DELETE FROM floors")
+        assert conn.exec_driver_sql("SELECT table_name, row_id FROM tombstones ORDER BY table_name").all() == [
+            ("floors", 1), ("rooms", 1),
+        ]
+    for table in ("floors", "rooms", "containers", "items"):
+        assert f"ix_{table}_updated_at" in _indexes(engine, table)
+
+@pytest.mark.parametrize("command", [["-m", "app.migrations"], ["-m", "app.seed.runner", "--scale", "100"]])
+def test_command_line_tools_create_a_missing_data_dir(tmp_path, command):
+    data_dir = tmp_path / "data"
+
+    subprocess.run(
+        [sys.executable, *command],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "DATA_DIR": str(data_dir)},
+        capture_output=True,
+        check=True,
+    )
+
+    assert (data_dir / "storage.db").exists()
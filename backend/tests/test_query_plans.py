@@ -0,0 +1,68 @@
+"""
+Every supported sort= and filter combination on the item and container listings
+must walk one index (or the table itself, which is in id order) and stop after
+the page, never sort the filtered rows in a temp B-tree.
+"""
+import pytest
+from sqlalchemy import text
+
+from app.models import Container, Item
+from app.services.containers import ContainerSort
+from app.services.items import ItemSort
+from app.services.pagination import after_keyset
+
+ITEM_FILTERS = {
+    "none": None,
+    "room": Item.room_id == 1,
+    "container": Item.container_id == 1,
+    "name": Item.name.ilike("%box%"),
+}
+
+CONTAINER_FILTERS = {
+    "none": None,
+    "room": Container.room_id == 1,
+    "name": Container.name.ilike("%box%"),
+}
+
+def query_plan(db_session, query) -> list[str]:
+    engine = db_session.get_bind()
+    sql = query.statement.compile(engine, compile_kwargs={"literal_binds": True})
+    return [row[3] for row in db_session.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+def page_query(db_session, entity, sort, condition):
+    query = db_session.query(entity.id)
+    if condition is not None:
+        query = query.filter(condition)
+    return query.order_by(*sort.order_by(entity.id)).offset(25).limit(26)
+
+@pytest.mark.parametrize("filter_name", ITEM_FILTERS)
+@pytest.mark.parametrize("sort", list(ItemSort))
+def test_item_sorts_use_an_index(db_session, sort, filter_name):
+    plan = query_plan(db_session, page_query(db_session, Item, sort, ITEM_FILTERS[filter_name]))
+
+    assert not any("TEMP B-TREE" in step for step in plan), plan
+    assert len(plan) == 1, plan
+
+@pytest.mark.parametrize("filter_name", CONTAINER_FILTERS)
+@pytest.mark.parametrize("sort", list(ContainerSort))
+def test_container_sorts_use_an_index(db_session, sort, filter_name):
+    plan = query_plan(db_session, page_query(db_session, Container, sort, CONTAINER_FILTERS[filter_name]))
+
+    assert not any("TEMP B-TREE" in step for step in plan), plan
+    assert len(plan) == 1, plan
+
+@pytest.mark.parametrize("sort", list(ItemSort))
+def test_container_item_keyset_seeks_the_index(db_session, sort):
+    """The container detail cursor continues inside the index instead of rescanning the container"""
+    columns = (*sort.columns(), Item.id)
+    query = (
+        db_session.query(*columns)
+        .filter(Item.container_id == 1)
+        .filter(after_keyset(columns, [1] * len(columns), sort.descending))
+        .order_by(*sort.order_by(Item.id))
+        .limit(51)
+    )
+    plan = query_plan(db_session, query)
+
+    assert not any("TEMP B-TREE" in step for step in plan), plan
+    assert any("container_id=?" in step for step in plan), plan
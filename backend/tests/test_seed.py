@@ -0,0 +1,74 @@
+import pytest
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.orm import Session
+
+from app.models import Container, Item, Room
+from app.seed.bulk import BULK_PRAGMAS, parse_scale, seed_bulk
+from app.services import sync as sync_service
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/seed.db")
+    yield engine
+    engine.dispose()
+
+def test_parse_scale():
+    assert parse_scale("1000") == 1000
+    assert parse_scale("100k") == 100_000
+    assert parse_scale("1M") == 1_000_000
+    assert parse_scale("2.5k") == 2500
+    with pytest.raises(ValueError):
+        parse_scale("lots")
+
+def test_seed_bulk_is_deterministic(engine):
+    def snapshot():
+        with engine.connect() as conn:
+            return conn.execute(select(Item.id, Item.name, Item.container_id, Item.room_id, Item.created_at)).all()
+
+    seed_bulk(engine, 1000, seed=7)
+    first = snapshot()
+    seed_bulk(engine, 1000, seed=7)
+
+    assert snapshot() == first
+    seed_bulk(engine, 1000, seed=8)
+    assert snapshot() != first
+
+def test_seed_bulk_builds_a_consistent_household(engine):
+    counts = seed_bulk(engine, 2000, seed=1)
+
+    with engine.connect() as conn:
+        assert conn.scalar(select(func.count()).select_from(Item)) == counts["items"] == 2000
+        assert conn.scalar(select(func.count()).select_from(Container)) == counts["containers"]
+        assert conn.scalar(select(func.count()).select_from(Room)) == counts["rooms"]
+
+        # an item in a container is in the container's room
+        mismatched = conn.scalar(
+            select(func.count()).select_from(Item).join(Container).where(Container.room_id != Item.room_id)
+        )
+        assert mismatched == 0
+        assert conn.execute(text("PRAGMA foreign_key_check")).all() == []
+        assert "ix_items_room_name" in {row[1] for row in conn.execute(text("PRAGMA index_list(items)"))}
+        assert conn.scalar(text("SELECT count(*) FROM table_generations WHERE table_name = 'items'")) == 1
+
+def test_reseeding_resets_existing_sync_tokens(engine):
+    seed_bulk(engine, 200, seed=1)
+    with Session(engine) as db:
+        token = sync_service.changes_since(db, batch_size=5000)["token"]
+
+    seed_bulk(engine, 200, seed=2)
+
+    with Session(engine) as db:
+        batch = sync_service.changes_since(db, token, batch_size=5000)
+    assert batch["reset"] is True
+    assert len(batch["changes"]["items"]["rows"]) == 200
+
+def test_seed_bulk_leaves_pooled_connections_with_their_pragmas(engine):
+    def pragmas():
+        with engine.connect() as conn:
+            return {name: conn.exec_driver_sql(f"PRAGMA {name}").scalar() for name in BULK_PRAGMAS}
+
+    before = pragmas()
+    seed_bulk(engine, 200, seed=1)
+
+    assert pragmas() == before
+    assert before["synchronous"] != 0
@@ -0,0 +1,45 @@
+import json
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from app.schemas.rooms import RoomOption
+from app.serialization import json_response
+from app.services import containers as containers_service
+from tests.helpers import create_containers, create_items
+
+def test_json_response_copies_route_headers():
+    route_response = Response()
+    del route_response.headers["content-length"]
+    route_response.headers["ETag"] = 'W/"abc"'
+
+    resp = json_response({"ok": True}, route_response)
+
+    assert resp.headers["etag"] == 'W/"abc"'
+    assert resp.headers["content-type"] == "application/json"
+    assert json.loads(resp.body) == {"ok": True}
+
+def test_json_response_with_adapter():
+    adapter = TypeAdapter(list[RoomOption])
+    resp = json_response([RoomOption.model_construct(id=1, name="Garage")], adapter=adapter)
+
+    assert json.loads(resp.body) == [{"id": 1, "name": "Garage"}]
+
+def test_container_projection_counts_items(db_session, room):
+    containers = create_containers(db_session, room.id, 2)
+    create_items(db_session, containers[0].id, room.id, count=3)
+
+    rows = containers_service.load_container_rows(db_session, (containers[1].id, containers[0].id))
+
+    assert [r["id"] for r in rows] == [containers[1].id, containers[0].id]
+    assert [r["item_count"] for r in rows] == [0, 3]
+    assert rows[0]["room"] == {"id": room.id, "name": room.name}
+
+def test_list_api_matches_schema(client, db_session, room, container):
+    create_items(db_session, container.id, room.id, count=2)
+
+    payload = client.get("/items/").json()
+
+    item = payload["data"][0]
+    assert set(item) == {"id", "name", "room_id", "container_id", "quantity", "created_at", "room", "container"}
+    assert item["container"] == {"id": container.id, "name": container.name}
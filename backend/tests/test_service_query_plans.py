@@ -0,0 +1,120 @@
+"""
+Plan regression harness: runs each service call on a filter path (by floor,
+room or container) against a seeded database, records every statement it
+executes with its parameters, and checks ``EXPLAIN QUERY PLAN`` for each one.
+No statement may ``SCAN`` items or containers; it has to ``SEARCH`` an index.
+
+Unfiltered listings and name searches scan by nature and are left out, as are
+the dropdown snapshots in ``services.options``, which read whole tables on
+purpose and are warmed before recording.
+"""
+import re
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app import cache
+from app.schemas.containers import ContainerItemCreate, ContainerUpdate
+from app.schemas.items import ItemUpdate
+from app.schemas.rooms import RoomItemCreate
+from app.seed.bulk import seed_bulk
+from app.services import containers as containers_service
+from app.services import floors as floors_service
+from app.services import items as items_service
+from app.services import options
+from app.services import rooms as rooms_service
+from app.services.containers import ContainerSort
+from app.services.items import ItemSort
+
+FULL_SCAN = re.compile(r"^SCAN (items|containers|rooms)\b")
+EXPLAINABLE = ("SELECT", "UPDATE", "DELETE", "WITH")
+
+# ids present in every seeded dataset; room 1 is on floor 1
+FLOOR, ROOM, CONTAINER = 1, 1, 1
+
+def _second_page_cursor(db):
+    _, _, cursor = containers_service.page_container_items(db, CONTAINER, page_size=2, sort=ItemSort.name)
+    return cursor
+
+CASES = {
+    "items by room": lambda db: items_service.get_items_paginated(db, rooms=[ROOM]),
+    "items by rooms, by name": lambda db: items_service.get_items_paginated(db, rooms=[ROOM, 2], sort=ItemSort.name),
+    "items by container": lambda db: items_service.get_items_paginated(db, containers=[CONTAINER]),
+    "items by room and container": lambda db: items_service.get_items_paginated(
+        db, rooms=[db.info["container_room"]], containers=[CONTAINER], sort=ItemSort.quantity_desc
+    ),
+    "items by room, page 3, no total": lambda db: items_service.get_items_paginated(
+        db, page=3, rooms=[ROOM], total_mode=items_service.TotalMode.none
+    ),
+    "containers by room": lambda db: containers_service.list_containers_paginated(db, rooms=[ROOM]),
+    "containers by room, newest": lambda db: containers_service.list_containers_paginated(
+        db, rooms=[ROOM], sort=ContainerSort.created_at_desc
+    ),
+    "container detail": lambda db: containers_service.get_container_detail(db, CONTAINER),
+    "container detail, sorted": lambda db: containers_service.get_container_detail(db, CONTAINER, items_sort=ItemSort.created_at),
+    "container detail, cursor": lambda db: containers_service.get_container_detail(
+        db, CONTAINER, items_page_size=2, items_cursor=db.info["cursor"], items_sort=ItemSort.name
+    ),
+    "container search in room": lambda db: containers_service.search_containers(db, "bin", [ROOM]),
+    "add item to container": lambda db: containers_service.create_item_in_container(
+        db, CONTAINER, ContainerItemCreate(name="Widget", quantity=1)
+    ),
+    "update container": lambda db: containers_service.update_container(db, CONTAINER, ContainerUpdate(name="Renamed")),
+    "delete container": lambda db: containers_service.delete_container(db, CONTAINER),
+    "room detail": lambda db: rooms_service.get_room_detail(db, ROOM),
+    "room items": lambda db: rooms_service.list_items_in_room(db, ROOM),
+    "room items, by quantity": lambda db: rooms_service.list_items_in_room(db, ROOM, sort=ItemSort.quantity),
+    "add item to room": lambda db: rooms_service.create_item_in_room(db, ROOM, RoomItemCreate(name="Widget", quantity=1)),
+    "floor detail": lambda db: floors_service.get_floor_detail(db, FLOOR),
+    "move item": lambda db: items_service.update_item(db, 1, ItemUpdate(container_id=2)),
+    "delete item": lambda db: items_service.delete_item(db, 1),
+}
+
+@pytest.fixture
+def seeded_session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/plans.db")
+    seed_bulk(engine, 5000, seed=3)
+    cache.clear_all()
+    session = sessionmaker(autoflush=False, bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+        cache.clear_all()
+
+def explain_statements(session, call) -> list[tuple[str, list[str]]]:
+    """Run ``call`` and return the ``EXPLAIN QUERY PLAN`` details of each statement it executed"""
+    executed = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(EXPLAINABLE):
+            executed.append((statement, parameters))
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        call(session)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    connection = session.connection()
+    return [
+        (statement, [row[3] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)])
+        for statement, parameters in executed
+    ]
+
+@pytest.mark.parametrize("case", CASES)
+def test_filter_paths_search_an_index(seeded_session, case):
+    db = seeded_session
+    db.info["container_room"] = containers_service.get_container_detail(db, CONTAINER).room_id
+    db.info["cursor"] = _second_page_cursor(db)
+    options.rooms(db)
+    options.containers(db)
+
+    plans = explain_statements(db, CASES[case])
+
+    assert plans, "the call executed no statements"
+    for statement, plan in plans:
+        assert not any(FULL_SCAN.match(step) for step in plan), f"{statement}\n{plan}"
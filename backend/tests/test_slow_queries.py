@@ -0,0 +1,85 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from app import slow_queries
+from app.models import Item
+from app.slow_queries import SlowQueryLog, aggregate
+
+@pytest.fixture
+def slow_log(db_session, tmp_path, monkeypatch):
+    """Log every statement on the test engine to a temporary slow-query log"""
+    log = SlowQueryLog(str(tmp_path / "slow_queries.jsonl"))
+    monkeypatch.setattr(slow_queries, "log", log)
+    monkeypatch.setattr(slow_queries, "SLOW_QUERY_MS", 1e-9)
+    slow_queries.instrument(db_session.get_bind())
+    yield log
+    slow_queries.uninstrument(db_session.get_bind())
+    log.close()
+
+def test_slow_statements_are_logged_with_parameters_and_plan(db_session, slow_log):
+    db_session.query(Item).filter(Item.name.ilike("%drill%")).all()
+
+    entry = next(e for e in slow_log.read() if e["shape"].startswith("SELECT items.id"))
+    assert entry["parameters"] == ["%drill%"]
+    assert entry["plan"] == ["SCAN items"]
+    assert entry["duration_ms"] > 0
+
+def test_statements_under_the_threshold_are_not_logged(db_session, slow_log, monkeypatch):
+    monkeypatch.setattr(slow_queries, "SLOW_QUERY_MS", 60_000)
+    db_session.execute(text("SELECT 1"))
+
+    assert slow_log.read() == []
+
+def test_log_rotates_and_reads_across_files(tmp_path):
+    log = SlowQueryLog(str(tmp_path / "slow.jsonl"), max_bytes=200, backups=2)
+    try:
+        for n in range(10):
+            log.write({"n": n, "padding": "x" * 50})
+        entries = log.read()
+    finally:
+        log.close()
+
+    assert len(log.files()) == 3
+    # the oldest entries rotated out; the rest read back in order
+    assert [e["n"] for e in entries] == sorted(e["n"] for e in entries)
+    assert entries[-1]["n"] == 9
+
+def test_aggregate_groups_by_shape():
+    entries = [
+        {"at": "2024-01-01T00:00:01", "shape": "SELECT a", "statement": "SELECT a", "parameters": [1], "duration_ms": 120.0, "plan": ["SCAN items"]},
+        {"at": "2024-01-01T00:00:02", "shape": "SELECT a", "statement": "SELECT a", "parameters": [2], "duration_ms": 300.0, "plan": ["SCAN items"]},
+        {"at": "2024-01-01T00:00:03", "shape": "SELECT b", "statement": "SELECT b", "parameters": [], "duration_ms": 150.0,
+         "plan": ["SEARCH items USING INDEX ix_items_room_id (room_id=?)"]},
+    ]
+
+    worst = aggregate(entries)
+
+    assert [group["shape"] for group in worst] == ["SELECT a", "SELECT b"]
+    assert worst[0]["count"] == 2
+    assert worst[0]["total_ms"] == 420.0
+    assert worst[0]["mean_ms"] == 210.0
+    assert worst[0]["max_ms"] == 300.0
+    assert worst[0]["slowest"]["parameters"] == [2]
+    assert worst[0]["last_at"] == "2024-01-01T00:00:02"
+    assert worst[0]["full_scan"] is True
+    assert worst[1]["full_scan"] is False
+    assert aggregate(entries, limit=1) == worst[:1]
+
+def test_admin_endpoint_reports_worst_shapes(client, db_session, slow_log, monkeypatch):
+    client.get("/items/", params={"name": "drill"})
+    monkeypatch.setattr(slow_queries, "SLOW_QUERY_MS", 60_000)  # keep the endpoint's own statements out
+
+    resp = client.get("/admin/slow-queries", params={"limit": 5})
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert 0 < len(body["shapes"]) <= 5
+    assert all({"shape", "count", "total_ms", "mean_ms", "max_ms", "slowest", "full_scan"} <= g.keys() for g in body["shapes"])
+
+def test_other_engines_are_not_logged(tmp_path, slow_log):
+    other = create_engine(f"sqlite:///{tmp_path}/other.db")
+    with other.connect() as conn:
+        conn.execute(text("SELECT 42"))
+    other.dispose()
+
+    assert all(entry["statement"] != "SELECT 42" for entry in slow_log.read())
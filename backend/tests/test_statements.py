@@ -0,0 +1,49 @@
+from fastapi.testclient import TestClient
+
+from app.database import get_db
+from app.main import app
+from app.models import Container
+from app.statements import StatementCountMiddleware, StatementRecorder, record_statements, statement_shape
+from tests.helpers import create_containers, create_items
+
+def test_statement_shape_collapses_in_lists_and_whitespace():
+    a = statement_shape("SELECT items.id FROM items\n  WHERE items.id IN (?, ?, ?)")
+    b = statement_shape("SELECT items.id FROM items WHERE items.id IN (?, ?)")
+
+    assert a == b == "SELECT items.id FROM items WHERE items.id IN (?, ...)"
+
+def test_recorder_flags_lazy_loads_as_n_plus_one(db_session, room):
+    containers = create_containers(db_session, room.id, 6)
+    for container in containers:
+        create_items(db_session, container.id, room.id, count=1)
+    db_session.expire_all()
+
+    with StatementRecorder().listen(db_session.get_bind()) as recorder:
+        # the legacy item_count property lazy-loads each container's items
+        counts = [c.item_count for c in db_session.query(Container).all()]
+
+    assert counts == [1] * 6
+    assert recorder.count == 7
+    [(shape, repeats)] = recorder.n_plus_one().items()
+    assert repeats == 6
+    assert "FROM items" in shape
+
+def test_record_statements_is_scoped_to_the_context(db_session, room):
+    with record_statements() as recorder:
+        db_session.query(Container).all()
+
+    db_session.query(Container).all()
+    assert recorder.count == 1
+
+def test_middleware_adds_statement_count_header(db_session, room):
+    create_containers(db_session, room.id, 3)
+    app.dependency_overrides[get_db] = lambda: db_session
+    try:
+        with TestClient(StatementCountMiddleware(app)) as client:
+            resp = client.get("/containers/")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert resp.status_code == 200
+    assert int(resp.headers["x-sql-statements"]) > 0
+    assert "x-sql-n-plus-one" not in resp.headers
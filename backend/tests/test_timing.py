@@ -0,0 +1,57 @@
+import shutil
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+
+from app import timing
+from app.database import get_db
+from app.main import app
+from app.services import containers as containers_service
+from app.timing import RequestTimer, ServerTimingMiddleware
+from tests.helpers import create_containers
+
+def _parse(header: str) -> dict[str, float]:
+    return {name: float(dur.removeprefix("dur=")) for name, dur in (part.split(";") for part in header.split(", "))}
+
+def test_phases_are_exclusive():
+    timer = RequestTimer()
+    timer.enter("orm")
+    time.sleep(0.01)
+    timer.enter("db")
+    time.sleep(0.02)
+    timer.exit()
+    timer.exit()
+
+    phases = _parse(timer.header())
+
+    assert phases["db"] >= 20
+    assert 10 <= phases["orm"] < 20
+    assert abs(phases["total"] - (phases["orm"] + phases["db"] + phases["app"])) < 0.1
+
+def test_phase_is_a_shared_no_op_without_a_timer():
+    assert timing.phase("db") is timing.phase("orm")
+
+def test_middleware_emits_server_timing(db_session, room):
+    create_containers(db_session, room.id, 3)
+    tmpdir = tempfile.mkdtemp()
+    original_dir = containers_service.QR_DIR
+
+    def override_get_db():
+        with timing.phase("orm"):
+            yield db_session
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        containers_service.QR_DIR = tmpdir
+        with TestClient(ServerTimingMiddleware(app)) as client:
+            listing = client.get("/containers/")
+            created = client.post("/containers/", json={"name": "Bin", "room_id": room.id})
+    finally:
+        app.dependency_overrides.clear()
+        containers_service.QR_DIR = original_dir
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    phases = _parse(listing.headers["server-timing"])
+    assert {"db", "orm", "serialize", "app", "total"} <= phases.keys()
+    assert "qr" in _parse(created.headers["server-timing"])
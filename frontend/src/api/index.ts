@@ -6,9 +6,10 @@ const api = axios.create({
 
 export interface PaginatedResponse<T> {
     data: T[];
-    total: number;
+    total: number | null; // null when requested with total=none
     page: number;
     pageSize: number;
+    hasMore: boolean;
 }
 
 export interface Item {
@@ -39,12 +40,15 @@ export interface ContainerOption {
 
 export interface OptionsResponse<T> {
     data: T[];
-    total: number;
+    total: number | null;
     hasMore: boolean;
 }
 
 export interface ContainerDetail extends Container {
     items: Item[];
+    items_total: number;
+    items_has_more: boolean;
+    items_next_cursor: string | null;
 }
 
 export interface Room {
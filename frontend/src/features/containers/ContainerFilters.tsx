@@ -113,7 +113,7 @@ export default function ContainerFilters({
                     )}
                     {roomsLoaded && hasMoreRooms && (
                         <span className="text-xs text-amber-600">
-                            Showing {allRooms.length} of {totalRooms}. Use search for more.
+                            Showing {allRooms.length}{totalRooms !== null && ` of ${totalRooms}`}. Use search for more.
                         </span>
                     )}
                 </div>
@@ -196,7 +196,7 @@ export default function ItemFilters({
                     )}
                     {roomsLoaded && hasMoreRooms && (
                         <span className="text-xs text-amber-600">
-                            Showing {allRooms.length} of {totalRooms}. Use search for more.
+                            Showing {allRooms.length}{totalRooms !== null && ` of ${totalRooms}`}. Use search for more.
                         </span>
                     )}
                 </div>
@@ -241,7 +241,7 @@ export default function ItemFilters({
                     )}
                     {containersLoaded && hasMoreContainers && (
                         <span className="text-xs text-amber-600">
-                            Showing {allContainers.length} of {totalContainers}. Use search for more.
+                            Showing {allContainers.length}{totalContainers !== null && ` of ${totalContainers}`}. Use search for more.
                         </span>
                     )}
                 </div>
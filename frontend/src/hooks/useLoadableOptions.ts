@@ -2,7 +2,7 @@ import { useState, useCallback } from "react";
 
 interface OptionsResponse<T> {
     data: T[];
-    total: number;
+    total: number | null;
     hasMore: boolean;
 }
 
@@ -11,7 +11,7 @@ interface UseLoadableOptionsReturn<T> {
     loading: boolean;
     error: boolean;
     isLoaded: boolean;
-    total: number;
+    total: number | null;
     hasMore: boolean;
     loadAll: () => Promise<void>;
 }
@@ -29,7 +29,7 @@ export function useLoadableOptions<T>(
     const [options, setOptions] = useState<T[]>([]);
     const [loading, setLoading] = useState(false);
     const [error, setError] = useState(false);
-    const [total, setTotal] = useState(0);
+    const [total, setTotal] = useState<number | null>(0);
     const [hasMore, setHasMore] = useState(false);
 
     const loadAll = useCallback(async () => {
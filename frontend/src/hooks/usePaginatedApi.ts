@@ -62,12 +62,15 @@ export function usePaginatedApi<T, TFilters = undefined>(
         setPage(1);
     }, []);
 
-    const totalPages = data ? Math.ceil(data.total / data.pageSize) : 0;
+    // without a total, only the pages seen so far and whether another follows are known
+    const totalPages = !data ? 0
+        : data.total === null ? page + (data.hasMore ? 1 : 0)
+        : Math.ceil(data.total / data.pageSize);
     const hasMultiplePages = totalPages > 1;
 
     return {
         data: data?.data ?? [],
-        total: data?.total ?? 0,
+        total: data ? data.total : 0,
         page,
         pageSize: data?.pageSize ?? 25,
         totalPages,